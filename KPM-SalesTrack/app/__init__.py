@@ -1,9 +1,13 @@
 from flask import Flask
 from .config import Config
 from .db import db,migrate
-from app.routes import users_bp, meetings_bp, clients_bp, routes_bp, tasks_bp,checkins_bp,objectives_bp
+from app.routes import users_bp, meetings_bp, clients_bp, routes_bp, tasks_bp,checkins_bp,objectives_bp,exports_bp
 from flask_jwt_extended import JWTManager
 from flask_bcrypt import Bcrypt
+from .commands import prewarm_geocode_cache_command, gc_route_plans_command
+from .json_provider import FastJSONProvider
+from .instrumentation import init_instrumentation
+from .utils.cache import response_cache
 
 bcrypt=Bcrypt()
 jwt=JWTManager()
@@ -11,6 +15,7 @@ jwt=JWTManager()
 
 def create_app():
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     app.config.from_object(Config)
 
 
@@ -19,6 +24,7 @@ def create_app():
     migrate.init_app(app, db)
     bcrypt.init_app(app)
     jwt.init_app(app)
+    response_cache.init_app(app)
     app.register_blueprint(users_bp, url_prefix="/users")
     app.register_blueprint(meetings_bp, url_prefix="/meetings")
     app.register_blueprint(tasks_bp, url_prefix="/tasks")
@@ -26,5 +32,11 @@ def create_app():
     app.register_blueprint(clients_bp, url_prefix="/clients")
     app.register_blueprint(objectives_bp, url_prefix="/objectives")
     app.register_blueprint(routes_bp, url_prefix="/routes")
+    app.register_blueprint(exports_bp, url_prefix="/exports")
+
+    app.cli.add_command(prewarm_geocode_cache_command)
+    app.cli.add_command(gc_route_plans_command)
+
+    init_instrumentation(app)
 
     return app
@@ -0,0 +1,19 @@
+import click
+from flask.cli import with_appcontext
+from app.utils.geocode import prewarm_geocode_cache
+from app.services.route_plans import RoutePlanService
+
+
+@click.command("prewarm-geocode-cache")
+@click.option("--country-code", default="KE", show_default=True)
+@with_appcontext
+def prewarm_geocode_cache_command(country_code):
+    seeded = prewarm_geocode_cache(country_code)
+    click.echo(f"Seeded {seeded} geocode cache entries from client addresses")
+
+
+@click.command("gc-route-plans")
+@with_appcontext
+def gc_route_plans_command():
+    plans, routes = RoutePlanService().collect_garbage()
+    click.echo(f"Deleted {plans} superseded route plans and {routes} routes")
@@ -9,5 +9,25 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
     SQLALCHEMY_TRACK_MODIFICATIONs = True
     SECRET_KEY=os.getenv("SECRET_KEY")
+
+    # Request instrumentation: Server-Timing headers and /metrics
+    INSTRUMENTATION_ENABLED = os.getenv("INSTRUMENTATION_ENABLED", "true").lower() == "true"
+    # /metrics answers 404 until this is set; scrapers send it as a bearer token
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+    # Fraction of requests run under cProfile; profiles of the slow ones are saved
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "500"))
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+    # Response cache for the endpoints the mobile app polls; "memory" or "redis".
+    # "memory" is per process: invalidations made by worker.py (re-optimized
+    # and completed jobs) never reach the API processes, whose cached route
+    # lists then live out their TTL. Run "redis" whenever the API and the
+    # worker, or several API processes, serve the same data
+    CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    CACHE_DEFAULT_TTL = int(os.getenv("CACHE_DEFAULT_TTL", "60"))
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
     
 
@@ -0,0 +1,262 @@
+import os
+import hmac
+import random
+import threading
+import time
+import cProfile
+from datetime import datetime
+from flask import g, request, has_request_context, Response, jsonify
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.utils.http_client import add_call_listener, http_client_stats
+from app.utils.cache import response_cache
+from app.services.google_routes_service import google_route_cache_stats
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestMetrics:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.endpoints = {}
+
+    def record(self, endpoint, method, status, seconds, sql_count, sql_seconds, http_count, http_seconds):
+        with self._lock:
+            key = (endpoint, method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = {
+                    'buckets': [0] * len(DURATION_BUCKETS),
+                    'count': 0,
+                    'seconds': 0.0,
+                    'sql_count': 0,
+                    'sql_seconds': 0.0,
+                    'http_count': 0,
+                    'http_seconds': 0.0
+                }
+                self.endpoints[endpoint] = stats
+
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if seconds <= bound:
+                    stats['buckets'][i] += 1
+            stats['count'] += 1
+            stats['seconds'] += seconds
+            stats['sql_count'] += sql_count
+            stats['sql_seconds'] += sql_seconds
+            stats['http_count'] += http_count
+            stats['http_seconds'] += http_seconds
+
+    def render(self):
+        with self._lock:
+            requests = dict(self.requests)
+            endpoints = {name: dict(stats, buckets=list(stats['buckets'])) for name, stats in self.endpoints.items()}
+
+        lines = [
+            '# HELP kpm_requests_total Requests handled, by endpoint, method and status.',
+            '# TYPE kpm_requests_total counter'
+        ]
+        for (endpoint, method, status), count in sorted(requests.items()):
+            lines.append(f'kpm_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}')
+
+        lines.append('# HELP kpm_request_duration_seconds Wall time per request.')
+        lines.append('# TYPE kpm_request_duration_seconds histogram')
+        for endpoint, stats in sorted(endpoints.items()):
+            for bound, count in zip(DURATION_BUCKETS, stats['buckets']):
+                lines.append(f'kpm_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {count}')
+            lines.append(f'kpm_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} {stats["count"]}')
+            lines.append(f'kpm_request_duration_seconds_sum{{endpoint="{endpoint}"}} {stats["seconds"]:.6f}')
+            lines.append(f'kpm_request_duration_seconds_count{{endpoint="{endpoint}"}} {stats["count"]}')
+
+        for name, key, kind, help_text in [
+            ('kpm_db_queries_total', 'sql_count', 'counter', 'SQL statements executed while handling requests.'),
+            ('kpm_db_query_seconds_total', 'sql_seconds', 'counter', 'Time spent in SQL while handling requests.'),
+            ('kpm_outbound_http_requests_total', 'http_count', 'counter', 'Outbound geocode/Google calls made while handling requests.'),
+            ('kpm_outbound_http_seconds_total', 'http_seconds', 'counter', 'Time spent in outbound calls while handling requests.'),
+        ]:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for endpoint, stats in sorted(endpoints.items()):
+                value = stats[key]
+                lines.append(f'{name}{{endpoint="{endpoint}"}} {value:.6f}' if isinstance(value, float) else f'{name}{{endpoint="{endpoint}"}} {value}')
+
+        # Provider-level view across requests and background jobs
+        providers = http_client_stats()
+        lines.append('# HELP kpm_provider_calls_total Outbound calls per provider, including retries.')
+        lines.append('# TYPE kpm_provider_calls_total counter')
+        for provider, stats in sorted(providers.items()):
+            lines.append(f'kpm_provider_calls_total{{provider="{provider}"}} {stats["calls"]}')
+        lines.append('# HELP kpm_provider_errors_total Outbound calls per provider that failed or returned 5xx.')
+        lines.append('# TYPE kpm_provider_errors_total counter')
+        for provider, stats in sorted(providers.items()):
+            lines.append(f'kpm_provider_errors_total{{provider="{provider}"}} {stats["errors"]}')
+        lines.append('# HELP kpm_provider_circuit_open Whether the provider circuit breaker is open.')
+        lines.append('# TYPE kpm_provider_circuit_open gauge')
+        for provider, stats in sorted(providers.items()):
+            lines.append(f'kpm_provider_circuit_open{{provider="{provider}"}} {1 if stats["circuit"] == "open" else 0}')
+
+        routes = google_route_cache_stats()
+        lines.append('# HELP kpm_google_route_lookups_total Google route lookups by where the route was found.')
+        lines.append('# TYPE kpm_google_route_lookups_total counter')
+        for source in ('memory', 'database', 'api'):
+            lines.append(f'kpm_google_route_lookups_total{{source="{source}"}} {routes[source]}')
+        lines.append('# HELP kpm_google_route_cache_keys Route keys held by the in-process route cache.')
+        lines.append('# TYPE kpm_google_route_cache_keys gauge')
+        lines.append(f'kpm_google_route_cache_keys {routes["cached_keys"]}')
+
+        cache = response_cache.stats()
+        for name, key, help_text in [
+            ('kpm_cache_hits_total', 'hits', 'Response cache hits.'),
+            ('kpm_cache_misses_total', 'misses', 'Response cache misses.'),
+            ('kpm_cache_invalidations_total', 'invalidations', 'Cached responses dropped by tag invalidation.'),
+            ('kpm_cache_errors_total', 'errors', 'Response cache backend errors.'),
+        ]:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} counter')
+            lines.append(f'{name}{{backend="{cache["backend"]}"}} {cache[key]}')
+        if cache['size'] is not None:
+            lines.append('# HELP kpm_cache_entries Entries held by the in-process response cache.')
+            lines.append('# TYPE kpm_cache_entries gauge')
+            lines.append(f'kpm_cache_entries{{backend="{cache["backend"]}"}} {cache["size"]}')
+
+        return '\n'.join(lines) + '\n'
+
+
+metrics = RequestMetrics()
+_profiler_lock = threading.Lock()
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def on_query_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start
+    # time so the next query is not timed from it
+    conn = context.connection
+    if conn is not None and conn.info.get('query_started'):
+        conn.info['query_started'].pop()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started'].pop()
+    # Background threads (optimization workers) have no request to charge
+    if has_request_context() and 'sql_count' in g:
+        g.sql_count += 1
+        g.sql_seconds += time.perf_counter() - started
+
+
+def on_outbound_call(provider, seconds, status):
+    if has_request_context() and 'http_count' in g:
+        g.http_count += 1
+        g.http_seconds += seconds
+
+
+def start_request():
+    g.request_started = time.perf_counter()
+    g.sql_count = 0
+    g.sql_seconds = 0.0
+    g.http_count = 0
+    g.http_seconds = 0.0
+    g.profiler = None
+
+    from flask import current_app
+    rate = current_app.config.get('PROFILE_SAMPLE_RATE', 0)
+    # Only one profiler can be active per process (on 3.12 cProfile holds
+    # the single sys.monitoring profiler slot), so a request sampled while
+    # another is being profiled simply goes unprofiled
+    if rate > 0 and random.random() < rate and _profiler_lock.acquire(blocking=False):
+        try:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            g.profiler = profiler
+        except ValueError:
+            _profiler_lock.release()
+
+
+def stop_profiler():
+    profiler = g.get('profiler')
+    if profiler is None:
+        return None
+
+    g.profiler = None
+    profiler.disable()
+    _profiler_lock.release()
+    return profiler
+
+
+def finish_request(response):
+    if 'request_started' not in g:
+        return response
+
+    from flask import current_app
+    seconds = time.perf_counter() - g.request_started
+    endpoint = request.endpoint or 'unmatched'
+
+    response.headers['Server-Timing'] = ', '.join([
+        f'app;dur={seconds * 1000:.1f}',
+        f'db;dur={g.sql_seconds * 1000:.1f};desc="{g.sql_count} queries"',
+        f'http;dur={g.http_seconds * 1000:.1f};desc="{g.http_count} calls"'
+    ])
+
+    metrics.record(endpoint, request.method, response.status_code, seconds,
+                   g.sql_count, g.sql_seconds, g.http_count, g.http_seconds)
+
+    profiler = stop_profiler()
+    if profiler is not None and seconds * 1000 >= current_app.config.get('PROFILE_SLOW_MS', 500):
+        save_profile(profiler, endpoint, seconds, current_app.config.get('PROFILE_DIR', 'profiles'))
+
+    return response
+
+
+def teardown_request(error=None):
+    # after_request is skipped when a response fails to build; the profiler
+    # slot must still be given back
+    stop_profiler()
+
+
+def save_profile(profiler, endpoint, seconds, directory):
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+    path = os.path.join(directory, f'{stamp}-{endpoint}-{int(seconds * 1000)}ms.prof')
+    profiler.dump_stats(path)
+
+
+def metrics_endpoint():
+    from flask import current_app
+    token = current_app.config.get('METRICS_TOKEN')
+    # Traffic and provider stats are not public: without a configured token
+    # the endpoint does not exist
+    if not token:
+        return jsonify({'error': 'Not found'}), 404
+    if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+_listeners_installed = False
+
+
+def init_instrumentation(app):
+    global _listeners_installed
+
+    if not app.config.get('INSTRUMENTATION_ENABLED', True):
+        return
+
+    # Engine-class listeners see every engine, including the ones worker
+    # threads and exports use
+    if not _listeners_installed:
+        event.listen(Engine, 'before_cursor_execute', before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', after_cursor_execute)
+        event.listen(Engine, 'handle_error', on_query_error)
+        add_call_listener(on_outbound_call)
+        _listeners_installed = True
+
+    app.before_request(start_request)
+    app.after_request(finish_request)
+    app.teardown_request(teardown_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_endpoint)
@@ -6,4 +6,10 @@ from .client import Client
 from .objectives import Objective
 from .route import Route
 from .route_meetings import RouteMeeting
-from .google_routes import GoogleRoute
\ No newline at end of file
+from .google_routes import GoogleRoute
+from .optimization_job import OptimizationJob
+from .geocode_cache import GeocodeCache
+from .reverse_geocode_cache import ReverseGeocodeCache
+from .route_dirty_mark import RouteDirtyMark
+from .route_plan import RoutePlan
+from .google_route_legs import GoogleRouteLeg
\ No newline at end of file
@@ -1,8 +1,9 @@
 from app.db import db
+from .geo_point import GeoPointMixin
 from datetime import datetime
 
 
-class Checkin(db.Model):
+class Checkin(GeoPointMixin, db.Model):
     __tablename__ = 'checkins'
 
     id = db.Column(db.Integer, primary_key=True)
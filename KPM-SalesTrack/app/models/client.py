@@ -1,7 +1,8 @@
 from app.db import db
+from .geo_point import GeoPointMixin
 from datetime import datetime, timezone
 
-class Client(db.Model):
+class Client(GeoPointMixin, db.Model):
     __tablename__ = 'clients'
 
     id = db.Column(db.Integer, primary_key=True)
@@ -13,5 +14,6 @@ class Client(db.Model):
     status = db.Column(db.String(50), nullable=False)
     location = db.Column(db.JSON, nullable=False)  
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
-    assigned_to = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    assigned_to = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     
\ No newline at end of file
@@ -0,0 +1,37 @@
+from sqlalchemy.orm import validates
+from app.db import db
+
+# About 5 m; prefixes of it give the coarser cells nearby searches scan
+GEOHASH_PRECISION = 9
+
+
+def location_point(location):
+    # (lat, lng) out of a geocoded location, whose coordinates are [lng, lat]
+    try:
+        lng, lat = location['coordinates'][0], location['coordinates'][1]
+        return float(lat), float(lng)
+    except (TypeError, KeyError, IndexError, ValueError):
+        return None
+
+
+class GeoPointMixin:
+
+    # Numeric copy of location['coordinates'], kept in step on every
+    # assignment so positions can be filtered and indexed in the database.
+    # The JSON stays as it is for labels and display
+    lat = db.Column(db.Float)
+    lng = db.Column(db.Float)
+    geohash = db.Column(db.String(12), index=True)
+
+    @validates('location')
+    def sync_point(self, key, location):
+        # Imported here: app.utils loads the models itself
+        from app.utils.geohash import encode
+
+        point = location_point(location)
+        if point is None:
+            self.lat, self.lng, self.geohash = None, None, None
+        else:
+            self.lat, self.lng = point
+            self.geohash = encode(point[0], point[1], GEOHASH_PRECISION)
+        return location
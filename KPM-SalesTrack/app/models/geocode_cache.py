@@ -0,0 +1,21 @@
+from app.db import db
+from datetime import datetime
+
+
+class GeocodeCache(db.Model):
+    __tablename__ = 'geocode_cache'
+
+    STATUS_FOUND = 'found'
+    STATUS_NOT_FOUND = 'not_found'
+    STATUS_ERROR = 'error'
+
+    id = db.Column(db.Integer, primary_key=True)
+    # Country code plus the normalized address, see normalize_address
+    address_key = db.Column(db.String(512), nullable=False, unique=True, index=True)
+    address = db.Column(db.String(255), nullable=False)
+    country_code = db.Column(db.String(2), nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    # None for negative entries
+    location = db.Column(db.JSON)
+    fetched_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
@@ -0,0 +1,16 @@
+from app.db import db
+
+
+class GoogleRouteLeg(db.Model):
+    __tablename__ = 'google_route_legs'
+    __table_args__ = (
+        db.UniqueConstraint('google_route_id', 'leg_index', name='uq_google_route_legs_google_route_id_leg_index'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    google_route_id = db.Column(db.Integer, db.ForeignKey('google_routes.id'), nullable=False)
+    # 0 is office to first stop, the last leg is the way back
+    leg_index = db.Column(db.Integer, nullable=False)
+    distance_meters = db.Column(db.Integer, nullable=False)
+    duration_seconds = db.Column(db.Integer, nullable=False)
+    encoded_polyline = db.Column(db.Text)
@@ -7,9 +7,13 @@ class GoogleRoute(db.Model):
     __tablename__ = 'google_routes'
     
     id = db.Column(db.Integer, primary_key=True)
-    raw_response = db.Column(db.JSON, nullable=False)
+    # Kept for reference only; legs live in google_route_legs, so reads never
+    # need to load the blob
+    raw_response = db.deferred(db.Column(db.JSON, nullable=False))
     total_distance_meters = db.Column(db.Integer)
     total_duration_seconds = db.Column(db.Integer)
     encoded_polyline = db.Column(db.Text)
-    waypoints_hash = db.Column(db.String(64))
+    waypoints_hash = db.Column(db.String(64), unique=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    legs = db.relationship('GoogleRouteLeg', order_by='GoogleRouteLeg.leg_index', cascade='all, delete-orphan')
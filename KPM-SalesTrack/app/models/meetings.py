@@ -1,8 +1,14 @@
 from app.db import db
+from .geo_point import GeoPointMixin
 from datetime import datetime
 
-class Meeting(db.Model):
+class Meeting(GeoPointMixin, db.Model):
     __tablename__ = 'meetings'
+    __table_args__ = (
+        db.Index('ix_meetings_scheduled_date_meeting_type', 'scheduled_date', 'meeting_type'),
+        db.Index('ix_meetings_user_id_scheduled_date', 'user_id', 'scheduled_date'),
+        db.Index('ix_meetings_client_id_scheduled_date', 'client_id', 'scheduled_date'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -10,7 +16,15 @@ class Meeting(db.Model):
     title = db.Column(db.String(100), nullable=False)
     duration = db.Column(db.Integer, nullable=False)  
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     location = db.Column(db.JSON, nullable=False)  
     meeting_type = db.Column(db.String(50), nullable=False)  
     scheduled_time = db.Column(db.DateTime, nullable=False) 
-    scheduled_date = db.Column(db.Date, nullable=False) 
\ No newline at end of file
+    scheduled_date = db.Column(db.Date, nullable=False) 
+
+    client = db.relationship('Client')
+    user = db.relationship('User')
+
+    @property
+    def client_name(self):
+        return self.client.company_name if self.client else None
\ No newline at end of file
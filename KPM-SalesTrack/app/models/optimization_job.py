@@ -0,0 +1,29 @@
+from app.db import db
+from datetime import datetime
+
+
+class OptimizationJob(db.Model):
+    __tablename__ = 'optimization_jobs'
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+
+    id = db.Column(db.Integer, primary_key=True)
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default=STATUS_QUEUED, index=True)
+    # Set to the date range while queued or running so a resubmission
+    # coalesces into the same job; cleared once the job finishes
+    active_key = db.Column(db.String(32), unique=True)
+    progress = db.Column(db.JSON)
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    requested_by = db.Column(db.Integer, db.ForeignKey('users.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime)
+    # Renewed by the running worker after every day; a running job whose
+    # lease has lapsed belonged to a worker that died
+    heartbeat_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
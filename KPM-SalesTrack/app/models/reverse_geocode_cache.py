@@ -0,0 +1,15 @@
+from app.db import db
+from datetime import datetime
+
+
+class ReverseGeocodeCache(db.Model):
+    __tablename__ = 'reverse_geocode_cache'
+
+    id = db.Column(db.Integer, primary_key=True)
+    # Full-precision geohash of the looked-up point; lookups scan prefix ranges
+    geohash = db.Column(db.String(12), nullable=False, index=True)
+    lat = db.Column(db.Float, nullable=False)
+    lng = db.Column(db.Float, nullable=False)
+    location = db.Column(db.JSON, nullable=False)
+    fetched_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
@@ -3,10 +3,16 @@ from datetime import datetime
 
 class Route(db.Model):
     __tablename__ = 'routes'
+    __table_args__ = (
+        db.Index('ix_routes_user_id_route_date_status', 'user_id', 'route_date', 'status'),
+        # One route per rep in a plan
+        db.UniqueConstraint('plan_id', 'user_id', name='uq_routes_plan_id_user_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    route_date = db.Column(db.Date, nullable=False)
+    plan_id = db.Column(db.Integer, db.ForeignKey('route_plans.id'))
+    route_date = db.Column(db.Date, nullable=False, index=True)
     google_route_id = db.Column(db.Integer, db.ForeignKey('google_routes.id'), nullable=False)
     route_type = db.Column(db.String(20), default='individual')
     shared_with_route_id = db.Column(db.Integer, db.ForeignKey('routes.id'))
@@ -14,4 +20,11 @@ class Route(db.Model):
     scheduled_return_time = db.Column(db.DateTime)
     status = db.Column(db.String(20), default='pending')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
\ No newline at end of file
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    user = db.relationship('User')
+    plan = db.relationship('RoutePlan')
+    google_route = db.relationship('GoogleRoute')
+    stops = db.relationship('RouteMeeting', order_by='RouteMeeting.stop_order', cascade='all, delete-orphan')
+    # Passengers point at the lead route of their shared car
+    lead_route = db.relationship('Route', remote_side=[id], backref='carpoolers')
@@ -0,0 +1,18 @@
+from app.db import db
+from datetime import datetime
+
+
+class RouteDirtyMark(db.Model):
+    __tablename__ = 'route_dirty_marks'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'route_date', name='uq_route_dirty_marks_user_id_route_date'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    route_date = db.Column(db.Date, nullable=False, index=True)
+    reason = db.Column(db.String(50))
+    # Bumped on every change so a pass only clears the marks it actually saw
+    revision = db.Column(db.Integer, nullable=False, default=1)
+    marked_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    claimed_at = db.Column(db.DateTime)
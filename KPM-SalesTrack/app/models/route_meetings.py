@@ -3,6 +3,9 @@ from datetime import datetime
 
 class RouteMeeting(db.Model):
     __tablename__ = 'route_meetings'
+    __table_args__ = (
+        db.Index('ix_route_meetings_route_id_stop_order', 'route_id', 'stop_order'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     route_id = db.Column(db.Integer, db.ForeignKey('routes.id'), nullable=False)
@@ -15,4 +18,6 @@ class RouteMeeting(db.Model):
     duration_from_previous_seconds = db.Column(db.Integer) 
     status = db.Column(db.String(20), default='scheduled')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
\ No newline at end of file
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    meeting = db.relationship('Meeting')
@@ -0,0 +1,26 @@
+from app.db import db
+from datetime import datetime
+
+
+class RoutePlan(db.Model):
+    __tablename__ = 'route_plans'
+    __table_args__ = (
+        db.UniqueConstraint('route_date', 'run_id', name='uq_route_plans_route_date_run_id'),
+        # At most one current plan per day; reads go through this index
+        db.Index(
+            'uq_route_plans_current_route_date', 'route_date', unique=True,
+            postgresql_where=db.text("status = 'current'"),
+            sqlite_where=db.text("status = 'current'")
+        ),
+    )
+
+    STATUS_CURRENT = 'current'
+    STATUS_SUPERSEDED = 'superseded'
+
+    id = db.Column(db.Integer, primary_key=True)
+    route_date = db.Column(db.Date, nullable=False)
+    # The optimization job (or other pass) that produced the plan
+    run_id = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default=STATUS_CURRENT, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    superseded_at = db.Column(db.DateTime)
@@ -8,7 +8,7 @@ class Task(db.Model):
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
     due_date = db.Column(db.DateTime, nullable=True)
-    assigned_to = db.Column(db.Integer, nullable=False)
+    assigned_to = db.Column(db.Integer, nullable=False, index=True)
     assigned_by = db.Column(db.Integer, nullable=False)
     status = db.Column(db.String(50), default='pending')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
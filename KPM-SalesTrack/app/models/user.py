@@ -17,3 +17,7 @@ class User(db.Model):
     password = db.Column(db.String(128), nullable=False)
     is_active = db.Column(db.Boolean, default=True, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.now(timezone.utc), nullable=False)
+
+    @property
+    def name(self):
+        return f"{self.first_name} {self.last_name}"
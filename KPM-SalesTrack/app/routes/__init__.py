@@ -4,4 +4,5 @@ from .task import tasks_bp
 from .checkin import checkins_bp
 from .client import clients_bp
 from .objectives import objectives_bp
-from .route_optimize import routes_bp
\ No newline at end of file
+from .route_optimize import routes_bp
+from .exports import exports_bp
\ No newline at end of file
@@ -2,9 +2,8 @@ from flask import Blueprint, jsonify, request
 from app.models import Checkin, Meeting
 from app.db import db
 from datetime import datetime
-from geopy.distance import geodesic
 from flask_jwt_extended import get_jwt_identity, get_jwt
-from app.utils import reverse_geocode, role_required
+from app.utils import reverse_geocode, role_required, geo
 
 checkins_bp = Blueprint("checkins", __name__)
 
@@ -32,16 +31,20 @@ def checkin():
         if not meeting or not meeting.location:
             return jsonify({"error": "Meeting location not found"}), 404
 
-        meeting_coords = (meeting.location["coordinates"][1], meeting.location["coordinates"][0])
-        user_coords = (user_location["lat"], user_location["lon"])
-
-        distance = geodesic(user_coords, meeting_coords).meters
+        distance = geo.haversine(
+            float(user_location["lat"]), float(user_location["lon"]),
+            meeting.location["coordinates"][1], meeting.location["coordinates"][0]
+        )
         if distance > 50:
             return jsonify({
                 "error": f"Too far from meeting location ({int(distance)}m). Must be within 50m."
             }), 400
 
-        geocoded_location = reverse_geocode(user_location["lat"], user_location["lon"])
+        # The rep is within 50m of the meeting, so its known place is the answer
+        if meeting.location.get("label"):
+            geocoded_location = meeting.location
+        else:
+            geocoded_location = reverse_geocode(user_location["lat"], user_location["lon"])
         if not geocoded_location:
             return jsonify({"error": "Could not reverse geocode your location"}), 400
         
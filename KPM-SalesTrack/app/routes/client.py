@@ -2,7 +2,9 @@ from flask import Blueprint, jsonify, request
 from app.models import Client,Meeting
 from app.db import db
 from datetime import datetime
-from app.utils import geocode_address, admin_required, salesman_required, owner_or_admin_required
+from app.utils import geocode_address, admin_required, salesman_required, owner_or_admin_required, sales_or_admin_required, paginate, InvalidCursor, client_serializer
+from app.utils import response_cache, cached_response
+from app.services import NearbyClientsService
 from flask_jwt_extended import get_jwt_identity, get_jwt
 
 clients_bp = Blueprint("clients", __name__)
@@ -55,23 +57,13 @@ def create_client():
 
     return jsonify({
         "message": "Client created successfully",
-        "client": {
-            "id": new_client.id,
-            "company_name": new_client.company_name,
-            "contact_person": new_client.contact_person,
-            "phone_number": new_client.phone_number,
-            "email": new_client.email,
-            "address": new_client.address,
-            "status": new_client.status,
-            "location": new_client.location,
-            "created_at": new_client.created_at.isoformat(),
-            "assigned_to": new_client.assigned_to
-        },
+        "client": client_serializer.dump(new_client),
     }), 201
 
 
 @clients_bp.route("/<int:client_id>/get", methods=["GET"])
 @owner_or_admin_required
+@cached_response(lambda client_id: [f"client:{client_id}"])
 def get_client(client_id):
     client = Client.query.get(client_id)
     if not client:
@@ -103,20 +95,11 @@ def get_client(client_id):
         else:
             past.append(meeting_data)
 
-    return jsonify({
-        "id": client.id,
-        "company_name": client.company_name,
-        "contact_person": client.contact_person,
-        "phone_number": client.phone_number,
-        "email": client.email,
-        "address": client.address,
-        "status": client.status,
-        "location": client.location,
-        "created_at": client.created_at.isoformat(),
-        "assigned_to": client.assigned_to,
-        "upcomingMeetings": upcoming,
-        "pastMeetings": past
-    }), 200
+    client_data = client_serializer.dump(client)
+    client_data["upcomingMeetings"] = upcoming
+    client_data["pastMeetings"] = past
+
+    return jsonify(client_data), 200
 
 @clients_bp.route("/<int:client_id>/edit", methods=["PUT"])
 @owner_or_admin_required
@@ -171,21 +154,12 @@ def edit_client(client_id):
     client.assigned_to = assigned_to
 
     db.session.commit()
+    # Company names also show up in meeting lists and route stops
+    response_cache.invalidate(f"client:{client_id}", "client-names")
 
     return jsonify({
         "message": "Client updated successfully",
-        "client": {
-            "id": client.id,
-            "company_name": client.company_name,
-            "contact_person": client.contact_person,
-            "phone_number": client.phone_number,
-            "email": client.email,
-            "address": client.address,
-            "status": client.status,
-            "location": client.location,
-            "created_at": client.created_at.isoformat(),
-            "assigned_to": client.assigned_to
-        }
+        "client": client_serializer.dump(client)
     }), 200
 
 
@@ -201,39 +175,17 @@ def get_all_clients():
         if per_page < 1 or per_page > 100:
             return jsonify({"error": "Per page must be between 1 and 100"}), 400
         
-        pagination = Client.query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        pagination = paginate(client_serializer.project(Client.query), Client.id, page, per_page)
         
-        clients_list = []
-        for client in pagination.items:
-            clients_list.append({
-                "id": client.id,
-                "company_name": client.company_name,
-                "contact_person": client.contact_person,
-                "phone_number": client.phone_number,
-                "email": client.email,
-                "address": client.address,
-                "status": client.status,
-                "location": client.location,
-                "created_at": client.created_at.isoformat(),
-                "assigned_to": client.assigned_to
-            })
+        clients_list = client_serializer.dump_many(pagination.items)
         
         return jsonify({
             "clients": clients_list,
-            "pagination": {
-                "page": pagination.page,
-                "per_page": pagination.per_page,
-                "total": pagination.total,
-                "pages": pagination.pages,
-                "has_next": pagination.has_next,
-                "has_prev": pagination.has_prev
-            }
+            "pagination": pagination.info()
         }), 200
     
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": f"Failed to retrieve clients: {str(e)}"}), 500
 
@@ -251,41 +203,62 @@ def get_my_clients():
         if per_page < 1 or per_page > 100:
             return jsonify({"error": "Per page must be between 1 and 100"}), 400
     
-        pagination = Client.query.filter_by(assigned_to=current_user_id).paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        pagination = paginate(client_serializer.project(Client.query).filter_by(assigned_to=current_user_id), Client.id, page, per_page)
         
-        clients_list = [{
-            "id": c.id,
-            "company_name": c.company_name,
-            "contact_person": c.contact_person,
-            "phone_number": c.phone_number,
-            "email": c.email,
-            "address": c.address,
-            "status": c.status,
-            "location": c.location,
-            "created_at": c.created_at.isoformat(),
-            "assigned_to": c.assigned_to
-        } for c in pagination.items]
+        clients_list = client_serializer.dump_many(pagination.items)
         
         return jsonify({
             "clients": clients_list,
-            "pagination": {
-                "page": pagination.page,
-                "per_page": pagination.per_page,
-                "total": pagination.total,
-                "pages": pagination.pages,
-                "has_next": pagination.has_next,
-                "has_prev": pagination.has_prev
-            }
+            "pagination": pagination.info()
         }), 200
     
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": f"Failed to retrieve clients: {str(e)}"}), 500
 
 
+@clients_bp.route("/nearby", methods=["GET"])
+@sales_or_admin_required
+def get_nearby_clients():
+    lat = request.args.get('lat', type=float)
+    lng = request.args.get('lng', type=float)
+    radius_km = request.args.get('radius_km', 5, type=float)
+    limit = request.args.get('limit', 10, type=int)
+
+    if lat is None or lng is None:
+        return jsonify({"error": "lat and lng are required"}), 400
+    if not (-90 <= lat <= 90) or not (-180 <= lng <= 180):
+        return jsonify({"error": "lat or lng out of range"}), 400
+    if radius_km <= 0 or radius_km > 50:
+        return jsonify({"error": "radius_km must be between 0 and 50"}), 400
+    if limit < 1 or limit > 50:
+        return jsonify({"error": "Limit must be between 1 and 50"}), 400
+
+    # Reps only see their own clients; admins can narrow to one rep
+    if get_jwt().get("role") == "admin":
+        assigned_to = request.args.get('assigned_to', type=int)
+    else:
+        assigned_to = int(get_jwt_identity())
+
+    try:
+        nearby = NearbyClientsService(assigned_to).search(lat, lng, radius_km * 1000, limit)
+    except Exception as e:
+        return jsonify({"error": f"Failed to search clients: {str(e)}"}), 500
+
+    clients_list = []
+    for client, distance in nearby:
+        client_data = client_serializer.dump(client)
+        client_data["distance_meters"] = int(round(distance))
+        clients_list.append(client_data)
+
+    return jsonify({
+        "clients": clients_list,
+        "count": len(clients_list),
+        "radius_km": radius_km
+    }), 200
+
+
 @clients_bp.route("/<int:client_id>/hard_delete", methods=["DELETE"])
 @owner_or_admin_required
 def delete_client(client_id):
@@ -301,5 +274,6 @@ def delete_client(client_id):
 
     db.session.delete(client)
     db.session.commit()
+    response_cache.invalidate(f"client:{client_id}", "client-names")
 
     return jsonify({"message": "Client deleted successfully"}), 200
\ No newline at end of file
@@ -0,0 +1,207 @@
+import csv
+import io
+import zlib
+from datetime import datetime, timedelta
+from flask import Blueprint, Response, request, jsonify, stream_with_context, current_app
+from sqlalchemy import select
+from app.models import Meeting, Checkin, Route, RoutePlan, User, Client, GoogleRoute
+from app.db import db
+from app.utils import admin_required
+from app.utils.serializers import iso, hhmm, location_label
+
+exports_bp = Blueprint("exports", __name__)
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 2000
+# Bytes buffered before a chunk is sent
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def parse_filters():
+    start_str = request.args.get("start_date")
+    end_str = request.args.get("end_date")
+    user_id = request.args.get("user_id", type=int)
+    export_format = request.args.get("format", "ndjson").lower()
+
+    if export_format not in ("ndjson", "csv"):
+        raise ValueError("Format must be ndjson or csv")
+
+    try:
+        start_date = datetime.strptime(start_str, "%Y-%m-%d").date() if start_str else None
+        end_date = datetime.strptime(end_str, "%Y-%m-%d").date() if end_str else None
+    except ValueError:
+        raise ValueError("Invalid date format. Use YYYY-MM-DD")
+
+    if start_date and end_date and start_date > end_date:
+        raise ValueError("Start date must be before or equal to end date")
+
+    return start_date, end_date, user_id, export_format
+
+
+def encode_rows(rows, columns, export_format):
+    buffer = io.StringIO()
+
+    if export_format == "csv":
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(["" if v is None else v for v in row])
+            if buffer.tell() >= EXPORT_CHUNK_SIZE:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+    else:
+        dumps = current_app.json.dumps
+        for row in rows:
+            buffer.write(dumps(dict(zip(columns, row))))
+            buffer.write("\n")
+            if buffer.tell() >= EXPORT_CHUNK_SIZE:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+    if buffer.tell() > 0:
+        yield buffer.getvalue()
+
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(name, statement, columns, to_values, export_format):
+    def rows():
+        # yield_per streams from a server-side cursor instead of loading the
+        # whole result set
+        result = db.session.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for row in result:
+            yield to_values(row)
+
+    chunks = encode_rows(rows(), columns, export_format)
+
+    headers = {
+        "Content-Disposition": f"attachment; filename={name}.{export_format}",
+        "Vary": "Accept-Encoding"
+    }
+    # Honours q-values, so "gzip;q=0" opts out
+    if request.accept_encodings["gzip"] > 0:
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+
+    mimetype = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
+
+
+@exports_bp.route("/meetings", methods=["GET"])
+@admin_required
+def export_meetings():
+    try:
+        start_date, end_date, user_id, export_format = parse_filters()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    statement = select(
+        Meeting.id, Meeting.scheduled_date, Meeting.scheduled_time, Meeting.duration, Meeting.meeting_type,
+        Meeting.title, Meeting.location, Meeting.user_id, User.first_name, User.last_name,
+        Meeting.client_id, Client.company_name
+    ).outerjoin(User, User.id == Meeting.user_id).outerjoin(Client, Client.id == Meeting.client_id)
+
+    if start_date:
+        statement = statement.where(Meeting.scheduled_date >= start_date)
+    if end_date:
+        statement = statement.where(Meeting.scheduled_date <= end_date)
+    if user_id:
+        statement = statement.where(Meeting.user_id == user_id)
+    statement = statement.order_by(Meeting.scheduled_date, Meeting.scheduled_time, Meeting.id)
+
+    columns = ["id", "date", "time", "duration", "meeting_type", "title", "location",
+               "user_id", "sales_person", "client_id", "client"]
+
+    def to_values(row):
+        return [
+            row.id, iso(row.scheduled_date), hhmm(row.scheduled_time), row.duration, row.meeting_type,
+            row.title, location_label(row.location), row.user_id,
+            f"{row.first_name} {row.last_name}" if row.first_name else None,
+            row.client_id, row.company_name
+        ]
+
+    return stream_export("meetings", statement, columns, to_values, export_format)
+
+
+@exports_bp.route("/checkins", methods=["GET"])
+@admin_required
+def export_checkins():
+    try:
+        start_date, end_date, user_id, export_format = parse_filters()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    statement = select(
+        Checkin.id, Checkin.checkin_time, Checkin.checkout_time, Checkin.location, Checkin.user_id,
+        User.first_name, User.last_name, Checkin.meeting_id, Checkin.client_id, Client.company_name
+    ).outerjoin(User, User.id == Checkin.user_id).outerjoin(Client, Client.id == Checkin.client_id)
+
+    if start_date:
+        statement = statement.where(Checkin.checkin_time >= start_date)
+    if end_date:
+        statement = statement.where(Checkin.checkin_time < end_date + timedelta(days=1))
+    if user_id:
+        statement = statement.where(Checkin.user_id == user_id)
+    statement = statement.order_by(Checkin.checkin_time, Checkin.id)
+
+    columns = ["id", "checkin_time", "checkout_time", "location", "user_id", "sales_person",
+               "meeting_id", "client_id", "client"]
+
+    def to_values(row):
+        return [
+            row.id, iso(row.checkin_time), iso(row.checkout_time), location_label(row.location), row.user_id,
+            f"{row.first_name} {row.last_name}" if row.first_name else None,
+            row.meeting_id, row.client_id, row.company_name
+        ]
+
+    return stream_export("checkins", statement, columns, to_values, export_format)
+
+
+@exports_bp.route("/routes", methods=["GET"])
+@admin_required
+def export_routes():
+    try:
+        start_date, end_date, user_id, export_format = parse_filters()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    statement = select(
+        Route.id, Route.route_date, Route.route_type, Route.status, Route.scheduled_departure_time,
+        Route.scheduled_return_time, Route.shared_with_route_id, Route.user_id, User.first_name, User.last_name,
+        GoogleRoute.total_distance_meters, GoogleRoute.total_duration_seconds
+    ).join(
+        RoutePlan, RoutePlan.id == Route.plan_id
+    ).outerjoin(User, User.id == Route.user_id).outerjoin(
+        GoogleRoute, GoogleRoute.id == Route.google_route_id
+    ).where(RoutePlan.status == RoutePlan.STATUS_CURRENT)
+
+    if start_date:
+        statement = statement.where(Route.route_date >= start_date)
+    if end_date:
+        statement = statement.where(Route.route_date <= end_date)
+    if user_id:
+        statement = statement.where(Route.user_id == user_id)
+    statement = statement.order_by(Route.route_date, Route.id)
+
+    columns = ["id", "route_date", "route_type", "status", "departure_time", "return_time",
+               "shared_with_route_id", "user_id", "sales_person", "total_distance_km", "total_duration_minutes"]
+
+    def to_values(row):
+        return [
+            row.id, iso(row.route_date), row.route_type, row.status, hhmm(row.scheduled_departure_time),
+            hhmm(row.scheduled_return_time), row.shared_with_route_id, row.user_id,
+            f"{row.first_name} {row.last_name}" if row.first_name else None,
+            round(row.total_distance_meters / 1000, 2) if row.total_distance_meters is not None else None,
+            round(row.total_duration_seconds / 60, 2) if row.total_duration_seconds is not None else None
+        ]
+
+    return stream_export("routes", statement, columns, to_values, export_format)
@@ -3,10 +3,59 @@ from app.models import Meeting, User, Client
 from app.db import db
 from datetime import datetime
 from app.utils import geocode_address
+from app.services import RouteDirtyTracker
 from flask_jwt_extended import get_jwt_identity, get_jwt
-from app.utils import admin_required, sales_or_admin_required,owner_or_admin_required
+from app.utils import admin_required, sales_or_admin_required,owner_or_admin_required, with_meeting_relations, paginate, InvalidCursor, dump_meeting_summary
+from app.utils import response_cache, cached_response, conditional_response
+from sqlalchemy import select, func
 
 meetings_bp = Blueprint("meetings", __name__)
+
+
+def meeting_cache_tags(meeting, before=None):
+    # Cached views showing this meeting: its client, its day and, for field
+    # meetings, the route details its stop appears in
+    tags = {f"client:{meeting.client_id}", f"meetings:{meeting.scheduled_date.isoformat()}"}
+    if before is not None:
+        tags.add(f"meetings:{before['scheduled_date'].isoformat()}")
+    if meeting.meeting_type == 'field' or (before is not None and before['meeting_type'] == 'field'):
+        tags.add("routes")
+    return tags
+
+
+def todays_meetings_version():
+    user_id = int(get_jwt_identity())
+    role = get_jwt().get('role')
+    today = datetime.now().date()
+
+    # Count and newest change of the day's meetings and their clients, over
+    # the (user_id, scheduled_date) index
+    statement = select(
+        func.count(Meeting.id), func.max(Meeting.updated_at), func.max(Client.updated_at)
+    ).select_from(Meeting).outerjoin(Client, Client.id == Meeting.client_id).where(Meeting.scheduled_date == today)
+    if role != 'admin':
+        statement = statement.where(Meeting.user_id == user_id)
+
+    count, meetings_updated, clients_updated = db.session.execute(statement).one()
+    return (today, role, user_id, count, meetings_updated, clients_updated)
+
+
+def meeting_version(meeting_id):
+    row = db.session.execute(
+        select(Meeting.user_id, Meeting.updated_at, Client.updated_at).select_from(Meeting).outerjoin(
+            Client, Client.id == Meeting.client_id
+        ).where(Meeting.id == meeting_id)
+    ).first()
+    if row is None:
+        return None
+
+    user_id, meeting_updated, client_updated = row
+    if get_jwt().get('role') != 'admin' and user_id != int(get_jwt_identity()):
+        return None
+
+    # The Completed/Upcoming status turns over with the date
+    return (meeting_id, datetime.now().date(), meeting_updated, client_updated)
+
 @meetings_bp.route("/admin/all", methods=["GET"])
 @admin_required
 def admin_get_all_meetings():
@@ -19,7 +68,7 @@ def admin_get_all_meetings():
         return jsonify({"error": "Invalid pagination parameters"}), 400
 
     try:
-        query = Meeting.query
+        query = with_meeting_relations(Meeting.query)
         
         if status_filter and status_filter.lower() != 'all':
             if status_filter.lower() == 'upcoming':
@@ -30,39 +79,26 @@ def admin_get_all_meetings():
         if user_id:
             query = query.filter(Meeting.user_id == user_id)
         
-        pagination = query.order_by(Meeting.scheduled_date.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        pagination = paginate(query, Meeting.id, page, per_page, sort_column=Meeting.scheduled_date, descending=True)
         
+        today = datetime.now().date()
         meetings_list = []
         for m in pagination.items:
-            client = Client.query.get(m.client_id)
-            user = User.query.get(m.user_id)
-            
-            meetings_list.append({
-                "id": m.id,
-                "client": client.company_name if client else "Unknown",
-                "contactPerson": client.contact_person if client else "N/A",
-                "meetingType": m.meeting_type,
-                "date": m.scheduled_date.isoformat(),
-                "time": m.scheduled_time.strftime('%H:%M'),
-                "location": m.location.get("label") if m.location else m.location,
-                "status": "Completed" if m.scheduled_date < datetime.now().date() else "Upcoming",
-                "salesPerson": f"{user.first_name} {user.last_name}" if user else "Unknown",
-                "salesPersonId": user.id if user else None,
-                "duration": m.duration,
-                "notes": m.title
-            })
+            meeting_data = dump_meeting_summary(m, today)
+            meeting_data["salesPersonId"] = m.user.id if m.user else None
+            meetings_list.append(meeting_data)
         
         return jsonify({
             "meetings": meetings_list,
-            "pagination": {
+            "pagination": pagination.info() if pagination.cursor_mode else {
                 "total": pagination.total,
                 "pages": pagination.pages,
                 "current_page": page,
                 "per_page": per_page
             }
         }), 200
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         print(f"Error fetching meetings: {str(e)}")
         return jsonify({"error": f"Error fetching meetings: {str(e)}"}), 500
@@ -101,6 +137,9 @@ def admin_update_meeting(meeting_id):
     if not meeting:
         return jsonify({"error": "Meeting not found"}), 404
 
+    tracker = RouteDirtyTracker()
+    before = tracker.snapshot(meeting)
+
     data = request.get_json()
     
     title = data.get("notes") or data.get("title")
@@ -140,7 +179,10 @@ def admin_update_meeting(meeting_id):
     meeting.scheduled_date = meeting_date
 
     try:
+        tracker.meeting_changed(before, meeting)
+        cache_tags = meeting_cache_tags(meeting, before)
         db.session.commit()
+        response_cache.invalidate(*cache_tags)
         return jsonify({
             "message": "Meeting updated successfully",
             "meeting": {
@@ -166,8 +208,11 @@ def admin_delete_meeting(meeting_id):
         return jsonify({"error": "Meeting not found"}), 404
 
     try:
+        RouteDirtyTracker().meeting_deleted(meeting)
+        cache_tags = meeting_cache_tags(meeting)
         db.session.delete(meeting)
         db.session.commit()
+        response_cache.invalidate(*cache_tags)
         return jsonify({"message": "Meeting deleted successfully"}), 200
     except Exception as e:
         db.session.rollback()
@@ -237,7 +282,10 @@ def sales_create_meeting():
         )
 
         db.session.add(new_meeting)
+        RouteDirtyTracker().meeting_changed(None, new_meeting, 'meeting_created')
+        cache_tags = meeting_cache_tags(new_meeting)
         db.session.commit()
+        response_cache.invalidate(*cache_tags)
 
         return jsonify({
             "message": "Meeting created successfully",
@@ -275,58 +323,46 @@ def sales_get_my_meetings():
 
     try:
         if user_role == 'admin':
-            query = Meeting.query
+            query = with_meeting_relations(Meeting.query)
         else:
-            query = Meeting.query.filter_by(user_id=current_user_id)
+            query = with_meeting_relations(Meeting.query).filter_by(user_id=current_user_id)
         if status_filter == 'upcoming':
             query = query.filter(Meeting.scheduled_date >= datetime.now().date())
         elif status_filter == 'completed':
             query = query.filter(Meeting.scheduled_date < datetime.now().date())
 
         if search_term:
-            query = query.join(Client).filter(
+            query = query.join(Meeting.client).filter(
                 Client.company_name.ilike(f"%{search_term}%")
             )
 
-        pagination = query.order_by(Meeting.scheduled_date.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        pagination = paginate(query, Meeting.id, page, per_page, sort_column=Meeting.scheduled_date, descending=True)
         
+        today = datetime.now().date()
         meetings_list = []
         for m in pagination.items:
-            client = Client.query.get(m.client_id)
-            user = User.query.get(m.user_id)
-            
-            meetings_list.append({
-                "id": m.id,
-                "client": client.company_name if client else "Unknown",
-                "contactPerson": client.contact_person if client else "N/A",
-                "meetingType": m.meeting_type,
-                "date": m.scheduled_date.isoformat(),
-                "time": m.scheduled_time.strftime('%H:%M'),
-                "location": m.location.get("label") if m.location else m.location,
-                "status": "Completed" if m.scheduled_date < datetime.now().date() else "Upcoming",
-                "salesPerson": f"{user.first_name} {user.last_name}" if user else "Unknown",
-                "duration": m.duration,
-                "notes": m.title,
-                "pastMeetings": []
-            })
+            meeting_data = dump_meeting_summary(m, today)
+            meeting_data["pastMeetings"] = []
+            meetings_list.append(meeting_data)
         
         return jsonify({
             "meetings": meetings_list,
-            "pagination": {
+            "pagination": pagination.info() if pagination.cursor_mode else {
                 "total": pagination.total,
                 "pages": pagination.pages,
                 "current_page": page,
                 "per_page": per_page
             }
         }), 200
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": f"Error fetching meetings: {str(e)}"}), 500
 
 
 @meetings_bp.route("/sales/<int:meeting_id>", methods=["GET"])
 @sales_or_admin_required
+@conditional_response(meeting_version)
 def sales_get_meeting(meeting_id):
     current_user_id = int(get_jwt_identity())
     user_role = get_jwt().get('role')
@@ -356,6 +392,8 @@ def sales_get_meeting(meeting_id):
 
 @meetings_bp.route("/sales/today", methods=["GET"])
 @sales_or_admin_required
+@conditional_response(todays_meetings_version)
+@cached_response(lambda: [f"meetings:{datetime.now().date().isoformat()}", "client-names"])
 def sales_get_todays_meetings():
     current_user_id = int(get_jwt_identity())
     user_role = get_jwt().get('role')
@@ -364,34 +402,20 @@ def sales_get_todays_meetings():
     
     try:
         if user_role == 'admin':
-            meetings = Meeting.query.filter(
+            meetings = with_meeting_relations(Meeting.query).filter(
                 Meeting.scheduled_date == today
             ).order_by(Meeting.scheduled_time.asc()).all()
         else:
-            meetings = Meeting.query.filter(
+            meetings = with_meeting_relations(Meeting.query).filter(
                 Meeting.scheduled_date == today,
                 Meeting.user_id == current_user_id
             ).order_by(Meeting.scheduled_time.asc()).all()
         
         meetings_list = []
         for m in meetings:
-            client = Client.query.get(m.client_id)
-            user = User.query.get(m.user_id)
-            
-            meetings_list.append({
-                "id": m.id,
-                "client": client.company_name if client else "Unknown",
-                "clientId": client.id if client else None,
-                "contactPerson": client.contact_person if client else "N/A",
-                "meetingType": m.meeting_type,
-                "date": m.scheduled_date.isoformat(),
-                "time": m.scheduled_time.strftime('%H:%M'),
-                "location": m.location.get("label") if m.location else m.location,
-                "status": "Completed" if m.scheduled_date < datetime.now().date() else "Upcoming",
-                "duration": m.duration,
-                "notes": m.title,
-                "salesPerson": f"{user.first_name} {user.last_name}" if user else "Unknown"
-            })
+            meeting_data = dump_meeting_summary(m, today)
+            meeting_data["clientId"] = m.client.id if m.client else None
+            meetings_list.append(meeting_data)
         
         return jsonify({
             "meetings": meetings_list,
@@ -415,6 +439,9 @@ def sales_update_meeting(meeting_id):
     if user_role != 'admin' and meeting.user_id != current_user_id:
         return jsonify({"error": "Access denied"}), 403
 
+    tracker = RouteDirtyTracker()
+    before = tracker.snapshot(meeting)
+
     data = request.get_json()
     title = data.get("notes") or data.get("title", meeting.title)
     duration = data.get("duration", meeting.duration)
@@ -453,7 +480,10 @@ def sales_update_meeting(meeting_id):
     meeting.scheduled_date = meeting_date
 
     try:
+        tracker.meeting_changed(before, meeting)
+        cache_tags = meeting_cache_tags(meeting, before)
         db.session.commit()
+        response_cache.invalidate(*cache_tags)
         return jsonify({
             "message": "Meeting updated successfully",
             "meeting": {
@@ -526,8 +556,11 @@ def sales_delete_meeting(meeting_id):
         return jsonify({"error": "Access denied"}), 403
 
     try:
+        RouteDirtyTracker().meeting_deleted(meeting)
+        cache_tags = meeting_cache_tags(meeting)
         db.session.delete(meeting)
         db.session.commit()
+        response_cache.invalidate(*cache_tags)
         return jsonify({"message": "Meeting deleted successfully"}), 200
     except Exception as e:
         db.session.rollback()
@@ -3,7 +3,7 @@ from app.models import Objective
 from app.db import db
 from datetime import datetime
 from flask_jwt_extended import get_jwt_identity, get_jwt
-from app.utils import admin_required, salesman_required, owner_or_admin_required
+from app.utils import admin_required, salesman_required, owner_or_admin_required, paginate, InvalidCursor, objective_serializer
 
 objectives_bp = Blueprint('objectives', __name__)
 
@@ -87,37 +87,17 @@ def get_all_objectives():
         if per_page < 1 or per_page > 100:
             return jsonify({"error": "Per page must be between 1 and 100"}), 400
 
-        pagination = Objective.query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        pagination = paginate(objective_serializer.project(Objective.query), Objective.id, page, per_page)
         
-        objectives_list = [{
-            "id": obj.id,
-            "title": obj.title,
-            "description": obj.description,
-            "target_value": obj.target_value,
-            "current_value": obj.current_value,
-            "start_date": obj.start_date.isoformat(),
-            "end_date": obj.end_date.isoformat(),
-            "user_id": obj.user_id,
-            "created_by": obj.created_by,
-            "created_at": obj.created_at.isoformat()
-        } for obj in pagination.items]
+        objectives_list = objective_serializer.dump_many(pagination.items)
         
         return jsonify({
             "objectives": objectives_list,
-            "pagination": {
-                "page": pagination.page,
-                "per_page": pagination.per_page,
-                "total": pagination.total,
-                "pages": pagination.pages,
-                "has_next": pagination.has_next,
-                "has_prev": pagination.has_prev
-            }
+            "pagination": pagination.info()
         }), 200
     
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": f"Failed to retrieve objectives: {str(e)}"}), 500
 
@@ -136,37 +116,17 @@ def get_my_objectives():
         if per_page < 1 or per_page > 100:
             return jsonify({"error": "Per page must be between 1 and 100"}), 400
     
-        pagination = Objective.query.filter_by(user_id=current_user_id).paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        pagination = paginate(objective_serializer.project(Objective.query).filter_by(user_id=current_user_id), Objective.id, page, per_page)
         
-        objectives_list = [{
-            "id": obj.id,
-            "title": obj.title,
-            "description": obj.description,
-            "target_value": obj.target_value,
-            "current_value": obj.current_value,
-            "start_date": obj.start_date.isoformat(),
-            "end_date": obj.end_date.isoformat(),
-            "user_id": obj.user_id,
-            "created_by": obj.created_by,
-            "created_at": obj.created_at.isoformat()
-        } for obj in pagination.items]
+        objectives_list = objective_serializer.dump_many(pagination.items)
         
         return jsonify({
             "objectives": objectives_list,
-            "pagination": {
-                "page": pagination.page,
-                "per_page": pagination.per_page,
-                "total": pagination.total,
-                "pages": pagination.pages,
-                "has_next": pagination.has_next,
-                "has_prev": pagination.has_prev
-            }
+            "pagination": pagination.info()
         }), 200
     
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": f"Failed to retrieve objectives: {str(e)}"}), 500
 
@@ -184,18 +144,7 @@ def get_objective(objective_id):
     if role != "admin" and objective.user_id != current_user_id:
         return jsonify({"error": "Access denied. You can only view your own objectives."}), 400
 
-    return jsonify({
-        "id": objective.id,
-        "title": objective.title,
-        "description": objective.description,
-        "target_value": objective.target_value,
-        "current_value": objective.current_value,
-        "start_date": objective.start_date.isoformat(),
-        "end_date": objective.end_date.isoformat(),
-        "user_id": objective.user_id,
-        "created_by": objective.created_by,
-        "created_at": objective.created_at.isoformat()
-    }), 200
+    return jsonify(objective_serializer.dump(objective)), 200
 
 
 @objectives_bp.route('/<int:objective_id>/updated', methods=['PUT'])
@@ -255,18 +204,7 @@ def updated_objective(objective_id):
 
     return jsonify({
         "message": "Objective updated successfully",
-        "objective": {
-            "id": objective.id,
-            "title": objective.title,
-            "description": objective.description,
-            "target_value": objective.target_value,
-            "current_value": objective.current_value,
-            "start_date": objective.start_date.isoformat(),
-            "end_date": objective.end_date.isoformat(),
-            "user_id": objective.user_id,
-            "created_by": objective.created_by,
-            "created_at": objective.created_at.isoformat()
-        }
+        "objective": objective_serializer.dump(objective)
     }), 200
 
 
@@ -1,12 +1,14 @@
 from flask import Blueprint, request, jsonify
 from datetime import datetime
-from app.services import RouteOptimizationService
-from app.models import Route, RouteMeeting
+from sqlalchemy import select, func
+from app.services import OptimizationJobService
+from app.models import Route, RouteMeeting, RoutePlan, Meeting, Client, OptimizationJob
 from app.db import db
 from app.utils import (
-    daterange, format_route, format_google_route, format_carpool,
+    format_route, format_google_route, format_carpool, format_job,
     format_stop, format_stop_basic, format_time,
-    admin_required, owner_or_admin_required
+    admin_required, owner_or_admin_required, with_route_relations, current_routes, paginate, InvalidCursor,
+    response_cache, cached_response, conditional_response
 )
 from flask_jwt_extended import get_jwt_identity, get_jwt
 
@@ -18,6 +20,60 @@ OFFICE_LOCATION = {
 }
 
 
+def route_version_query():
+    # Row versions of a route and everything its stop list renders, in one
+    # grouped query over the route_meetings (route_id, stop_order) index
+    return select(
+        Route.id, Route.user_id, Route.updated_at,
+        func.count(RouteMeeting.id), func.max(RouteMeeting.updated_at),
+        func.max(Meeting.updated_at), func.max(Client.updated_at)
+    ).select_from(Route).outerjoin(
+        RouteMeeting, RouteMeeting.route_id == Route.id
+    ).outerjoin(
+        Meeting, Meeting.id == RouteMeeting.meeting_id
+    ).outerjoin(
+        Client, Client.id == Meeting.client_id
+    ).group_by(Route.id, Route.user_id, Route.updated_at)
+
+
+def route_version(row):
+    route_id, user_id, route_updated, stop_count, stops_updated, meetings_updated, clients_updated = row
+    return (route_id, route_updated, stop_count, stops_updated, meetings_updated, clients_updated)
+
+
+def route_details_version(route_id):
+    row = db.session.execute(route_version_query().where(Route.id == route_id)).first()
+    if row is None:
+        return None
+
+    if get_jwt().get("role") != "admin" and row.user_id != int(get_jwt_identity()):
+        return None
+
+    return route_version(row)
+
+
+def user_route_version(user_id, date_str):
+    try:
+        route_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+    row = db.session.execute(
+        route_version_query().join(
+            RoutePlan, RoutePlan.id == Route.plan_id
+        ).where(
+            RoutePlan.route_date == route_date,
+            RoutePlan.status == RoutePlan.STATUS_CURRENT,
+            Route.user_id == user_id,
+            Route.status == 'accepted'
+        )
+    ).first()
+
+    if row is None:
+        return (route_date, None)
+    return route_version(row)
+
+
 @routes_bp.route('/optimize', methods=['POST'])
 @admin_required
 def optimize_routes_week():
@@ -38,29 +94,38 @@ def optimize_routes_week():
         if start_date > end_date:
             return jsonify({'error': 'Start date must be before or equal to end date'}), 400
 
-        optimizer = RouteOptimizationService(OFFICE_LOCATION)
-        all_routes = []
-
-        for day in daterange(start_date, end_date):
-            routes = optimizer.optimize_routes_for_date(day)
-            for r in routes:
-                r.status = 'pending'
-                db.session.add(r)
-                all_routes.append(format_route(r))
-
-        db.session.commit()
+        # Planning runs on the worker; poll the job for progress and results
+        job_service = OptimizationJobService(OFFICE_LOCATION)
+        job, created = job_service.enqueue(start_date, end_date, int(get_jwt_identity()))
 
         return jsonify({
             'success': True,
-            'message': f'Created {len(all_routes)} routes from {start_str} to {end_str}',
-            'routes': all_routes
-        }), 201
+            'message': f'Optimization queued from {start_str} to {end_str}' if created else 'Optimization already queued for this range',
+            'job_id': job.id,
+            'status': job.status,
+            'coalesced': not created,
+            'status_url': f'/routes/jobs/{job.id}'
+        }), 202
 
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Failed to optimize routes: {str(e)}'}), 500
 
 
+@routes_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@admin_required
+def get_optimization_job(job_id):
+    try:
+        job = OptimizationJob.query.get(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 400
+
+        return jsonify({'success': True, 'job': format_job(job)}), 200
+
+    except Exception as e:
+        return jsonify({'error': f'Failed to retrieve job: {str(e)}'}), 500
+
+
 @routes_bp.route('/<int:route_id>/approve', methods=['PUT'])
 @admin_required
 def approve_route(route_id):
@@ -77,6 +142,7 @@ def approve_route(route_id):
 
         route.status = status
         db.session.commit()
+        response_cache.invalidate(f"route:{route_id}", f"routes:{route.route_date.isoformat()}")
 
         return jsonify({
             'success': True,
@@ -102,11 +168,7 @@ def get_routes_by_date(date_str):
         if per_page < 1 or per_page > 100:
             return jsonify({"error": "Per page must be between 1 and 100"}), 400
         
-        pagination = Route.query.filter_by(route_date=route_date).paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        pagination = paginate(current_routes(with_route_relations(Route.query), route_date), Route.id, page, per_page)
         
         routes_data = [format_route(r) for r in pagination.items]
         
@@ -114,16 +176,11 @@ def get_routes_by_date(date_str):
             'success': True,
             'date': date_str,
             'routes': routes_data,
-            'pagination': {
-                'page': pagination.page,
-                'per_page': pagination.per_page,
-                'total': pagination.total,
-                'pages': pagination.pages,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev
-            }
+            'pagination': pagination.info()
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except ValueError:
         return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
     except Exception as e:
@@ -132,9 +189,11 @@ def get_routes_by_date(date_str):
 
 @routes_bp.route('/<int:route_id>', methods=['GET'])
 @owner_or_admin_required
+@conditional_response(route_details_version)
+@cached_response(lambda route_id: ['routes', f'route:{route_id}', 'client-names'])
 def get_route_details(route_id):
     try:
-        route = Route.query.get(route_id)
+        route = with_route_relations(Route.query).filter_by(id=route_id).first()
         if not route:
             return jsonify({'error': 'Route not found'}), 400
         
@@ -144,9 +203,8 @@ def get_route_details(route_id):
         if role != "admin" and route.user_id != current_user_id:
             return jsonify({'error': 'Access denied. You can only view your own routes.'}), 400
 
-        stops = RouteMeeting.query.filter_by(route_id=route_id).order_by(RouteMeeting.stop_order).all()
         route_data = format_route(route)
-        route_data['stops'] = [format_stop(s) for s in stops]
+        route_data['stops'] = [format_stop(s) for s in route.stops]
 
         if route.google_route:
             route_data['google_route'] = format_google_route(route.google_route)
@@ -168,8 +226,10 @@ def delete_route(route_id):
         if not route:
             return jsonify({'error': 'Route not found'}), 400
 
+        cache_tags = [f"route:{route_id}", f"routes:{route.route_date.isoformat()}"]
         db.session.delete(route)
         db.session.commit()
+        response_cache.invalidate(*cache_tags)
         
         return jsonify({
             'success': True,
@@ -183,6 +243,8 @@ def delete_route(route_id):
 
 @routes_bp.route('/user/<int:user_id>/date/<date_str>', methods=['GET'])
 @owner_or_admin_required
+@conditional_response(user_route_version)
+@cached_response(lambda user_id, date_str: ['routes', f'routes:{date_str}'])
 def get_user_route_by_date(user_id, date_str):
     try:
         current_user_id = int(get_jwt_identity())
@@ -192,10 +254,9 @@ def get_user_route_by_date(user_id, date_str):
             return jsonify({'error': 'Access denied. You can only view your own routes.'}), 400
         
         route_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-        route = Route.query.filter_by(
-            user_id=user_id,
-            route_date=route_date,
-            status='accepted'
+        route = current_routes(with_route_relations(Route.query), route_date).filter(
+            Route.user_id == user_id,
+            Route.status == 'accepted'
         ).first()
 
         if not route:
@@ -205,13 +266,12 @@ def get_user_route_by_date(user_id, date_str):
                 'route': None
             }), 200
 
-        stops = RouteMeeting.query.filter_by(route_id=route.id).order_by(RouteMeeting.stop_order).all()
         route_data = {
             'id': route.id,
             'route_type': route.route_type,
             'departure_time': format_time(route.scheduled_departure_time),
             'return_time': format_time(route.scheduled_return_time),
-            'stops': [format_stop_basic(s) for s in stops]
+            'stops': [format_stop_basic(s) for s in route.stops]
         }
 
         return jsonify({'success': True, 'route': route_data}), 200
@@ -3,7 +3,7 @@ from app.models import Task
 from app.db import db
 from datetime import datetime
 from flask_jwt_extended import get_jwt_identity, get_jwt
-from app.utils import admin_required, owner_or_admin_required,salesman_required
+from app.utils import admin_required, owner_or_admin_required,salesman_required, paginate, InvalidCursor, task_serializer
 
 tasks_bp = Blueprint("tasks", __name__)
 
@@ -54,16 +54,7 @@ def add_task():
 
     return jsonify({
         "message": "Task created successfully",
-        "task": {
-            "id": new_task.id,
-            "title": new_task.title,
-            "description": new_task.description,
-            "status": new_task.status,
-            "assigned_to": new_task.assigned_to,
-            "assigned_by": new_task.assigned_by,
-            "due_date": new_task.due_date.isoformat() if new_task.due_date else None,
-            "created_at": new_task.created_at.isoformat()
-        }
+        "task": task_serializer.dump(new_task)
     }), 201
 
 
@@ -79,35 +70,17 @@ def get_all_tasks():
         if per_page < 1 or per_page > 100:
             return jsonify({"error": "Per page must be between 1 and 100"}), 400
         
-        pagination = Task.query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        pagination = paginate(task_serializer.project(Task.query), Task.id, page, per_page)
         
-        tasks_list = [{
-            "id": task.id,
-            "title": task.title,
-            "description": task.description,
-            "status": task.status,
-            "assigned_to": task.assigned_to,
-            "assigned_by": task.assigned_by,
-            "due_date": task.due_date.isoformat() if task.due_date else None,
-            "created_at": task.created_at.isoformat()
-        } for task in pagination.items]
+        tasks_list = task_serializer.dump_many(pagination.items)
         
         return jsonify({
             "tasks": tasks_list,
-            "pagination": {
-                "page": pagination.page,
-                "per_page": pagination.per_page,
-                "total": pagination.total,
-                "pages": pagination.pages,
-                "has_next": pagination.has_next,
-                "has_prev": pagination.has_prev
-            }
+            "pagination": pagination.info()
         }), 200
     
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": f"Failed to retrieve tasks: {str(e)}"}), 500
     
@@ -125,35 +98,17 @@ def get_my_tasks():
         if per_page < 1 or per_page > 100:
             return jsonify({"error": "Per page must be between 1 and 100"}), 400
 
-        pagination = Task.query.filter_by(assigned_to=current_user_id).paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
-
-        tasks_list = [{
-            "id": task.id,
-            "title": task.title,
-            "description": task.description,
-            "status": task.status,
-            "assigned_to": task.assigned_to,
-            "assigned_by": task.assigned_by,
-            "due_date": task.due_date.isoformat() if task.due_date else None,
-            "created_at": task.created_at.isoformat()
-        } for task in pagination.items]
+        pagination = paginate(task_serializer.project(Task.query).filter_by(assigned_to=current_user_id), Task.id, page, per_page)
+
+        tasks_list = task_serializer.dump_many(pagination.items)
 
         return jsonify({
             "tasks": tasks_list,
-            "pagination": {
-                "page": pagination.page,
-                "per_page": pagination.per_page,
-                "total": pagination.total,
-                "pages": pagination.pages,
-                "has_next": pagination.has_next,
-                "has_prev": pagination.has_prev
-            }
+            "pagination": pagination.info()
         }), 200
 
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": f"Failed to retrieve your tasks: {str(e)}"}), 500    
 
@@ -171,16 +126,7 @@ def get_task(task_id):
     if role != "admin" and task.assigned_to != current_user_id:
         return jsonify({"error": "Access denied. You can only view your own tasks."}), 403
     
-    return jsonify({
-        "id": task.id,
-        "title": task.title,
-        "description": task.description,
-        "status": task.status,
-        "assigned_to": task.assigned_to,
-        "assigned_by": task.assigned_by,
-        "due_date": task.due_date.isoformat() if task.due_date else None,
-        "created_at": task.created_at.isoformat()
-    }), 200
+    return jsonify(task_serializer.dump(task)), 200
 
 
 @tasks_bp.route("/update/<int:task_id>", methods=["PUT"])
@@ -221,16 +167,7 @@ def update_task(task_id):
 
     return jsonify({
         "message": "Task updated successfully",
-        "task": {
-            "id": task.id,
-            "title": task.title,
-            "description": task.description,
-            "status": task.status,
-            "assigned_to": task.assigned_to,
-            "assigned_by": task.assigned_by,
-            "due_date": task.due_date.isoformat() if task.due_date else None,
-            "created_at": task.created_at.isoformat()
-        }
+        "task": task_serializer.dump(task)
     }), 200
 
 
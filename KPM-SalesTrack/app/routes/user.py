@@ -5,7 +5,7 @@ import re
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import create_access_token
 from datetime import timedelta
-from app.utils import admin_required, owner_or_admin_required
+from app.utils import admin_required, owner_or_admin_required, paginate, InvalidCursor, user_serializer
 
 bcrypt=Bcrypt()
 
@@ -83,16 +83,7 @@ def add_users():
     return jsonify({
         "message": "User created successfully",
         "token": access_token,
-        "user": {
-            "id": new_user.id,
-            "first_name": new_user.first_name,
-            "last_name": new_user.last_name,
-            "email": new_user.email,
-            "phone_number": new_user.phone_number,
-            "role": new_user.role,
-            "is_active": new_user.is_active,
-            "created_at": new_user.created_at.isoformat() if new_user.created_at else None
-        }
+        "user": user_serializer.dump(new_user)
     }), 201
 
 
@@ -144,16 +135,7 @@ def get_user(user_id):
     if not user:
         return jsonify({"error": "User not found"}), 404
 
-    return jsonify({
-        "id": user.id,
-        "first_name": user.first_name,
-        "last_name": user.last_name,
-        "email": user.email,
-        "phone_number": user.phone_number,
-        "role": user.role,
-        "is_active": user.is_active,
-        "created_at": user.created_at.isoformat() if user.created_at else None
-    }), 200
+    return jsonify(user_serializer.dump(user)), 200
 
 @users_bp.route("/GetAll", methods=["GET"])
 @admin_required
@@ -167,35 +149,17 @@ def get_all_users():
         if per_page < 1 or per_page > 100:
             return jsonify({"error": "Per page must be between 1 and 100"}), 400
 
-        pagination = User.query.filter(User.role != 'admin').paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        pagination = paginate(user_serializer.project(User.query).filter(User.role != 'admin'), User.id, page, per_page)
 
-        users_list = [{
-            "id": user.id,
-            "first_name": user.first_name,
-            "last_name": user.last_name,
-            "email": user.email,
-            "phone_number": user.phone_number,
-            "role": user.role,
-            "is_active": user.is_active,
-            "created_at": user.created_at.isoformat() if user.created_at else None
-        } for user in pagination.items]
+        users_list = user_serializer.dump_many(pagination.items)
 
         return jsonify({
             "users": users_list,
-            "pagination": {
-                "page": pagination.page,
-                "per_page": pagination.per_page,
-                "total": pagination.total,
-                "pages": pagination.pages,
-                "has_next": pagination.has_next,
-                "has_prev": pagination.has_prev
-            }
+            "pagination": pagination.info()
         }), 200
 
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": f"Failed to retrieve users: {str(e)}"}), 500
 
@@ -234,16 +198,7 @@ def updated_user(user_id):
 
     return jsonify({
         "message": "User updated successfully",
-        "user": {
-            "id": user.id,
-            "first_name": user.first_name,
-            "last_name": user.last_name,
-            "email": user.email,
-            "phone_number": user.phone_number,
-            "role": user.role,
-            "is_active": user.is_active,
-            "created_at": user.created_at.isoformat() if user.created_at else None
-        }
+        "user": user_serializer.dump(user)
     }), 200
 
 @users_bp.route("/<int:user_id>/Active", methods=["PUT"])
@@ -259,16 +214,7 @@ def active_user(user_id):
 
     return jsonify({
         "message": "User is Active",
-        "user": {
-            "id": user.id,
-            "first_name": user.first_name,
-            "last_name": user.last_name,
-            "email": user.email,
-            "phone_number": user.phone_number,
-            "role": user.role,
-            "is_active": user.is_active,
-            "created_at": user.created_at.isoformat() if user.created_at else None
-        }
+        "user": user_serializer.dump(user)
     }), 200
 
 @users_bp.route("/<int:user_id>/Inactive", methods=["PUT"])
@@ -284,14 +230,5 @@ def inactive_user(user_id):
 
     return jsonify({
         "message": "User is Inactive",
-        "user": {
-            "id": user.id,
-            "first_name": user.first_name,
-            "last_name": user.last_name,
-            "email": user.email,
-            "phone_number": user.phone_number,
-            "role": user.role,
-            "is_active": user.is_active,
-            "created_at": user.created_at.isoformat() if user.created_at else None
-        }
+        "user": user_serializer.dump(user)
     }), 200
\ No newline at end of file
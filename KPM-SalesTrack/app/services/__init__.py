@@ -1 +1,5 @@
-from .route_optimizer import RouteOptimizationService
\ No newline at end of file
+from .route_optimizer import RouteOptimizationService
+from .optimization_jobs import OptimizationJobService
+from .route_dirty_tracker import RouteDirtyTracker
+from .route_plans import RoutePlanService
+from .nearby_clients import NearbyClientsService
\ No newline at end of file
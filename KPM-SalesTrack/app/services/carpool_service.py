@@ -1,72 +1,175 @@
+import math
+from bisect import bisect_left, insort
+from datetime import timedelta
+from app.utils import geo
+
+
 class CarpoolService:
-    
+
     def __init__(self):
         self.max_passengers = 4
         self.min_gap_minutes = 45
-    
+        # Reps whose meetings centre in the same or a neighbouring cell may share a car
+        self.cell_size_km = 3
+        # Only the closest candidates around each seed are tried
+        self.max_candidates = 50
+
     def find_carpool_groups(self, user_meetings):
-        
-        user_ids = list(user_meetings.keys())
+
+        centres = {}
+        for user_id in user_meetings:
+            centres[user_id] = self.meeting_centre(user_meetings[user_id])
+
+        scale = self.grid_scale(centres)
+        grid = self.build_grid(centres, scale)
+
+        # Sorted meeting times per rep, built once for the whole pass
+        timelines = {}
+        spaced = {}
+        for user_id in user_meetings:
+            timelines[user_id] = sorted(m.scheduled_time for m in user_meetings[user_id])
+            spaced[user_id] = self.is_spaced(timelines[user_id])
+
+        # Sweep reps in order of their first meeting so each group is seeded by
+        # the earliest rep still free
+        sweep_order = sorted(user_meetings.keys(), key=lambda user_id: timelines[user_id][0])
+
         groups = []
-        users_already_grouped = []
-        
-        # Loop through each user
-        for i in range(len(user_ids)):
-            user1_id = user_ids[i]
-            
+        users_already_grouped = set()
+
+        for user1_id in sweep_order:
+
             # Skip if already in a group
             if user1_id in users_already_grouped:
                 continue
 
-            
+
             # Start new group
             group = {'users': [user1_id]}
-            users_already_grouped.append(user1_id)
-            
-            # Try to find carpoolers
-            for j in range(i + 1, len(user_ids)):
-                user2_id = user_ids[j]
-                
-                if user2_id in users_already_grouped:
+            group_timeline = list(timelines[user1_id])
+            users_already_grouped.add(user1_id)
+
+            # A rep whose own meetings are too close together cannot share
+            if not spaced[user1_id]:
+                groups.append(group)
+                continue
+
+            # Try to find carpoolers, closest first
+            for user2_id in self.nearby_users(user1_id, centres, grid, scale, users_already_grouped):
+
+                if not spaced[user2_id]:
                     continue
-                
-                # Check if compatible
-                user1_meetings = user_meetings[user1_id]
-                user2_meetings = user_meetings[user2_id]
-                can_share = self.can_carpool_together(user1_meetings, user2_meetings)
-                
+
+                # Check against everyone already in the car
+                can_share = self.fits_timeline(group_timeline, timelines[user2_id])
+
                 if can_share == True:
                     group['users'].append(user2_id)
-                    users_already_grouped.append(user2_id)
-                    
+                    users_already_grouped.add(user2_id)
+
+                    # Grow the car's timeline in place
+                    for scheduled_time in timelines[user2_id]:
+                        insort(group_timeline, scheduled_time)
+
                     # Max 4 people
                     if len(group['users']) >= self.max_passengers:
                         break
-            
+
             groups.append(group)
-        
+
         return groups
-    
+
+    def meeting_centre(self, meetings):
+        lat = 0.0
+        lng = 0.0
+        for meeting in meetings:
+            lat += meeting.location['coordinates'][1]
+            lng += meeting.location['coordinates'][0]
+        return (lat / len(meetings), lng / len(meetings))
+
+    def grid_scale(self, centres):
+        cell_lat = self.cell_size_km / 111.32
+
+        # One longitude scale for the whole day keeps the cells aligned
+        mean_lat = sum(c[0] for c in centres.values()) / len(centres) if centres else 0.0
+        cell_lng = self.cell_size_km / (111.32 * max(math.cos(math.radians(mean_lat)), 0.01))
+
+        return (cell_lat, cell_lng)
+
+    def build_grid(self, centres, scale):
+        grid = {}
+        for user_id, centre in centres.items():
+            cell = self.grid_cell(centre, scale)
+            if cell not in grid:
+                grid[cell] = []
+            grid[cell].append(user_id)
+        return grid
+
+    def grid_cell(self, centre, scale):
+        return (math.floor(centre[0] / scale[0]), math.floor(centre[1] / scale[1]))
+
+    def nearby_users(self, user_id, centres, grid, scale, exclude):
+        row, col = self.grid_cell(centres[user_id], scale)
+
+        candidates = []
+        for d_row in (-1, 0, 1):
+            for d_col in (-1, 0, 1):
+                for other_id in grid.get((row + d_row, col + d_col), []):
+                    if other_id not in exclude:
+                        candidates.append(other_id)
+
+        origin = centres[user_id]
+        candidates.sort(key=lambda other_id: self.centre_distance_km(origin, centres[other_id]))
+        return candidates[:self.max_candidates]
+
+    def centre_distance_km(self, a, b):
+        # Equirectangular is plenty for ranking reps a few km apart
+        return geo.equirectangular(a[0], a[1], b[0], b[1]) / 1000
+
     def can_carpool_together(self, meetings1, meetings2):
-        # Get all meeting times
-        all_times = []
-        for meeting in meetings1:
-            all_times.append(meeting.scheduled_time)
-        for meeting in meetings2:
-            all_times.append(meeting.scheduled_time)
-        
-        # Sort times
-        all_times.sort()
-        
-        # Check gaps
-        for i in range(len(all_times) - 1):
-            time1 = all_times[i]
-            time2 = all_times[i + 1]
-            
-            time_diff = time2 - time1
-            minutes = time_diff.total_seconds() / 60
-            
-            if minutes < self.min_gap_minutes:
+        times1 = sorted(m.scheduled_time for m in meetings1)
+        times2 = sorted(m.scheduled_time for m in meetings2)
+        return self.timelines_compatible(times1, times2)
+
+    def is_spaced(self, times):
+        min_gap = timedelta(minutes=self.min_gap_minutes)
+        for i in range(len(times) - 1):
+            if times[i + 1] - times[i] < min_gap:
                 return False
-        
-        return True
\ No newline at end of file
+        return True
+
+    def timelines_compatible(self, times1, times2):
+        # Walk both sorted timelines once, checking each gap in merged order
+        min_gap = timedelta(minutes=self.min_gap_minutes)
+        i = 0
+        j = 0
+        previous = None
+
+        while i < len(times1) or j < len(times2):
+            if j >= len(times2) or (i < len(times1) and times1[i] <= times2[j]):
+                current = times1[i]
+                i += 1
+            else:
+                current = times2[j]
+                j += 1
+
+            if previous is not None and current - previous < min_gap:
+                return False
+            previous = current
+
+        return True
+
+    def fits_timeline(self, group_times, candidate_times):
+        # The group's timeline is already spaced and so is the candidate's, so
+        # only the neighbours each candidate time would land between matter
+        min_gap = timedelta(minutes=self.min_gap_minutes)
+
+        for scheduled_time in candidate_times:
+            position = bisect_left(group_times, scheduled_time)
+
+            if position > 0 and scheduled_time - group_times[position - 1] < min_gap:
+                return False
+            if position < len(group_times) and group_times[position] - scheduled_time < min_gap:
+                return False
+
+        return True
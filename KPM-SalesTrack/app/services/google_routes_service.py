@@ -1,12 +1,53 @@
 import os
-import requests
 import hashlib
 import json
-from app.models import GoogleRoute
+import threading
+from sqlalchemy.exc import IntegrityError
+from app.models import GoogleRoute, GoogleRouteLeg
 from app.db import db
+from app.utils import get_http_client, LRUCache
+
+# Bump when the request or the key layout changes so old rows stop matching
+ROUTE_KEY_VERSION = 'v2'
+# Four decimals is about 11 m, well inside a geocoder's own jitter
+COORDINATE_PRECISION = 4
+
+# Route key -> google_routes.id, shared by every day worker in the process
+_route_ids = LRUCache(maxsize=int(os.getenv("GOOGLE_ROUTE_CACHE_SIZE", "2048")))
+_lookups = {'memory': 0, 'database': 0, 'api': 0}
+_lookups_lock = threading.Lock()
+
+
+def parse_duration(value):
+    # The Routes API sends durations as strings like "1234s" or "12.5s"
+    return int(float((value or '0s').rstrip('s')))
+
+
+def count_lookup(source):
+    with _lookups_lock:
+        _lookups[source] += 1
+
+
+def google_route_cache_stats():
+    with _lookups_lock:
+        counts = dict(_lookups)
+
+    total = counts['memory'] + counts['database'] + counts['api']
+    counts['lookups'] = total
+    counts['hit_rate'] = round((counts['memory'] + counts['database']) / total, 4) if total else 0.0
+    counts['cached_keys'] = len(_route_ids)
+    return counts
 
 
 class GoogleRoutesService:
+
+    travel_mode = 'DRIVE'
+    routing_preference = 'TRAFFIC_AWARE'
+    route_modifiers = {
+        'avoidTolls': False,
+        'avoidHighways': False,
+        'avoidFerries': True
+    }
     
     def __init__(self, office_location):
         self.office_location = office_location
@@ -14,17 +55,27 @@ class GoogleRoutesService:
     
     def get_or_create_route(self, meetings):
 
-        # Create hash for these waypoints
-        waypoint_hash = self.create_waypoints_hash(meetings)
+        route_key = self.create_route_key(meetings)
+
+        route_id = _route_ids.get(route_key)
+        if route_id is not None:
+            existing = db.session.get(GoogleRoute, route_id)
+            if existing is not None:
+                count_lookup('memory')
+                return existing
+            # Row went away with a rolled-back run
+            _route_ids.delete(route_key)
         
-        # Check if already exists
-        existing = GoogleRoute.query.filter_by(waypoints_hash=waypoint_hash).first()
+        existing = GoogleRoute.query.filter_by(waypoints_hash=route_key).first()
         if existing is not None:
+            count_lookup('database')
+            _route_ids.set(route_key, existing.id)
             print(f"Reusing Google route {existing.id}")
             return existing
         
 
         print("Calling Google Routes API...")
+        count_lookup('api')
         api_response = self.call_google_api(meetings)
         
         if api_response is None:
@@ -34,21 +85,60 @@ class GoogleRoutesService:
             return None
         
         # Save to database
-        return self.save_google_route(api_response, waypoint_hash)
+        google_route = self.save_google_route(api_response, route_key)
+        _route_ids.set(route_key, google_route.id)
+        return google_route
     
-    def create_waypoints_hash(self, meetings):
+    def get_legs(self, google_route):
 
-        waypoints = []
-        sorted_meetings = sorted(meetings, key=lambda m: m.id)
-        
-        for meeting in sorted_meetings:
-            lat = meeting.location['coordinates'][1]
-            lng = meeting.location['coordinates'][0]
-            waypoints.append({'lat': lat, 'lng': lng})
+        legs = []
+        for leg in google_route.legs:
+            legs.append({
+                'distance_meters': leg.distance_meters,
+                'duration_seconds': leg.duration_seconds
+            })
+
+        if len(legs) == 0:
+            # Stored before legs were split out and not backfilled yet
+            for leg in self.build_legs(google_route.raw_response):
+                legs.append({
+                    'distance_meters': leg.distance_meters,
+                    'duration_seconds': leg.duration_seconds
+                })
+        return legs
+
+    def build_legs(self, api_response):
+
+        legs = []
+        for index, leg in enumerate(api_response['routes'][0].get('legs', [])):
+            legs.append(GoogleRouteLeg(
+                leg_index=index,
+                distance_meters=leg.get('distanceMeters', 0),
+                duration_seconds=parse_duration(leg.get('duration')),
+                encoded_polyline=leg.get('polyline', {}).get('encodedPolyline')
+            ))
+        return legs
+    
+    def create_route_key(self, meetings):
+
+        # Office out, stops in visiting order, office back, plus every request
+        # option that changes the answer. Coordinates are quantized so the same
+        # client under a new meeting id (or a re-geocoded address) still matches
+        def point(location):
+            lng, lat = location['coordinates'][0], location['coordinates'][1]
+            return [round(lat, COORDINATE_PRECISION), round(lng, COORDINATE_PRECISION)]
+
+        key = {
+            'version': ROUTE_KEY_VERSION,
+            'travel_mode': self.travel_mode,
+            'routing_preference': self.routing_preference,
+            'modifiers': self.route_modifiers,
+            'office': point(self.office_location),
+            'waypoints': [point(meeting.location) for meeting in meetings]
+        }
         
-        waypoint_json = json.dumps(waypoints, sort_keys=True)
-        hash_value = hashlib.md5(waypoint_json.encode()).hexdigest()
-        return hash_value
+        key_json = json.dumps(key, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(key_json.encode()).hexdigest()
     
     def call_google_api(self, meetings):
 
@@ -89,14 +179,10 @@ class GoogleRoutesService:
                 }
             },
             'intermediates': waypoints,
-            'travelMode': 'DRIVE',
-            'routingPreference': 'TRAFFIC_AWARE',
+            'travelMode': self.travel_mode,
+            'routingPreference': self.routing_preference,
             'computeAlternativeRoutes': False,
-            'routeModifiers': {
-                'avoidTolls': False,
-                'avoidHighways': False,
-                'avoidFerries': True
-            },
+            'routeModifiers': dict(self.route_modifiers),
             'languageCode': 'en-US',
             'units': 'METRIC'
         }
@@ -109,7 +195,7 @@ class GoogleRoutesService:
                 'X-Goog-FieldMask': 'routes.duration,routes.distanceMeters,routes.polyline.encodedPolyline,routes.legs'
             }
             
-            response = requests.post(url, headers=headers, json=request_data)
+            response = get_http_client('google_routes').post(url, headers=headers, json=request_data)
             
             if response.status_code != 200:
                 print(f"API error: {response.status_code}")
@@ -121,13 +207,12 @@ class GoogleRoutesService:
             print(f"Google API error: {e}")
             return None
     
-    def save_google_route(self, api_response, waypoint_hash):
+    def save_google_route(self, api_response, route_key):
 
         route_data = api_response['routes'][0]
         
         distance = route_data['distanceMeters']
-        duration_str = route_data['duration']
-        duration_seconds = int(duration_str.replace('s', ''))
+        duration_seconds = parse_duration(route_data['duration'])
         polyline = route_data['polyline']['encodedPolyline']
         
         google_route = GoogleRoute(
@@ -135,11 +220,20 @@ class GoogleRoutesService:
             total_distance_meters=distance,
             total_duration_seconds=duration_seconds,
             encoded_polyline=polyline,
-            waypoints_hash=waypoint_hash
+            waypoints_hash=route_key,
+            legs=self.build_legs(api_response)
         )
         
-        db.session.add(google_route)
-        db.session.commit()
+        # Part of the optimization run's transaction; flush only to get the id.
+        # Another day's worker may have stored the same waypoints meanwhile, in
+        # which case the unique hash index rejects ours and we reuse theirs
+        try:
+            with db.session.begin_nested():
+                db.session.add(google_route)
+        except IntegrityError:
+            existing = GoogleRoute.query.filter_by(waypoints_hash=route_key).first()
+            print(f"Reusing Google route {existing.id}")
+            return existing
         
         print(f"Created Google route {google_route.id}")
         return google_route
\ No newline at end of file
@@ -0,0 +1,54 @@
+import numpy as np
+from sqlalchemy import select, or_
+from app.db import db
+from app.models import Client
+from app.utils import geohash, geo, geohash_prefix_filter
+
+
+class NearbyClientsService:
+
+    def __init__(self, assigned_to=None):
+        # None searches every client (admins)
+        self.assigned_to = assigned_to
+
+    def candidates(self, lat, lng, radius_meters):
+        # Prefix ranges on the clients geohash index covering the circle's
+        # box, trimmed to the box itself; only ids and positions come back
+        min_lat, min_lng, max_lat, max_lng = geo.bounding_box(lat, lng, radius_meters)
+        table = Client.__table__
+        ranges = [
+            geohash_prefix_filter(table.c.geohash, cell)
+            for cell in geohash.covering(min_lat, min_lng, max_lat, max_lng)
+        ]
+        query = select(table.c.id, table.c.lat, table.c.lng).where(
+            or_(*ranges),
+            table.c.lat.between(min_lat, max_lat),
+            table.c.lng.between(min_lng, max_lng)
+        )
+        if self.assigned_to is not None:
+            query = query.where(table.c.assigned_to == self.assigned_to)
+        return db.session.execute(query).all()
+
+    def nearest(self, lat, lng, radius_meters, limit):
+        # [(client id, distance in metres)], closest first, within the radius
+        rows = self.candidates(lat, lng, radius_meters)
+        if len(rows) == 0:
+            return []
+
+        points = np.array([(row.lat, row.lng) for row in rows], dtype=float)
+        distances = geo.haversine_array(lat, lng, points[:, 0], points[:, 1])
+        inside = np.flatnonzero(distances <= radius_meters)
+        if len(inside) > limit:
+            inside = inside[np.argpartition(distances[inside], limit - 1)[:limit]]
+        inside = inside[np.argsort(distances[inside], kind='stable')]
+
+        return [(rows[i].id, float(distances[i])) for i in inside]
+
+    def search(self, lat, lng, radius_meters, limit):
+        # [(Client, distance in metres)] for the k nearest
+        nearest = self.nearest(lat, lng, radius_meters, limit)
+        if len(nearest) == 0:
+            return []
+
+        clients = {client.id: client for client in Client.query.filter(Client.id.in_([client_id for client_id, _ in nearest]))}
+        return [(clients[client_id], distance) for client_id, distance in nearest if client_id in clients]
@@ -0,0 +1,220 @@
+import os
+from datetime import datetime, timedelta, date
+from sqlalchemy import or_, and_
+from sqlalchemy.exc import IntegrityError
+from app.models import OptimizationJob
+from app.db import db
+from app.utils import daterange, response_cache
+from .route_optimizer import RouteOptimizationService
+from .google_routes_service import google_route_cache_stats
+from .route_batch import RouteBatch
+from .route_dirty_tracker import RouteDirtyTracker
+from .route_plans import RoutePlanService
+
+
+class JobLeaseLost(Exception):
+    pass
+
+
+class OptimizationJobService:
+
+    def __init__(self, office_location):
+        self.office_location = office_location
+        # Longer than any single day takes to plan
+        self.lease_seconds = int(os.getenv("OPTIMIZATION_JOB_LEASE_SECONDS", "900"))
+
+    def enqueue(self, start_date, end_date, requested_by=None):
+
+        # Re-submitting a range that is still queued or running returns that job
+        active_key = f"{start_date.isoformat()}:{end_date.isoformat()}"
+
+        existing = OptimizationJob.query.filter_by(active_key=active_key).first()
+        if existing is not None:
+            return existing, False
+
+        job = OptimizationJob(
+            start_date=start_date,
+            end_date=end_date,
+            status=OptimizationJob.STATUS_QUEUED,
+            active_key=active_key,
+            progress={'total_days': len(daterange(start_date, end_date)), 'days': []},
+            requested_by=requested_by
+        )
+        db.session.add(job)
+
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another request enqueued the same range first
+            db.session.rollback()
+            return OptimizationJob.query.filter_by(active_key=active_key).first(), False
+
+        return job, True
+
+    def claim_next(self):
+
+        # SKIP LOCKED lets several workers poll the same table safely
+        job = OptimizationJob.query.filter_by(
+            status=OptimizationJob.STATUS_QUEUED
+        ).order_by(OptimizationJob.id).with_for_update(skip_locked=True).first()
+
+        if job is None:
+            db.session.rollback()
+            return None
+
+        now = datetime.utcnow()
+        job.status = OptimizationJob.STATUS_RUNNING
+        job.started_at = now
+        job.heartbeat_at = now
+        db.session.commit()
+        return job
+
+    def heartbeat(self, job_id, started_at):
+
+        # started_at identifies this claim: once the job is requeued and
+        # claimed again it changes, and the old worker must stop writing
+        renewed = OptimizationJob.query.filter_by(
+            id=job_id,
+            status=OptimizationJob.STATUS_RUNNING,
+            started_at=started_at
+        ).update({'heartbeat_at': datetime.utcnow()}, synchronize_session=False)
+
+        if renewed == 0:
+            raise JobLeaseLost(f"Optimization job {job_id} was requeued after its lease expired")
+
+    def requeue_stale(self):
+
+        # Jobs whose worker stopped renewing the lease go back on the queue.
+        # active_key stays set, so resubmissions keep folding into them
+        cutoff = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        stale = OptimizationJob.query.filter(
+            OptimizationJob.status == OptimizationJob.STATUS_RUNNING,
+            or_(
+                OptimizationJob.heartbeat_at < cutoff,
+                and_(OptimizationJob.heartbeat_at.is_(None), OptimizationJob.started_at < cutoff)
+            )
+        ).with_for_update(skip_locked=True).all()
+
+        for job in stale:
+            job.status = OptimizationJob.STATUS_QUEUED
+            job.started_at = None
+            job.heartbeat_at = None
+        db.session.commit()
+        return len(stale)
+
+    def run_next(self):
+        job = self.claim_next()
+        if job is None:
+            return False
+
+        self.run(job)
+        return True
+
+    def run(self, job):
+        dates = daterange(job.start_date, job.end_date)
+        job_id = job.id
+        lease = job.started_at
+
+        def on_day_done(day):
+            progress = dict(job.progress or {})
+            progress['total_days'] = len(dates)
+            progress['days'] = list(progress.get('days', [])) + [day]
+            job.progress = progress
+            self.heartbeat(job_id, lease)
+            db.session.commit()
+
+        lookups_before = google_route_cache_stats()
+
+        try:
+            optimizer = RouteOptimizationService(self.office_location)
+            routes, days = optimizer.optimize_routes(dates, status='pending', on_day_done=on_day_done, run_id=f'job-{job_id}')
+            # Before touching the job, which autoflushes on the next query
+            self.heartbeat(job_id, lease)
+
+            failed_days = [d for d in days if d['status'] == 'failed']
+            if len(days) > 0 and len(failed_days) == len(days):
+                job.status = OptimizationJob.STATUS_FAILED
+                job.error = 'Failed to optimize routes for every day in the range'
+            else:
+                job.status = OptimizationJob.STATUS_COMPLETED
+
+            job.result = {
+                'routes': len(routes),
+                'route_ids': [r.id for r in routes],
+                'failed_days': [d['date'] for d in failed_days],
+                'google_routes': self.route_lookups_since(lookups_before)
+            }
+
+        except JobLeaseLost as e:
+            # Another worker owns the job now
+            db.session.rollback()
+            print(e)
+            return None
+
+        except Exception as e:
+            db.session.rollback()
+            job = OptimizationJob.query.get(job_id)
+            if job.status != OptimizationJob.STATUS_RUNNING or job.started_at != lease:
+                return None
+            job.status = OptimizationJob.STATUS_FAILED
+            job.error = str(e)
+
+        job.active_key = None
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        return job
+
+    def route_lookups_since(self, before):
+
+        # How this run's Google routes were found; counters are per process
+        after = google_route_cache_stats()
+        counts = {source: after[source] - before[source] for source in ('memory', 'database', 'api')}
+        total = sum(counts.values())
+        counts['hit_rate'] = round((counts['memory'] + counts['database']) / total, 4) if total else 0.0
+        return counts
+
+    def reoptimize_dirty(self, limit=100):
+        tracker = RouteDirtyTracker()
+        marks = tracker.claim(limit)
+        if len(marks) == 0:
+            return 0
+
+        marks_by_date = {}
+        for mark in marks:
+            if mark['route_date'] not in marks_by_date:
+                marks_by_date[mark['route_date']] = []
+            marks_by_date[mark['route_date']].append(mark)
+
+        optimizer = RouteOptimizationService(self.office_location)
+        plans = RoutePlanService().current_plans(list(marks_by_date))
+        today = date.today()
+        replanned = 0
+
+        for route_date in sorted(marks_by_date):
+            date_marks = marks_by_date[route_date]
+            user_ids = sorted({mark['user_id'] for mark in date_marks})
+
+            # Past days and days nobody has optimized yet are left alone
+            plan = plans.get(route_date)
+            if route_date < today or plan is None:
+                tracker.release(date_marks)
+                db.session.commit()
+                continue
+
+            try:
+                batch = RouteBatch()
+                optimizer.reoptimize_users(route_date, user_ids, batch, plan.id)
+                # Routes keep the status reoptimize_users gave them
+                route_ids = batch.flush(None, {route_date: plan.id})
+                tracker.release(date_marks)
+                db.session.commit()
+                response_cache.invalidate('routes')
+                replanned += len(date_marks)
+                print(f"Re-optimized {len(route_ids)} routes for {route_date} (users {user_ids})")
+
+            except Exception as e:
+                # The claim expires and the marks are retried on a later pass
+                db.session.rollback()
+                print(f"Failed to re-optimize routes for {route_date}: {e}")
+
+        return replanned
@@ -0,0 +1,70 @@
+from sqlalchemy import insert
+from app.models import Route, RouteMeeting
+from app.db import db
+
+
+class RouteBatch:
+
+    def __init__(self):
+        self.routes = []
+
+    def add_route(self, values, stops, lead=None):
+        planned = {
+            'id': None,
+            'values': values,
+            'stops': stops,
+            'lead': lead
+        }
+        self.routes.append(planned)
+        return planned
+
+    def merge(self, other):
+        self.routes.extend(other.routes)
+        other.routes = []
+
+    def flush(self, status=None, plan_ids=None):
+        if len(self.routes) == 0:
+            return []
+
+        for planned in self.routes:
+            if status is not None:
+                planned['values']['status'] = status
+            # Each route joins the plan for its day
+            if plan_ids is not None:
+                planned['values']['plan_id'] = plan_ids[planned['values']['route_date']]
+
+        # Leads first so passengers can point at them
+        leads = [p for p in self.routes if p['lead'] is None]
+        passengers = [p for p in self.routes if p['lead'] is not None]
+
+        self.insert_routes(leads)
+        for planned in passengers:
+            planned['values']['shared_with_route_id'] = planned['lead']['id']
+        self.insert_routes(passengers)
+
+        stop_rows = []
+        for planned in self.routes:
+            for stop in planned['stops']:
+                row = dict(stop)
+                row['route_id'] = planned['id']
+                stop_rows.append(row)
+
+        if len(stop_rows) > 0:
+            db.session.execute(insert(RouteMeeting), stop_rows)
+
+        route_ids = [p['id'] for p in self.routes]
+        self.routes = []
+        return route_ids
+
+    def insert_routes(self, planned_routes):
+        if len(planned_routes) == 0:
+            return
+
+        rows = [p['values'] for p in planned_routes]
+
+        # One multi-row INSERT ... RETURNING per batch, ids in parameter order
+        statement = insert(Route).returning(Route.id, sort_by_parameter_order=True)
+        result = db.session.execute(statement, rows)
+
+        for planned, route_id in zip(planned_routes, result.scalars()):
+            planned['id'] = route_id
@@ -1,8 +1,7 @@
 from datetime import timedelta
-from app.models import Route
-from app.db import db
 from .google_routes_service import GoogleRoutesService
 from .stop_creator import StopCreator
+from .stop_order_solver import StopOrderSolver
 
 
 class RouteCreator:
@@ -11,109 +10,114 @@ class RouteCreator:
         self.office_location = office_location
         self.google_service = GoogleRoutesService(office_location)
         self.stop_creator = StopCreator()
+        self.solver = StopOrderSolver()
         self.buffer_minutes = 15
     
-    def create_individual_route(self, meetings):
+    def create_individual_route(self, meetings, batch, matrix=None):
         if len(meetings) == 0:
             return None
         
 
-        sorted_meetings = sorted(meetings, key=lambda m: m.scheduled_time) 
+        ordered_meetings, solution = self.order_stops(meetings, matrix)
         
         # Get Google route
-        google_route = self.google_service.get_or_create_route(sorted_meetings)
+        google_route = self.google_service.get_or_create_route(ordered_meetings)
         if google_route is None:
             return None
         
         # Calculate times
-        departure = self.calculate_departure_time(sorted_meetings, google_route)
-        return_time = self.calculate_return_time(sorted_meetings, google_route)
-        
-        route = Route(
-            user_id=sorted_meetings[0].user_id,
-            route_date=sorted_meetings[0].scheduled_date,
-            google_route_id=google_route.id,
-            route_type='individual',
-            scheduled_departure_time=departure,
-            scheduled_return_time=return_time,
-            status='optimized'
+        legs, schedule, departure, return_time = self.calculate_times(ordered_meetings, google_route, solution)
+        
+        values = self.route_values(
+            ordered_meetings[0].user_id,
+            ordered_meetings[0].scheduled_date,
+            google_route,
+            'individual',
+            departure,
+            return_time
         )
+        stops = self.stop_creator.build_stops(departure, ordered_meetings, legs, schedule)
         
-        db.session.add(route)
-        db.session.commit()
-        
-
-        self.stop_creator.create_stops_for_route(route, sorted_meetings, google_route)
-        
-        return route
+        return batch.add_route(values, stops)
     
-    def create_shared_routes(self, all_meetings, user_ids):
+    def create_shared_routes(self, all_meetings, user_ids, batch, matrix=None):
 
         if len(all_meetings) == 0:
             return []
         
 
-        sorted_meetings = sorted(all_meetings, key=lambda m: m.scheduled_time)
+        ordered_meetings, solution = self.order_stops(all_meetings, matrix)
         
 
-        google_route = self.google_service.get_or_create_route(sorted_meetings)
+        google_route = self.google_service.get_or_create_route(ordered_meetings)
         if google_route is None:
             return []
         
 
-        departure = self.calculate_departure_time(sorted_meetings, google_route)
-        return_time = self.calculate_return_time(sorted_meetings, google_route)
-        route_date = sorted_meetings[0].scheduled_date
+        legs, schedule, departure, return_time = self.calculate_times(ordered_meetings, google_route, solution)
+        route_date = ordered_meetings[0].scheduled_date
         
         routes = []
         
-        lead_route = Route(
-            user_id=user_ids[0],
-            route_date=route_date,
-            google_route_id=google_route.id,
-            route_type='shared',
-            lead_route_id=None,
-            scheduled_departure_time=departure,
-            scheduled_return_time=return_time,
-            status='optimized'
-        )
-        
-        db.session.add(lead_route)
-        db.session.commit()
-        
-
-        self.stop_creator.create_stops_for_route(lead_route, sorted_meetings, google_route)
+        lead_values = self.route_values(user_ids[0], route_date, google_route, 'shared', departure, return_time)
+        lead_stops = self.stop_creator.build_stops(departure, ordered_meetings, legs, schedule)
+        lead_route = batch.add_route(lead_values, lead_stops)
         routes.append(lead_route)
         
 
         for i in range(1, len(user_ids)):
             passenger_id = user_ids[i]
             
-            user_meetings = []
-            for meeting in sorted_meetings:
-                if meeting.user_id == passenger_id:
-                    user_meetings.append(meeting)
-            
-            passenger_route = Route(
-                user_id=passenger_id,
-                route_date=route_date,
-                google_route_id=google_route.id,
-                route_type='shared',
-                lead_route_id=lead_route.id,
-                scheduled_departure_time=departure,
-                scheduled_return_time=return_time,
-                status='optimized'
-            )
-            
-            db.session.add(passenger_route)
-            db.session.commit()
+            # Keep the shared car's legs and times for the passenger's own stops
+            positions = []
+            for k in range(len(ordered_meetings)):
+                if ordered_meetings[k].user_id == passenger_id:
+                    positions.append(k)
+
+            user_meetings = [ordered_meetings[k] for k in positions]
+            user_legs = [legs[k] for k in positions] + legs[len(ordered_meetings):]
+            user_schedule = [schedule[k] for k in positions] if schedule is not None else None
             
-            self.stop_creator.create_stops_for_route(passenger_route, user_meetings, google_route)
-            routes.append(passenger_route)
+            passenger_values = self.route_values(passenger_id, route_date, google_route, 'shared', departure, return_time)
+            passenger_stops = self.stop_creator.build_stops(departure, user_meetings, user_legs, user_schedule)
+            routes.append(batch.add_route(passenger_values, passenger_stops, lead=lead_route))
         
         return routes
     
-    def calculate_departure_time(self, meetings, google_route):
+    def route_values(self, user_id, route_date, google_route, route_type, departure, return_time):
+        return {
+            'user_id': user_id,
+            'route_date': route_date,
+            'google_route_id': google_route.id,
+            'route_type': route_type,
+            'shared_with_route_id': None,
+            'scheduled_departure_time': departure,
+            'scheduled_return_time': return_time,
+            'status': 'optimized'
+        }
+    
+    def order_stops(self, meetings, matrix):
+
+        if matrix is None:
+            return sorted(meetings, key=lambda m: m.scheduled_time), None
+
+        solution = self.solver.solve(meetings, matrix)
+        return solution.meetings, solution
+    
+    def calculate_times(self, meetings, google_route, solution):
+
+        # Timings come from the solved schedule on the day's travel matrix when
+        # there is one; the Google route is then only needed for its polyline
+        if solution is not None:
+            departure = solution.office_departure - timedelta(minutes=self.buffer_minutes)
+            return solution.legs, solution.schedule(), departure, solution.office_return
+
+        legs = self.google_service.get_legs(google_route)
+        departure = self.calculate_departure_time(meetings, legs)
+        return_time = self.calculate_return_time(meetings, legs)
+        return legs, None, departure, return_time
+    
+    def calculate_departure_time(self, meetings, legs):
 
 
         first_meeting = meetings[0]
@@ -122,12 +126,11 @@ class RouteCreator:
                 first_meeting = meeting
         
 
-        legs = google_route.raw_response['routes'][0].get('legs', [])
         if len(legs) == 0:
             return first_meeting.scheduled_time - timedelta(minutes=30)
         
         first_leg = legs[0]
-        travel_seconds = int(first_leg['duration'].replace('s', ''))
+        travel_seconds = first_leg['duration_seconds']
         buffer_seconds = self.buffer_minutes * 60
         
         total_seconds = travel_seconds + buffer_seconds
@@ -135,7 +138,7 @@ class RouteCreator:
         
         return departure
     
-    def calculate_return_time(self, meetings, google_route):
+    def calculate_return_time(self, meetings, legs):
         # Find last meeting
         last_meeting = meetings[0]
         for meeting in meetings:
@@ -143,13 +146,12 @@ class RouteCreator:
                 last_meeting = meeting
         
         # Get return leg
-        legs = google_route.raw_response['routes'][0].get('legs', [])
         if len(legs) == 0 or len(legs) <= len(meetings):
             meeting_end = last_meeting.scheduled_time + timedelta(minutes=last_meeting.duration)
             return meeting_end + timedelta(minutes=30)
         
         return_leg = legs[len(legs) - 1]
-        return_seconds = int(return_leg['duration'].replace('s', ''))
+        return_seconds = return_leg['duration_seconds']
         
         meeting_end = last_meeting.scheduled_time + timedelta(minutes=last_meeting.duration)
         return_time = meeting_end + timedelta(seconds=return_seconds)
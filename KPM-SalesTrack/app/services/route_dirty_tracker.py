@@ -0,0 +1,108 @@
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from app.models import RouteDirtyMark, RouteMeeting
+from app.db import db
+
+
+class RouteDirtyTracker:
+
+    def __init__(self):
+        # Edits in quick succession are picked up together once they settle
+        self.settle_seconds = int(os.getenv("ROUTE_REOPTIMIZE_DELAY_SECONDS", "30"))
+        self.claim_timeout_minutes = 10
+
+    def snapshot(self, meeting):
+        # The fields a planned route depends on
+        coordinates = meeting.location.get('coordinates') if meeting.location else None
+        return {
+            'user_id': meeting.user_id,
+            'scheduled_date': meeting.scheduled_date,
+            'meeting_type': meeting.meeting_type,
+            'scheduled_time': meeting.scheduled_time,
+            'duration': meeting.duration,
+            'coordinates': list(coordinates) if coordinates else None
+        }
+
+    def meeting_changed(self, before, meeting, reason='meeting_updated'):
+        after = self.snapshot(meeting)
+        if before == after:
+            return
+
+        # A moved meeting dirties both the day it left and the day it joined
+        keys = set()
+        for snapshot in (before, after):
+            if snapshot is not None and snapshot['meeting_type'] == 'field':
+                keys.add((snapshot['user_id'], snapshot['scheduled_date']))
+
+        for user_id, route_date in sorted(keys):
+            self.mark(user_id, route_date, reason)
+
+    def meeting_deleted(self, meeting):
+        # Stops for the meeting go with it; the rest of its route is replanned
+        RouteMeeting.query.filter_by(meeting_id=meeting.id).delete(synchronize_session=False)
+
+        if meeting.meeting_type == 'field':
+            self.mark(meeting.user_id, meeting.scheduled_date, 'meeting_deleted')
+
+    def mark(self, user_id, route_date, reason):
+
+        # Part of the caller's transaction, so the mark commits with the edit
+        values = {
+            RouteDirtyMark.revision: RouteDirtyMark.revision + 1,
+            RouteDirtyMark.reason: reason,
+            RouteDirtyMark.marked_at: datetime.utcnow()
+        }
+        updated = RouteDirtyMark.query.filter_by(
+            user_id=user_id, route_date=route_date
+        ).update(values, synchronize_session=False)
+
+        if updated > 0:
+            return
+
+        try:
+            with db.session.begin_nested():
+                db.session.add(RouteDirtyMark(user_id=user_id, route_date=route_date, reason=reason, revision=1))
+        except IntegrityError:
+            # Another request marked the same route first
+            RouteDirtyMark.query.filter_by(
+                user_id=user_id, route_date=route_date
+            ).update(values, synchronize_session=False)
+
+    def claim(self, limit=100):
+        now = datetime.utcnow()
+        settled = now - timedelta(seconds=self.settle_seconds)
+        expired = now - timedelta(minutes=self.claim_timeout_minutes)
+
+        # SKIP LOCKED lets several workers share the table; a claim left by a
+        # worker that died expires after claim_timeout_minutes
+        marks = RouteDirtyMark.query.filter(
+            RouteDirtyMark.marked_at <= settled,
+            or_(RouteDirtyMark.claimed_at.is_(None), RouteDirtyMark.claimed_at < expired)
+        ).order_by(RouteDirtyMark.route_date, RouteDirtyMark.id).limit(limit).with_for_update(skip_locked=True).all()
+
+        claimed = []
+        for mark in marks:
+            mark.claimed_at = now
+            claimed.append({
+                'id': mark.id,
+                'user_id': mark.user_id,
+                'route_date': mark.route_date,
+                'revision': mark.revision
+            })
+        db.session.commit()
+        return claimed
+
+    def release(self, marks):
+
+        # Marks changed while the pass ran stay behind for the next one
+        for mark in marks:
+            deleted = RouteDirtyMark.query.filter_by(
+                id=mark['id'], revision=mark['revision']
+            ).delete(synchronize_session=False)
+
+            if deleted == 0:
+                RouteDirtyMark.query.filter_by(id=mark['id']).update(
+                    {RouteDirtyMark.claimed_at: None}, synchronize_session=False
+                )
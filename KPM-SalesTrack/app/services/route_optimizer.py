@@ -1,25 +1,199 @@
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from app.models import Meeting
+from flask import current_app
+from sqlalchemy import or_
+from app.models import Meeting, Route, RouteMeeting
 from app.db import db
+from app.utils import response_cache
 from .carpool_service import CarpoolService
 from .google_routes_service import GoogleRoutesService
+from .route_batch import RouteBatch
 from .route_creator import RouteCreator
+from .route_plans import RoutePlanService
+from .travel_matrix import TravelMatrixService
 
 
 class RouteOptimizationService:
     
-    def __init__(self, office_location):
+    def __init__(self, office_location, matrix_provider=None):
         self.office_location = office_location
         self.carpool_service = CarpoolService()
         self.google_service = GoogleRoutesService(office_location)
         self.route_creator = RouteCreator(office_location)
+        self.matrix_service = TravelMatrixService(office_location, matrix_provider)
     
-    def optimize_routes_for_date(self, date):
+    def optimize_routes(self, dates, status=None, max_workers=None, on_day_done=None, run_id=None):
+
+        if max_workers is None:
+            max_workers = int(os.getenv("ROUTE_OPTIMIZE_WORKERS", "4"))
+
+        # Days are independent, so each one is planned on its own worker and
+        # session; the plans are merged and written in one transaction here
+        app = current_app._get_current_object()
+        batch = RouteBatch()
+        days = []
+
+        if len(dates) > 0:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(dates)))) as pool:
+                futures = [pool.submit(self.optimize_day_in_worker, app, date) for date in dates]
+
+                for future in as_completed(futures):
+                    day_batch, day_result = future.result()
+                    if day_batch is not None:
+                        batch.merge(day_batch)
+                    days.append(day_result)
+
+                    if on_day_done is not None:
+                        on_day_done(day_result)
+
+        days.sort(key=lambda d: d['date'])
+
+        # Every day that planned cleanly gets a new plan replacing its current
+        # one; a failed day keeps the routes it had
+        completed_days = {day['date'] for day in days if day['status'] == 'completed'}
+        completed = [d for d in dates if d.isoformat() in completed_days]
+        plan_ids = RoutePlanService().publish(completed, run_id or uuid.uuid4().hex)
+
+        route_ids = batch.flush(status, plan_ids)
+        db.session.commit()
+        response_cache.invalidate('routes')
+
+        if len(route_ids) == 0:
+            return [], days
+        routes = Route.query.filter(Route.id.in_(route_ids)).order_by(Route.id).all()
+        return routes, days
+    
+    def optimize_day_in_worker(self, app, date):
+
+        with app.app_context():
+            started = datetime.utcnow()
+            try:
+                optimizer = RouteOptimizationService(self.office_location, self.matrix_service.provider)
+                batch = RouteBatch()
+                planned = optimizer.optimize_routes_for_date(date, batch)
+
+                # Keeps the Google routes this day fetched even if another day fails
+                db.session.commit()
+
+                return batch, {
+                    'date': date.isoformat(),
+                    'status': 'completed',
+                    'routes': len(planned),
+                    'seconds': (datetime.utcnow() - started).total_seconds()
+                }
+
+            except Exception as e:
+                db.session.rollback()
+                print(f"Failed to optimize routes for {date}: {e}")
+                return None, {
+                    'date': date.isoformat(),
+                    'status': 'failed',
+                    'error': str(e),
+                    'seconds': (datetime.utcnow() - started).total_seconds()
+                }
+    
+    def optimize_routes_for_date(self, date, batch):
         meetings = Meeting.query.filter_by(
             scheduled_date=date,
             meeting_type='field'
         ).all()
         
+        return self.plan_meetings(meetings, batch)
+    
+    def reoptimize_users(self, date, user_ids, batch, plan_id):
+
+        # Replans only the given reps' routes in the day's current plan,
+        # together with everyone sharing a car with them; other routes are
+        # left as they are
+        affected_routes = self.routes_to_replace(plan_id, user_ids)
+        affected_users = set(user_ids) | {route.user_id for route in affected_routes}
+        previous = self.route_signatures(affected_routes)
+
+        route_ids = [route.id for route in affected_routes]
+        if len(route_ids) > 0:
+            RouteMeeting.query.filter(RouteMeeting.route_id.in_(route_ids)).delete(synchronize_session=False)
+            Route.query.filter(Route.id.in_(route_ids)).update(
+                {Route.shared_with_route_id: None}, synchronize_session=False
+            )
+            Route.query.filter(Route.id.in_(route_ids)).delete(synchronize_session=False)
+
+        meetings = Meeting.query.filter(
+            Meeting.scheduled_date == date,
+            Meeting.meeting_type == 'field',
+            Meeting.user_id.in_(affected_users)
+        ).all()
+
+        # Reps whose meetings did not change get the same waypoints and so
+        # reuse their stored Google route
+        planned = self.plan_meetings(meetings, batch)
+
+        # A route that comes out exactly as before keeps its review status, so
+        # an accepted route stays with its rep; one that changed goes back to
+        # pending for an admin to approve again
+        for route in planned:
+            prior = previous.get(route['values']['user_id'])
+            if prior is not None and prior[0] == self.planned_signature(route):
+                route['values']['status'] = prior[1]
+            else:
+                route['values']['status'] = 'pending'
+        return planned
+
+    def route_signatures(self, routes):
+        if len(routes) == 0:
+            return {}
+
+        rows = db.session.query(
+            RouteMeeting.route_id, RouteMeeting.meeting_id, RouteMeeting.stop_order, RouteMeeting.stop_type,
+            RouteMeeting.estimated_arrival_time, RouteMeeting.estimated_departure_time
+        ).filter(
+            RouteMeeting.route_id.in_([route.id for route in routes])
+        ).order_by(RouteMeeting.route_id, RouteMeeting.stop_order)
+
+        stops = {}
+        for row in rows:
+            stops.setdefault(row.route_id, []).append(tuple(row)[1:])
+
+        return {
+            route.user_id: ((route.route_type, route.google_route_id, route.scheduled_departure_time,
+                             route.scheduled_return_time, tuple(stops.get(route.id, []))), route.status)
+            for route in routes
+        }
+
+    def planned_signature(self, route):
+        values = route['values']
+        return (values['route_type'], values['google_route_id'], values['scheduled_departure_time'],
+                values['scheduled_return_time'], tuple(self.stop_signature(stop) for stop in route['stops']))
+
+    def stop_signature(self, stop):
+        return (stop['meeting_id'], stop['stop_order'], stop['stop_type'],
+                stop['estimated_arrival_time'], stop['estimated_departure_time'])
+    
+    def routes_to_replace(self, plan_id, user_ids):
+        routes = {}
+        users = set(user_ids)
+
+        # Follow carpool links both ways until the set stops growing
+        while True:
+            found = Route.query.filter(
+                Route.plan_id == plan_id,
+                or_(
+                    Route.user_id.in_(users),
+                    Route.id.in_({r.shared_with_route_id for r in routes.values() if r.shared_with_route_id}),
+                    Route.shared_with_route_id.in_(set(routes.keys()))
+                )
+            ).all()
+
+            new_routes = [route for route in found if route.id not in routes]
+            if len(new_routes) == 0:
+                return list(routes.values())
+
+            for route in new_routes:
+                routes[route.id] = route
+                users.add(route.user_id)
+    
+    def plan_meetings(self, meetings, batch):
         if len(meetings) == 0:
             return []
         user_meetings = {}
@@ -28,6 +202,9 @@ class RouteOptimizationService:
             if user_id not in user_meetings:
                 user_meetings[user_id] = []
             user_meetings[user_id].append(meeting)
+
+        # One N x N matrix for the whole day instead of a round-trip per group
+        matrix = self.matrix_service.build_for_meetings(meetings)
     
         carpool_groups = self.carpool_service.find_carpool_groups(user_meetings)
         
@@ -37,7 +214,7 @@ class RouteOptimizationService:
             if len(group['users']) == 1:
                 user_id = group['users'][0]
                 user_meeting_list = user_meetings[user_id]
-                route = self.route_creator.create_individual_route(user_meeting_list)
+                route = self.route_creator.create_individual_route(user_meeting_list, batch, matrix)
                 
                 if route is not None:
                     all_routes.append(route)
@@ -49,10 +226,11 @@ class RouteOptimizationService:
                 
                 routes = self.route_creator.create_shared_routes(
                     combined_meetings, 
-                    group['users']
+                    group['users'],
+                    batch,
+                    matrix
                 )
                 
                 for route in routes:
                     all_routes.append(route)
-        db.session.commit()
         return all_routes
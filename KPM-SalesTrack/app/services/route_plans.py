@@ -0,0 +1,94 @@
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import select, text
+from app.models import RoutePlan, Route, RouteMeeting
+from app.db import db
+from app.utils import response_cache
+
+
+# First key of the two-key advisory locks taken per plan date
+PUBLISH_LOCK_CLASS = 7201
+
+
+class RoutePlanService:
+
+    def __init__(self):
+        # Superseded plans are kept this long before their routes are deleted
+        self.retention_hours = int(os.getenv("ROUTE_PLAN_RETENTION_HOURS", "24"))
+        self.gc_batch_size = 500
+
+    def current_plans(self, dates):
+        if len(dates) == 0:
+            return {}
+
+        plans = RoutePlan.query.filter(
+            RoutePlan.route_date.in_(dates),
+            RoutePlan.status == RoutePlan.STATUS_CURRENT
+        ).all()
+        return {plan.route_date: plan for plan in plans}
+
+    def publish(self, dates, run_id):
+        if len(dates) == 0:
+            return {}
+
+        # Swapped in the caller's transaction, so readers move from the old
+        # plan to the new one together with its routes
+        self.lock_dates(dates)
+        RoutePlan.query.filter(
+            RoutePlan.route_date.in_(dates),
+            RoutePlan.status == RoutePlan.STATUS_CURRENT
+        ).update({
+            RoutePlan.status: RoutePlan.STATUS_SUPERSEDED,
+            RoutePlan.superseded_at: datetime.utcnow()
+        }, synchronize_session=False)
+
+        plans = [RoutePlan(route_date=d, run_id=run_id, status=RoutePlan.STATUS_CURRENT) for d in dates]
+        db.session.add_all(plans)
+        db.session.flush()
+
+        return {plan.route_date: plan.id for plan in plans}
+
+    def lock_dates(self, dates):
+        connection = db.session.connection()
+
+        # Jobs over overlapping ranges publish one date at a time: the second
+        # waits for the first to commit, then supersedes its plan. Without it
+        # neither UPDATE sees the other's new row and one INSERT hits
+        # uq_route_plans_current_route_date. SQLite serializes writers anyway
+        if connection.dialect.name != "postgresql":
+            return
+
+        # Sorted, so two jobs never wait on each other's dates in a cycle
+        for route_date in sorted(set(dates)):
+            connection.execute(
+                text("SELECT pg_advisory_xact_lock(:lock_class, :lock_key)"),
+                {'lock_class': PUBLISH_LOCK_CLASS, 'lock_key': route_date.toordinal()}
+            )
+
+    def collect_garbage(self):
+        cutoff = datetime.utcnow() - timedelta(hours=self.retention_hours)
+        plans_deleted = 0
+        routes_deleted = 0
+
+        while True:
+            plan_ids = db.session.execute(
+                select(RoutePlan.id).where(
+                    RoutePlan.status == RoutePlan.STATUS_SUPERSEDED,
+                    RoutePlan.superseded_at < cutoff
+                ).order_by(RoutePlan.id).limit(self.gc_batch_size)
+            ).scalars().all()
+
+            if len(plan_ids) == 0:
+                return plans_deleted, routes_deleted
+
+            route_ids = select(Route.id).where(Route.plan_id.in_(plan_ids)).scalar_subquery()
+
+            RouteMeeting.query.filter(RouteMeeting.route_id.in_(route_ids)).delete(synchronize_session=False)
+            # Routes carried over from before plans existed may still point at these
+            Route.query.filter(Route.shared_with_route_id.in_(route_ids)).update(
+                {Route.shared_with_route_id: None}, synchronize_session=False
+            )
+            routes_deleted += Route.query.filter(Route.plan_id.in_(plan_ids)).delete(synchronize_session=False)
+            plans_deleted += RoutePlan.query.filter(RoutePlan.id.in_(plan_ids)).delete(synchronize_session=False)
+            db.session.commit()
+            response_cache.invalidate('routes')
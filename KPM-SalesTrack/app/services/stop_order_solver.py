@@ -0,0 +1,231 @@
+import os
+import time
+from datetime import timedelta
+from .travel_matrix import OFFICE_KEY
+
+
+class StopOrderSolution:
+
+    def __init__(self, meetings, legs, arrivals, departures, total_distance, lateness_seconds):
+        self.meetings = meetings
+        self.legs = legs
+        self.arrivals = arrivals
+        self.departures = departures
+        self.total_distance = total_distance
+        self.lateness_seconds = lateness_seconds
+
+    @property
+    def feasible(self):
+        return self.lateness_seconds == 0
+
+    @property
+    def office_departure(self):
+        return self.arrivals[0] - timedelta(seconds=self.legs[0]['duration_seconds'])
+
+    @property
+    def office_return(self):
+        return self.departures[-1] + timedelta(seconds=self.legs[-1]['duration_seconds'])
+
+    def schedule(self):
+        return list(zip(self.arrivals, self.departures))
+
+
+class StopOrderSolver:
+
+    def __init__(self, time_budget_seconds=None, window_minutes=None):
+        if time_budget_seconds is None:
+            time_budget_seconds = float(os.getenv("STOP_SOLVER_TIME_BUDGET", "0.2"))
+        if window_minutes is None:
+            window_minutes = int(os.getenv("STOP_TIME_WINDOW_MINUTES", "15"))
+
+        self.time_budget_seconds = time_budget_seconds
+        self.window_minutes = window_minutes
+
+    def solve(self, meetings, matrix):
+        meetings = sorted(meetings, key=lambda m: m.scheduled_time)
+        n = len(meetings)
+        problem = self.build_problem(meetings, matrix)
+        deadline = time.perf_counter() + self.time_budget_seconds
+
+        # The time-sorted order is always a candidate, so the result is never
+        # worse than what the planner used to produce
+        best = list(range(1, n + 1))
+        best_cost = self.evaluate(best, problem)
+
+        seed = self.nearest_neighbour(n, problem)
+        seed_cost = self.evaluate(seed, problem)
+        if seed_cost < best_cost:
+            best, best_cost = seed, seed_cost
+
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+
+            candidate, candidate_cost = self.two_opt(best, best_cost, problem, deadline)
+            if candidate_cost < best_cost:
+                best, best_cost = candidate, candidate_cost
+                improved = True
+
+            candidate, candidate_cost = self.or_opt(best, best_cost, problem, deadline)
+            if candidate_cost < best_cost:
+                best, best_cost = candidate, candidate_cost
+                improved = True
+
+        return self.build_solution(best, meetings, matrix, problem)
+
+    def solution_for_order(self, meetings, matrix):
+        # Scores a fixed visiting order without optimizing it
+        problem = self.build_problem(meetings, matrix)
+        return self.build_solution(list(range(1, len(meetings) + 1)), meetings, matrix, problem)
+
+    def build_problem(self, meetings, matrix):
+        n = len(meetings)
+
+        # Node 0 is the office, nodes 1..n are the meetings
+        keys = [OFFICE_KEY] + [m.id for m in meetings]
+        indexes = [matrix.index[key] for key in keys]
+        distances = matrix.distances[indexes][:, indexes].tolist()
+        durations = matrix.durations[indexes][:, indexes].tolist()
+
+        # A meeting may start at its scheduled time, or up to window_minutes
+        # late if the rep cannot make it earlier
+        reference = min(m.scheduled_time for m in meetings)
+        window = self.window_minutes * 60
+        opens = [0.0] + [(m.scheduled_time - reference).total_seconds() for m in meetings]
+        closes = [0.0] + [opens[i] + window for i in range(1, n + 1)]
+        service = [0.0] + [m.duration * 60 for m in meetings]
+
+        return (distances, durations, opens, closes, service, reference)
+
+    def simulate(self, order, problem):
+        distances, durations, opens, closes, service, _ = problem
+
+        arrivals = []
+        starts = []
+        lateness = 0.0
+        distance = 0
+
+        previous = 0
+        current = None
+        for node in order:
+            distance += distances[previous][node]
+
+            if current is None:
+                # Leave the office just in time for the first stop
+                arrival = opens[node]
+            else:
+                arrival = current + durations[previous][node]
+
+            start = max(arrival, opens[node])
+            if start > closes[node]:
+                lateness += start - closes[node]
+
+            arrivals.append(arrival)
+            starts.append(start)
+            current = start + service[node]
+            previous = node
+
+        distance += distances[previous][0]
+        return arrivals, starts, lateness, distance
+
+    def evaluate(self, order, problem):
+        _, _, lateness, distance = self.simulate(order, problem)
+        return (lateness, distance)
+
+    def nearest_neighbour(self, n, problem):
+        distances, durations, opens, closes, service, _ = problem
+
+        remaining = set(range(1, n + 1))
+        order = []
+        previous = 0
+        current = None
+
+        while remaining:
+            best_node = None
+            best_key = None
+
+            for node in remaining:
+                if current is None:
+                    arrival = opens[node]
+                else:
+                    arrival = current + durations[previous][node]
+                start = max(arrival, opens[node])
+                late = max(0.0, start - closes[node])
+
+                # Prefer stops we can still make on time, then the closest,
+                # then the one whose window opens first
+                key = (late, distances[previous][node], opens[node])
+                if best_key is None or key < best_key:
+                    best_node = node
+                    best_key = key
+
+            if current is None:
+                arrival = opens[best_node]
+            else:
+                arrival = current + durations[previous][best_node]
+            current = max(arrival, opens[best_node]) + service[best_node]
+
+            order.append(best_node)
+            remaining.discard(best_node)
+            previous = best_node
+
+        return order
+
+    def two_opt(self, order, cost, problem, deadline):
+        n = len(order)
+
+        for i in range(n - 1):
+            for j in range(i + 1, n):
+                if time.perf_counter() > deadline:
+                    return order, cost
+
+                candidate = order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+                candidate_cost = self.evaluate(candidate, problem)
+                if candidate_cost < cost:
+                    return candidate, candidate_cost
+
+        return order, cost
+
+    def or_opt(self, order, cost, problem, deadline):
+        n = len(order)
+
+        for segment_length in (1, 2, 3):
+            for i in range(n - segment_length + 1):
+                segment = order[i:i + segment_length]
+                rest = order[:i] + order[i + segment_length:]
+
+                for j in range(len(rest) + 1):
+                    if j == i:
+                        continue
+                    if time.perf_counter() > deadline:
+                        return order, cost
+
+                    candidate = rest[:j] + segment + rest[j:]
+                    candidate_cost = self.evaluate(candidate, problem)
+                    if candidate_cost < cost:
+                        return candidate, candidate_cost
+
+        return order, cost
+
+    def build_solution(self, order, meetings, matrix, problem):
+        arrivals, starts, lateness, distance = self.simulate(order, problem)
+        reference = problem[5]
+
+        ordered_meetings = [meetings[node - 1] for node in order]
+        legs = matrix.route_legs(ordered_meetings)
+
+        arrival_times = []
+        departure_times = []
+        for k in range(len(order)):
+            meeting = ordered_meetings[k]
+            arrival_times.append(reference + timedelta(seconds=arrivals[k]))
+            departure_times.append(reference + timedelta(seconds=starts[k]) + timedelta(minutes=meeting.duration))
+
+        return StopOrderSolution(
+            ordered_meetings,
+            legs,
+            arrival_times,
+            departure_times,
+            distance,
+            lateness
+        )
@@ -0,0 +1,187 @@
+import os
+import hashlib
+import numpy as np
+from app.utils import LRUCache, get_http_client
+from app.utils.geo import haversine_matrix
+from .google_routes_service import parse_duration
+
+
+OFFICE_KEY = 'office'
+
+# Straight-line distance band upper bound (meters) -> average driving speed (km/h).
+# Short hops in town crawl, longer trips reach the bypasses.
+DEFAULT_SPEED_PROFILE = [
+    (2000, 15),
+    (10000, 25),
+    (30000, 40),
+    (None, 60)
+]
+
+_matrix_cache = LRUCache(maxsize=64, ttl=6 * 60 * 60)
+
+
+class TravelMatrix:
+
+    def __init__(self, keys, distances, durations):
+        self.keys = list(keys)
+        self.index = {key: i for i, key in enumerate(self.keys)}
+        self.distances = distances
+        self.durations = durations
+
+    def distance(self, from_key, to_key):
+        return int(self.distances[self.index[from_key], self.index[to_key]])
+
+    def duration(self, from_key, to_key):
+        return int(self.durations[self.index[from_key], self.index[to_key]])
+
+    def route_legs(self, meetings):
+        # office -> each meeting in the given order -> office
+        stops = [OFFICE_KEY] + [meeting.id for meeting in meetings] + [OFFICE_KEY]
+
+        legs = []
+        for i in range(len(stops) - 1):
+            legs.append({
+                'distance_meters': self.distance(stops[i], stops[i + 1]),
+                'duration_seconds': self.duration(stops[i], stops[i + 1])
+            })
+        return legs
+
+
+class HaversineMatrixProvider:
+
+    name = 'haversine'
+
+    def __init__(self, speed_profile=None, detour_factor=1.3):
+        self.speed_profile = speed_profile or DEFAULT_SPEED_PROFILE
+        self.detour_factor = detour_factor
+
+    def compute(self, coordinates):
+        straight = haversine_matrix(coordinates)
+        road = straight * self.detour_factor
+
+        conditions = []
+        speeds = []
+        for upper_bound, speed_kmh in self.speed_profile:
+            if upper_bound is None:
+                conditions.append(np.ones_like(straight, dtype=bool))
+            else:
+                conditions.append(straight < upper_bound)
+            speeds.append(speed_kmh / 3.6)
+
+        meters_per_second = np.select(conditions, speeds, default=speeds[-1])
+        durations = road / meters_per_second
+
+        return np.rint(road).astype(np.int64), np.rint(durations).astype(np.int64)
+
+
+class GoogleMatrixProvider:
+
+    name = 'google'
+
+    # computeRouteMatrix accepts at most 625 elements per TRAFFIC_AWARE request
+    block_size = 25
+
+    def __init__(self, api_key=None, fallback=None):
+        self.api_key = api_key or os.getenv("GOOGLE_ROUTES_API_KEY")
+        self.fallback = fallback or HaversineMatrixProvider()
+
+    def compute(self, coordinates):
+        # Start from the estimate so any pair Google cannot route still has a value
+        distances, durations = self.fallback.compute(coordinates)
+        n = len(coordinates)
+
+        for origin_start in range(0, n, self.block_size):
+            for destination_start in range(0, n, self.block_size):
+                origins = coordinates[origin_start:origin_start + self.block_size]
+                destinations = coordinates[destination_start:destination_start + self.block_size]
+
+                elements = self.call_google_api(origins, destinations)
+                if elements is None:
+                    continue
+
+                for element in elements:
+                    if element.get('condition') != 'ROUTE_EXISTS':
+                        continue
+                    i = origin_start + element.get('originIndex', 0)
+                    j = destination_start + element.get('destinationIndex', 0)
+                    distances[i, j] = element.get('distanceMeters', 0)
+                    durations[i, j] = parse_duration(element.get('duration'))
+
+        return distances, durations
+
+    def call_google_api(self, origins, destinations):
+
+        def waypoint(point):
+            return {
+                'waypoint': {
+                    'location': {
+                        'latLng': {
+                            'latitude': float(point[0]),
+                            'longitude': float(point[1])
+                        }
+                    }
+                }
+            }
+
+        request_data = {
+            'origins': [waypoint(p) for p in origins],
+            'destinations': [waypoint(p) for p in destinations],
+            'travelMode': 'DRIVE',
+            'routingPreference': 'TRAFFIC_AWARE'
+        }
+
+        try:
+            url = 'https://routes.googleapis.com/distanceMatrix/v2:computeRouteMatrix'
+            headers = {
+                'Content-Type': 'application/json',
+                'X-Goog-Api-Key': self.api_key,
+                'X-Goog-FieldMask': 'originIndex,destinationIndex,distanceMeters,duration,condition'
+            }
+
+            response = get_http_client('google_route_matrix').post(url, headers=headers, json=request_data)
+
+            if response.status_code != 200:
+                print(f"Route matrix API error: {response.status_code}")
+                return None
+
+            return response.json()
+
+        except Exception as e:
+            print(f"Route matrix API error: {e}")
+            return None
+
+
+def get_matrix_provider(name=None):
+    name = name or os.getenv("ROUTE_MATRIX_PROVIDER", "haversine")
+
+    if name == 'google':
+        return GoogleMatrixProvider()
+    return HaversineMatrixProvider()
+
+
+class TravelMatrixService:
+
+    def __init__(self, office_location, provider=None):
+        self.office_location = office_location
+        self.provider = provider or get_matrix_provider()
+
+    def build_for_meetings(self, meetings):
+        keys = [OFFICE_KEY]
+        points = [[self.office_location['coordinates'][1], self.office_location['coordinates'][0]]]
+
+        for meeting in meetings:
+            keys.append(meeting.id)
+            points.append([meeting.location['coordinates'][1], meeting.location['coordinates'][0]])
+
+        coordinates = np.array(points, dtype=np.float64)
+
+        # The matrix only depends on the coordinates, so re-optimizing an
+        # unchanged day reuses the previous computation
+        cache_key = self.provider.name + ':' + hashlib.sha1(coordinates.tobytes()).hexdigest()
+        cached = _matrix_cache.get(cache_key)
+        if cached is None:
+            cached = self.provider.compute(coordinates)
+            _matrix_cache.set(cache_key, cached)
+
+        distances, durations = cached
+        return TravelMatrix(keys, distances, durations)
@@ -1,3 +1,10 @@
 from .geocode import geocode_address,reverse_geocode
-from .helpers_optimize import daterange, format_route,format_carpool,format_google_route,format_stop,format_stop_basic,format_time
+from .helpers_optimize import daterange, format_route,format_carpool,format_google_route,format_stop,format_stop_basic,format_time,format_job
 from .decorator import role_required,admin_required,salesman_required,owner_or_admin_required,sales_or_admin_required
+from .lru import LRUCache
+from .http_client import get_http_client, http_client_stats, CircuitOpenError
+from .queries import with_meeting_relations, with_route_relations, current_routes, geohash_prefix_filter
+from .pagination import paginate, Page, InvalidCursor
+from .serializers import client_serializer, user_serializer, task_serializer, objective_serializer, dump_meeting_summary
+from .cache import response_cache, cached_response
+from .conditional import conditional_response
\ No newline at end of file
@@ -0,0 +1,225 @@
+import threading
+import logging
+from functools import wraps
+from flask import request, make_response, Response, g
+from flask_jwt_extended import get_jwt_identity, get_jwt
+from .lru import LRUCache
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCacheBackend:
+
+    def __init__(self, maxsize=10000, ttl=60):
+        self.values = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.tags = {}
+        self.key_tags = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ttl, tags):
+        # The tag index follows the LRU: keys it evicts leave their tags, so
+        # a tag that is never invalidated cannot grow past maxsize
+        with self._lock:
+            evicted = self.values.set(key, value, ttl)
+            self.forget(evicted + [key])
+            self.key_tags[key] = set(tags)
+            for tag in tags:
+                self.tags.setdefault(tag, set()).add(key)
+
+            # Entries found expired on read are dropped without an eviction
+            if len(self.key_tags) > self.values.maxsize:
+                self.forget([k for k in self.key_tags if k not in self.values])
+
+    def forget(self, keys):
+        for key in keys:
+            for tag in self.key_tags.pop(key, ()):
+                tagged = self.tags.get(tag)
+                if tagged is not None:
+                    tagged.discard(key)
+                    if len(tagged) == 0:
+                        del self.tags[tag]
+
+    def invalidate(self, tags):
+        keys = set()
+        with self._lock:
+            for tag in tags:
+                keys |= self.tags.pop(tag, set())
+            self.forget(keys)
+
+            for key in keys:
+                self.values.delete(key)
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self.values.clear()
+            self.tags.clear()
+            self.key_tags.clear()
+
+    def size(self):
+        return len(self.values)
+
+
+class RedisCacheBackend:
+
+    # Works with any client speaking the redis-py API (get/set/delete/
+    # sadd/smembers/expire/pipeline), so a local fake can stand in for tests
+    def __init__(self, client, prefix="kpm:cache:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl, tags):
+        pipe = self.client.pipeline()
+        pipe.set(self.prefix + key, value, ex=ttl)
+        for tag in tags:
+            tag_key = self.prefix + "tag:" + tag
+            pipe.sadd(tag_key, key)
+            # A tag set never outlives the longest entry it points at by much
+            pipe.expire(tag_key, ttl * 2)
+        pipe.execute()
+
+    def invalidate(self, tags):
+        keys = set()
+        for tag in tags:
+            tag_key = self.prefix + "tag:" + tag
+            for member in self.client.smembers(tag_key):
+                keys.add(member.decode() if isinstance(member, bytes) else member)
+            self.client.delete(tag_key)
+
+        if len(keys) > 0:
+            self.client.delete(*[self.prefix + key for key in keys])
+        return len(keys)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if len(keys) > 0:
+            self.client.delete(*keys)
+
+    def size(self):
+        return None
+
+
+class ResponseCache:
+
+    def __init__(self):
+        self.backend = MemoryCacheBackend()
+        self.default_ttl = 60
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config.get("CACHE_ENABLED", True)
+        self.default_ttl = app.config.get("CACHE_DEFAULT_TTL", 60)
+
+        backend = app.config.get("CACHE_BACKEND", "memory")
+        if backend == "redis":
+            if redis is None:
+                raise RuntimeError("CACHE_BACKEND=redis needs the redis package installed")
+            self.backend = RedisCacheBackend(redis.Redis.from_url(app.config["CACHE_REDIS_URL"]))
+        else:
+            self.backend = MemoryCacheBackend(app.config.get("CACHE_MAX_ENTRIES", 10000), self.default_ttl)
+
+    def count(self, name, amount=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            # A cache outage degrades to uncached reads
+            logger.error(f"Cache read failed: {e}")
+            self.count("errors")
+            return None
+
+        self.count("hits" if value is not None else "misses")
+        return value
+
+    def set(self, key, value, tags=(), ttl=None):
+        if not self.enabled:
+            return
+
+        try:
+            self.backend.set(key, value, ttl or self.default_ttl, list(tags))
+        except Exception as e:
+            logger.error(f"Cache write failed: {e}")
+            self.count("errors")
+
+    def invalidate(self, *tags):
+        # Call after the write commits, or a concurrent read can cache the
+        # old rows again
+        if not self.enabled or len(tags) == 0:
+            return 0
+
+        try:
+            removed = self.backend.invalidate(tags)
+        except Exception as e:
+            logger.error(f"Cache invalidation failed: {e}")
+            self.count("errors")
+            return 0
+
+        self.count("invalidations", removed)
+        return removed
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "size": self.backend.size(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "invalidations": self.invalidations,
+            "errors": self.errors
+        }
+
+
+response_cache = ResponseCache()
+
+
+def cached_response(tags, ttl=None):
+    # tags(**view_args) returns the tags a cached body is filed under. Goes
+    # below the auth decorator: bodies are cached per user and role
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = f"{request.endpoint}:{get_jwt().get('role')}:{get_jwt_identity()}:{request.full_path}"
+            # Under conditional_response the body is keyed on its row versions,
+            # so a missed invalidation cannot outlive the next change
+            if g.get("etag"):
+                key = f"{key}:{g.etag}"
+
+            body = response_cache.get(key)
+            if body is not None:
+                response = Response(body, 200, mimetype="application/json")
+                response.headers["X-Cache"] = "HIT"
+                return response
+
+            response = make_response(fn(*args, **kwargs))
+            if response.status_code == 200 and response.is_json:
+                response_cache.set(key, response.get_data(), tags(**kwargs), ttl)
+            response.headers["X-Cache"] = "MISS"
+            return response
+        return wrapper
+    return decorator
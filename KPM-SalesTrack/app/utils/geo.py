@@ -0,0 +1,77 @@
+import math
+import numpy as np
+
+# Distances on a sphere of the mean Earth radius. Against the WGS84 geodesic
+# (geopy's default) haversine is off by 0.15-0.26% on average and 0.56% at worst,
+# the worst being north-south hops near the equator: about 0.3 m on a 50 m
+# geofence. Equirectangular agrees with haversine to within 0.001% for
+# points tens of km apart, but breaks down over long or polar distances, so
+# keep it to ranking and short hops. benchmarks/geo_benchmark.py measures both.
+EARTH_RADIUS_METERS = 6371008.8
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    # Metres between two points in degrees; the single-point path, plain math
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    a = math.sin((phi2 - phi1) / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * math.asin(math.sqrt(min(a, 1.0)))
+
+
+def haversine_array(lat1, lng1, lat2, lng2):
+    # Same, for arrays (or an array against a point); inputs broadcast
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2)
+    a = np.sin((phi2 - phi1) / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(np.radians(np.subtract(lng2, lng1)) / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def equirectangular(lat1, lng1, lat2, lng2):
+    # Flat projection around the mean latitude: cheaper than haversine and
+    # close enough over a few tens of km
+    x = math.radians(lng2 - lng1) * math.cos(math.radians((lat1 + lat2) / 2))
+    y = math.radians(lat2 - lat1)
+    return EARTH_RADIUS_METERS * math.sqrt(x * x + y * y)
+
+
+def equirectangular_array(lat1, lng1, lat2, lng2):
+    x = np.radians(np.subtract(lng2, lng1)) * np.cos(np.radians(np.add(lat1, lat2) / 2))
+    y = np.radians(np.subtract(lat2, lat1))
+    return EARTH_RADIUS_METERS * np.sqrt(x * x + y * y)
+
+
+def haversine_matrix(coordinates):
+    # coordinates: (n, 2) array of [lat, lng] in degrees -> (n, n) metres
+    coordinates = np.asarray(coordinates, dtype=float)
+    lat = coordinates[:, 0]
+    lng = coordinates[:, 1]
+    return haversine_array(lat[:, None], lng[:, None], lat[None, :], lng[None, :])
+
+
+def bearing(lat1, lng1, lat2, lng2):
+    # Initial bearing from the first point to the second, degrees from north
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_lng = math.radians(lng2 - lng1)
+    y = math.sin(d_lng) * math.cos(phi2)
+    x = math.cos(phi1) * math.sin(phi2) - math.sin(phi1) * math.cos(phi2) * math.cos(d_lng)
+    return math.degrees(math.atan2(y, x)) % 360
+
+
+def bearing_array(lat1, lng1, lat2, lng2):
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2)
+    d_lng = np.radians(np.subtract(lng2, lng1))
+    y = np.sin(d_lng) * np.cos(phi2)
+    x = np.cos(phi1) * np.sin(phi2) - np.sin(phi1) * np.cos(phi2) * np.cos(d_lng)
+    return np.degrees(np.arctan2(y, x)) % 360
+
+
+def bounding_box(lat, lng, radius_meters):
+    # (min_lat, min_lng, max_lat, max_lng) holding every point within the
+    # radius; clamped at the poles and the antimeridian, never wrapped
+    d_lat = math.degrees(radius_meters / EARTH_RADIUS_METERS)
+    # Longitude degrees shrink away from the equator
+    shrink = max(math.cos(math.radians(lat)), 0.01)
+    d_lng = min(d_lat / shrink, 180.0)
+    return max(lat - d_lat, -90.0), max(lng - d_lng, -180.0), min(lat + d_lat, 90.0), min(lng + d_lng, 180.0)
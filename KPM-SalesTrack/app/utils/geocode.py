@@ -1,7 +1,17 @@
 import os
+import re
 import requests
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
+from sqlalchemy import select, insert, update, or_
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 import logging
+from app.db import db
+from app.models import GeocodeCache, ReverseGeocodeCache, Client
+from .lru import LRUCache
+from . import geohash, geo
+from .http_client import get_http_client
+from .queries import geohash_prefix_filter
 
 load_dotenv()
 GEOCODE_API_KEY = os.getenv("GEOCODE_EARTH_API")
@@ -9,15 +19,182 @@ GEOCODE_API_KEY = os.getenv("GEOCODE_EARTH_API")
 logger = logging.getLogger(__name__)
 
 
+ADDRESS_ABBREVIATIONS = {
+    "rd": "road",
+    "st": "street",
+    "str": "street",
+    "ave": "avenue",
+    "av": "avenue",
+    "hwy": "highway",
+    "blvd": "boulevard",
+    "ln": "lane",
+    "dr": "drive",
+    "cres": "crescent",
+    "cl": "close",
+    "ct": "court",
+    "pl": "place",
+    "bldg": "building",
+    "bld": "building",
+    "hse": "house",
+    "twr": "tower",
+    "flr": "floor",
+    "fl": "floor",
+    "apt": "apartment",
+    "apts": "apartments",
+    "est": "estate",
+    "ctr": "centre",
+    "center": "centre",
+    "mkt": "market",
+    "nbi": "nairobi",
+    "nrb": "nairobi",
+    "msa": "mombasa",
+}
+
+GEOCODE_CACHE_TTL = timedelta(days=int(os.getenv("GEOCODE_CACHE_TTL_DAYS", "90")))
+GEOCODE_NOT_FOUND_TTL = timedelta(hours=int(os.getenv("GEOCODE_NOT_FOUND_TTL_HOURS", "24")))
+GEOCODE_ERROR_TTL = timedelta(minutes=int(os.getenv("GEOCODE_ERROR_TTL_MINUTES", "5")))
+
+# In-process copy of the cache table; entries never outlive their row
+_geocode_lru = LRUCache(maxsize=int(os.getenv("GEOCODE_LRU_SIZE", "2048")), ttl=3600)
+
+# A stored reverse geocode is reused for any check-in within this radius
+REVERSE_GEOCODE_RADIUS_METERS = float(os.getenv("REVERSE_GEOCODE_RADIUS_METERS", "25"))
+REVERSE_GEOCODE_CACHE_TTL = timedelta(days=int(os.getenv("REVERSE_GEOCODE_CACHE_TTL_DAYS", "180")))
+REVERSE_GEOCODE_HASH_PRECISION = 9
+
+# Keyed by the ~5m geohash cell of the check-in point
+_reverse_geocode_lru = LRUCache(maxsize=int(os.getenv("GEOCODE_LRU_SIZE", "2048")), ttl=3600)
+
+
+def normalize_address(address):
+    text = address.casefold()
+    text = re.sub(r"[^\w\s]", " ", text)
+    words = [ADDRESS_ABBREVIATIONS.get(word, word) for word in text.split()]
+    return " ".join(words)
+
+
+def geocode_cache_key(address, country_code="KE"):
+    return f"{country_code.upper()}:{normalize_address(address)}"
+
+
 def geocode_address(address, country_code="KE"):
 
     if not address:
         logger.warning("geocode_address called with empty address")
         return None
-    
+
+    key = geocode_cache_key(address, country_code)
+    now = datetime.utcnow()
+
+    cached = _geocode_lru.get(key)
+    if cached is not None:
+        return cached[1]
+
+    entry = read_geocode_cache(key)
+    if entry is not None and entry.expires_at > now:
+        remember_geocode(key, entry.status, entry.location, entry.expires_at)
+        return entry.location
+
+    status, location = search_address(address, country_code)
+
+    if status == GeocodeCache.STATUS_ERROR and entry is not None and entry.status == GeocodeCache.STATUS_FOUND:
+        # Keep serving the stale hit while the API is failing, retry shortly
+        status, location = entry.status, entry.location
+        expires_at = now + GEOCODE_ERROR_TTL
+    elif status == GeocodeCache.STATUS_FOUND:
+        expires_at = now + GEOCODE_CACHE_TTL
+    elif status == GeocodeCache.STATUS_NOT_FOUND:
+        expires_at = now + GEOCODE_NOT_FOUND_TTL
+    else:
+        expires_at = now + GEOCODE_ERROR_TTL
+
+    write_geocode_cache(key, address, country_code, status, location, now, expires_at)
+    remember_geocode(key, status, location, expires_at)
+    return location
+
+
+def remember_geocode(key, status, location, expires_at):
+    seconds = (expires_at - datetime.utcnow()).total_seconds()
+    if seconds > 0:
+        _geocode_lru.set(key, (status, location), ttl=min(seconds, 3600))
+
+
+def read_geocode_cache(key):
+    table = GeocodeCache.__table__
+
+    # Own connection so cache traffic never joins the caller's transaction
+    try:
+        with db.engine.connect() as conn:
+            return conn.execute(
+                select(table.c.status, table.c.location, table.c.expires_at).where(table.c.address_key == key)
+            ).first()
+    except SQLAlchemyError as e:
+        logger.error(f"Geocode cache read failed: {e}")
+        return None
+
+
+def write_geocode_cache(key, address, country_code, status, location, fetched_at, expires_at):
+    table = GeocodeCache.__table__
+    values = {
+        "address": address[:255],
+        "country_code": country_code.upper(),
+        "status": status,
+        "location": location,
+        "fetched_at": fetched_at,
+        "expires_at": expires_at
+    }
+
+    try:
+        with db.engine.begin() as conn:
+            updated = conn.execute(update(table).where(table.c.address_key == key).values(**values))
+            if updated.rowcount == 0:
+                conn.execute(insert(table).values(address_key=key, **values))
+    except IntegrityError:
+        # Another worker cached the same address first
+        pass
+    except SQLAlchemyError as e:
+        logger.error(f"Geocode cache write failed: {e}")
+
+
+def prewarm_geocode_cache(country_code="KE"):
+
+    # Seeds the cache with the locations clients were already saved with
+    table = GeocodeCache.__table__
+    now = datetime.utcnow()
+    expires_at = now + GEOCODE_CACHE_TTL
+
+    with db.engine.connect() as conn:
+        existing = set(conn.execute(select(table.c.address_key)).scalars())
+
+    rows = {}
+    for address, location in db.session.query(Client.address, Client.location).filter(Client.address.isnot(None)):
+        if not location or not location.get("coordinates"):
+            continue
+        key = geocode_cache_key(address, country_code)
+        if key in existing or key in rows:
+            continue
+        rows[key] = {
+            "address_key": key,
+            "address": address[:255],
+            "country_code": country_code.upper(),
+            "status": GeocodeCache.STATUS_FOUND,
+            "location": location,
+            "fetched_at": now,
+            "expires_at": expires_at
+        }
+
+    if len(rows) > 0:
+        with db.engine.begin() as conn:
+            conn.execute(insert(table), list(rows.values()))
+
+    return len(rows)
+
+
+def search_address(address, country_code="KE"):
+
     if not GEOCODE_API_KEY:
         logger.error("GEOCODE_EARTH_API key not found in environment variables")
-        return None
+        return GeocodeCache.STATUS_ERROR, None
 
     url = "https://api.geocode.earth/v1/search"
     params = {
@@ -27,7 +204,7 @@ def geocode_address(address, country_code="KE"):
     }
 
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = get_http_client("geocode").get(url, params=params)
         response.raise_for_status()
         data = response.json()
 
@@ -38,9 +215,9 @@ def geocode_address(address, country_code="KE"):
 
             if not coords or len(coords) < 2:
                 logger.error(f"Invalid coordinates received for address: {address}")
-                return None
+                return GeocodeCache.STATUS_NOT_FOUND, None
 
-            return {
+            return GeocodeCache.STATUS_FOUND, {
                 "name": props.get("name"),
                 "label": props.get("label"),
                 "coordinates": coords,
@@ -48,23 +225,23 @@ def geocode_address(address, country_code="KE"):
             }
 
         logger.warning(f"No features found for address: {address}")
-        return None
+        return GeocodeCache.STATUS_NOT_FOUND, None
 
     except requests.exceptions.Timeout:
         logger.error(f"Timeout error geocoding address: {address}")
-        return None
+        return GeocodeCache.STATUS_ERROR, None
     except requests.exceptions.HTTPError as http_err:
         logger.error(f"HTTP error occurred: {http_err} - Status: {response.status_code}")
-        return None
+        return GeocodeCache.STATUS_ERROR, None
     except requests.exceptions.RequestException as req_err:
         logger.error(f"Request error occurred: {req_err}")
-        return None
+        return GeocodeCache.STATUS_ERROR, None
     except ValueError as json_err:
         logger.error(f"JSON decode error: {json_err}")
-        return None
+        return GeocodeCache.STATUS_ERROR, None
     except Exception as e:
         logger.error(f"Unexpected error geocoding address: {e}")
-        return None
+        return GeocodeCache.STATUS_ERROR, None
 
 
 def reverse_geocode(lat, lon, country_code="KE"):
@@ -82,7 +259,77 @@ def reverse_geocode(lat, lon, country_code="KE"):
     except (ValueError, TypeError):
         logger.error(f"Invalid coordinate types: lat={lat}, lon={lon}")
         return None
-    
+
+    cached = lookup_reverse_geocode(lat, lon)
+    if cached is not None:
+        return cached
+
+    location = search_point(lat, lon, country_code)
+    if location is not None:
+        store_reverse_geocode(lat, lon, location)
+    return location
+
+
+def lookup_reverse_geocode(lat, lon):
+    point_hash = geohash.encode(lat, lon, REVERSE_GEOCODE_HASH_PRECISION)
+
+    cached = _reverse_geocode_lru.get(point_hash)
+    if cached is not None:
+        return cached
+
+    # Any stored point within the radius lies in the point's own cell or one
+    # of its neighbours at this precision, each a prefix range on the index
+    precision = geohash.precision_for_radius(REVERSE_GEOCODE_RADIUS_METERS)
+    table = ReverseGeocodeCache.__table__
+    ranges = [geohash_prefix_filter(table.c.geohash, cell) for cell in geohash.neighbours(point_hash[:precision])]
+
+    try:
+        with db.engine.connect() as conn:
+            rows = conn.execute(
+                select(table.c.lat, table.c.lng, table.c.location).where(
+                    or_(*ranges),
+                    table.c.expires_at > datetime.utcnow()
+                )
+            ).all()
+    except SQLAlchemyError as e:
+        logger.error(f"Reverse geocode cache read failed: {e}")
+        return None
+
+    best_distance = None
+    best_location = None
+    for row in rows:
+        distance = geo.haversine(lat, lon, row.lat, row.lng)
+        if distance <= REVERSE_GEOCODE_RADIUS_METERS and (best_distance is None or distance < best_distance):
+            best_distance = distance
+            best_location = row.location
+
+    if best_location is not None:
+        _reverse_geocode_lru.set(point_hash, best_location)
+    return best_location
+
+
+def store_reverse_geocode(lat, lon, location):
+    point_hash = geohash.encode(lat, lon, REVERSE_GEOCODE_HASH_PRECISION)
+    now = datetime.utcnow()
+
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(insert(ReverseGeocodeCache.__table__).values(
+                geohash=point_hash,
+                lat=lat,
+                lng=lon,
+                location=location,
+                fetched_at=now,
+                expires_at=now + REVERSE_GEOCODE_CACHE_TTL
+            ))
+    except SQLAlchemyError as e:
+        logger.error(f"Reverse geocode cache write failed: {e}")
+
+    _reverse_geocode_lru.set(point_hash, location)
+
+
+def search_point(lat, lon, country_code="KE"):
+
     if not GEOCODE_API_KEY:
         logger.error("GEOCODE_EARTH_API key not found in environment variables")
         return None
@@ -96,7 +343,7 @@ def reverse_geocode(lat, lon, country_code="KE"):
     }
 
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = get_http_client("geocode").get(url, params=params)
         response.raise_for_status()
         data = response.json()
 
@@ -0,0 +1,155 @@
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+BASE32_INDEX = {c: i for i, c in enumerate(BASE32)}
+
+# Shortest side of a cell at each precision, in metres (at the equator)
+CELL_MIN_SIDE_METERS = {
+    1: 4992600,
+    2: 624100,
+    3: 156000,
+    4: 19500,
+    5: 4890,
+    6: 610,
+    7: 153,
+    8: 19,
+    9: 4.8,
+    10: 0.6,
+}
+
+
+def encode(lat, lng, precision=9):
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+
+    while len(chars) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if lng >= mid:
+                value = (value << 1) | 1
+                lng_range[0] = mid
+            else:
+                value = value << 1
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if lat >= mid:
+                value = (value << 1) | 1
+                lat_range[0] = mid
+            else:
+                value = value << 1
+                lat_range[1] = mid
+
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+
+    return "".join(chars)
+
+
+def bounds(geohash):
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+
+    for c in geohash:
+        value = BASE32_INDEX[c]
+        for shift in (4, 3, 2, 1, 0):
+            bit = (value >> shift) & 1
+            target = lng_range if even else lat_range
+            mid = (target[0] + target[1]) / 2
+            if bit:
+                target[0] = mid
+            else:
+                target[1] = mid
+            even = not even
+
+    return lat_range[0], lng_range[0], lat_range[1], lng_range[1]
+
+
+def decode(geohash):
+    min_lat, min_lng, max_lat, max_lng = bounds(geohash)
+    return (min_lat + max_lat) / 2, (min_lng + max_lng) / 2
+
+
+def neighbours(geohash):
+    # The cell itself plus the eight around it
+    min_lat, min_lng, max_lat, max_lng = bounds(geohash)
+    lat_step = max_lat - min_lat
+    lng_step = max_lng - min_lng
+    lat, lng = (min_lat + max_lat) / 2, (min_lng + max_lng) / 2
+
+    cells = []
+    for d_lat in (-1, 0, 1):
+        for d_lng in (-1, 0, 1):
+            n_lat = lat + d_lat * lat_step
+            if n_lat > 90 or n_lat < -90:
+                continue
+            n_lng = (lng + d_lng * lng_step + 180) % 360 - 180
+            cell = encode(n_lat, n_lng, len(geohash))
+            if cell not in cells:
+                cells.append(cell)
+    return cells
+
+
+def prefix_range(prefix):
+    # (lower, upper) such that lower <= h < upper for every geohash h
+    # starting with prefix; upper is None when there is no bound. The upper
+    # end is the next base32 prefix rather than prefix + "~", since "~" only
+    # sorts after letters under byte ordering and not in locale collations
+    chars = list(prefix)
+    while chars and chars[-1] == BASE32[-1]:
+        chars.pop()
+    if not chars:
+        return prefix, None
+
+    chars[-1] = BASE32[BASE32_INDEX[chars[-1]] + 1]
+    return prefix, "".join(chars)
+
+
+def precision_for_radius(radius_meters):
+    # Finest precision whose cells are still at least radius wide, so a
+    # point's own cell and its neighbours cover the whole circle
+    precision = 1
+    for p in sorted(CELL_MIN_SIDE_METERS):
+        if CELL_MIN_SIDE_METERS[p] >= radius_meters:
+            precision = p
+    return precision
+
+
+def cell_size(precision):
+    # (lat degrees, lng degrees) of a cell; longitude takes the odd bit
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+def covering(min_lat, min_lng, max_lat, max_lng, max_cells=16):
+    # Cells at the finest precision that covers the box in at most max_cells.
+    # A box straddling the antimeridian is not split
+    precision = 1
+    for p in range(1, 10):
+        lat_step, lng_step = cell_size(p)
+        count = (int((max_lat - min_lat) / lat_step) + 2) * (int((max_lng - min_lng) / lng_step) + 2)
+        if count > max_cells:
+            break
+        precision = p
+
+    lat_step, lng_step = cell_size(precision)
+    cells = set()
+    lat = min_lat
+    while True:
+        lng = min_lng
+        while True:
+            cells.add(encode(min(lat, max_lat), min(lng, max_lng), precision))
+            if lng >= max_lng:
+                break
+            lng += lng_step
+        if lat >= max_lat:
+            break
+        lat += lat_step
+    return sorted(cells)
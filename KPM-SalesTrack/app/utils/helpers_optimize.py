@@ -14,8 +14,8 @@ def format_route(route):
         'user_name': route.user.name if route.user else None,
         'route_date': route.route_date.isoformat(),
         'route_type': route.route_type,
-        'departure_time': route.scheduled_departure_time.strftime('%H:%M') if route.scheduled_departure_time else None,
-        'return_time': route.scheduled_return_time.strftime('%H:%M') if route.scheduled_return_time else None,
+        'departure_time': format_time(route.scheduled_departure_time),
+        'return_time': format_time(route.scheduled_return_time),
         'total_distance_km': round(route.google_route.total_distance_meters / 1000, 2) if route.google_route else None,
         'total_duration_minutes': round(route.google_route.total_duration_seconds / 60, 2) if route.google_route else None,
         'status': route.status,
@@ -23,7 +23,7 @@ def format_route(route):
     }
 
     if route.route_type == 'shared':
-        if route.lead_route_id is None:
+        if route.shared_with_route_id is None:
             info['carpool_role'] = 'lead'
             info['carpoolers'] = [r.user.name for r in route.carpoolers] if route.carpoolers else []
         else:
@@ -35,8 +35,8 @@ def format_stop(stop):
     info = {
         'stop_order': stop.stop_order,
         'stop_type': stop.stop_type,
-        'arrival_time': stop.estimated_arrival_time.strftime('%H:%M') if stop.estimated_arrival_time else None,
-        'departure_time': stop.estimated_departure_time.strftime('%H:%M') if stop.estimated_departure_time else None,
+        'arrival_time': format_time(stop.estimated_arrival_time),
+        'departure_time': format_time(stop.estimated_departure_time),
         'distance_from_previous_km': round(stop.distance_from_previous_meters / 1000, 2) if stop.distance_from_previous_meters else 0,
         'duration_from_previous_minutes': round(stop.duration_from_previous_seconds / 60, 2) if stop.duration_from_previous_seconds else 0,
         'status': stop.status
@@ -60,7 +60,7 @@ def format_google_route(google_route):
     }
 
 def format_carpool(route):
-    if route.lead_route_id is None:
+    if route.shared_with_route_id is None:
         return {
             'role': 'lead',
             'carpoolers': [
@@ -93,3 +93,21 @@ def format_stop_basic(stop):
         }
 
     return info
+
+
+def format_job(job):
+    progress = job.progress or {}
+    return {
+        'id': job.id,
+        'start_date': job.start_date.isoformat(),
+        'end_date': job.end_date.isoformat(),
+        'status': job.status,
+        'total_days': progress.get('total_days', 0),
+        'days_done': len(progress.get('days', [])),
+        'days': progress.get('days', []),
+        'result': job.result,
+        'error': job.error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None
+    }
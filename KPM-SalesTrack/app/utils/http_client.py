@@ -0,0 +1,232 @@
+import os
+import random
+import threading
+import time
+import logging
+from collections import deque
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# (connect, read) timeouts and concurrency per outbound provider; deadline
+# caps a call's total seconds across retries
+# Geocoding sits on request paths (client and meeting writes, check-ins), so
+# it gets one retry and an overall deadline that stays under proxy timeouts
+PROVIDER_SETTINGS = {
+    "geocode": {"timeout": (3.05, 5), "max_concurrency": 8, "max_retries": 1, "deadline": 10},
+    "google_routes": {"timeout": (3.05, 30), "max_concurrency": 8},
+    "google_route_matrix": {"timeout": (3.05, 30), "max_concurrency": 4},
+}
+
+
+# Called as listener(client_name, seconds, status) after every outbound call
+_call_listeners = []
+
+
+def add_call_listener(listener):
+    _call_listeners.append(listener)
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    pass
+
+
+class CircuitBreaker:
+
+    def __init__(self, failure_threshold=5, reset_seconds=30):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        # Once the cool-down has passed a single probe call goes through and
+        # the rest are turned away until it resolves: its failure re-opens
+        # the circuit, its success closes it. A probe that never reports
+        # back stops blocking after another cool-down
+        with self._lock:
+            if self.opened_at is None:
+                return True
+
+            now = time.monotonic()
+            if now - self.opened_at < self.reset_seconds:
+                return False
+            if self.probe_started is not None and now - self.probe_started < self.reset_seconds:
+                return False
+
+            self.probe_started = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probe_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+            self.probe_started = None
+
+
+class HttpClient:
+
+    def __init__(self, name, timeout=(3.05, 10), max_retries=3, backoff_base=0.5, backoff_max=8.0,
+                 max_concurrency=8, pool_size=10, breaker=None, deadline=None):
+        self.name = name
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.deadline = deadline
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+
+        # Keep-alive connections are reused across calls and threads
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.latencies = deque(maxlen=1000)
+        self._lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def request(self, method, url, **kwargs):
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+
+        timeout = kwargs.pop("timeout", self.timeout)
+        deadline = time.monotonic() + self.deadline if self.deadline else None
+        response = None
+        error = None
+
+        for attempt in range(self.max_retries + 1):
+            if attempt > 0:
+                delay = self.backoff_seconds(attempt, response)
+                # Not worth a retry that could not finish in time
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    break
+                with self._lock:
+                    self.retries += 1
+                time.sleep(delay)
+
+            kwargs["timeout"] = timeout if deadline is None else self.remaining_timeout(timeout, deadline)
+            response = None
+            error = None
+            started = time.perf_counter()
+            with self.semaphore:
+                try:
+                    response = self.session.request(method, url, **kwargs)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    error = e
+            self.record_call(time.perf_counter() - started, response, attempt)
+
+            if response is not None and response.status_code not in RETRY_STATUSES:
+                # A 4xx is the caller's problem, not the provider being down
+                self.breaker.record_success()
+                return response
+
+        self.breaker.record_failure()
+        if response is not None:
+            return response
+        raise error
+
+    def remaining_timeout(self, timeout, deadline):
+        remaining = max(deadline - time.monotonic(), 0.001)
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(min(t, remaining) for t in timeout)
+        return min(timeout, remaining)
+
+    def backoff_seconds(self, attempt, response=None):
+        if response is not None and response.headers.get("Retry-After", "").isdigit():
+            return min(float(response.headers["Retry-After"]), self.backoff_max)
+
+        # Full jitter keeps parallel workers from retrying in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1))))
+
+    def record_call(self, seconds, response, attempt):
+        status = response.status_code if response is not None else "error"
+        with self._lock:
+            self.calls += 1
+            if response is None or response.status_code >= 500:
+                self.errors += 1
+            self.latencies.append(seconds)
+
+        logger.debug(f"{self.name} call status={status} attempt={attempt} latency_ms={seconds * 1000:.1f}")
+        for listener in _call_listeners:
+            listener(self.name, seconds, status)
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self.latencies)
+
+        def percentile(p):
+            if len(latencies) == 0:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 1)
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "max_ms": round(latencies[-1] * 1000, 1) if latencies else None,
+            "circuit": self.breaker.state
+        }
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_http_client(name):
+    with _clients_lock:
+        client = _clients.get(name)
+        if client is None:
+            settings = PROVIDER_SETTINGS.get(name, {})
+            client = HttpClient(
+                name,
+                timeout=settings.get("timeout", (3.05, 10)),
+                max_retries=settings.get("max_retries", int(os.getenv("HTTP_MAX_RETRIES", "3"))),
+                max_concurrency=settings.get("max_concurrency", 8),
+                deadline=settings.get("deadline"),
+                breaker=CircuitBreaker(
+                    failure_threshold=int(os.getenv("HTTP_BREAKER_FAILURES", "5")),
+                    reset_seconds=float(os.getenv("HTTP_BREAKER_RESET_SECONDS", "30"))
+                )
+            )
+            _clients[name] = client
+        return client
+
+
+def http_client_stats():
+    with _clients_lock:
+        clients = list(_clients.values())
+    return {client.name: client.stats() for client in clients}
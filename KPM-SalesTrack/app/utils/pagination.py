@@ -0,0 +1,139 @@
+import base64
+import json
+import math
+from datetime import date, datetime
+from flask import request
+from sqlalchemy import tuple_
+from app.db import db
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class Page:
+
+    def __init__(self, items, per_page, page=None, total=None, has_next=False, has_prev=False, next_cursor=None, cursor_mode=False):
+        self.items = items
+        self.per_page = per_page
+        self.page = page
+        self.total = total
+        self.has_next = has_next
+        self.has_prev = has_prev
+        self.next_cursor = next_cursor
+        self.cursor_mode = cursor_mode
+
+    @property
+    def pages(self):
+        if self.total is None:
+            return None
+        return math.ceil(self.total / self.per_page) if self.per_page else 0
+
+    def info(self):
+        if self.cursor_mode:
+            info = {
+                "per_page": self.per_page,
+                "has_next": self.has_next,
+                "next_cursor": self.next_cursor
+            }
+            if self.total is not None:
+                info["total"] = self.total
+            return info
+
+        return {
+            "page": self.page,
+            "per_page": self.per_page,
+            "total": self.total,
+            "pages": self.pages,
+            "has_next": self.has_next,
+            "has_prev": self.has_prev
+        }
+
+
+def encode_cursor(values):
+    encoded = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(encoded).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, columns):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise InvalidCursor("Invalid cursor")
+
+    decoded = []
+    for value, column in zip(values, columns):
+        python_type = column.type.python_type
+        try:
+            if value is not None and python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif value is not None and python_type is date:
+                value = date.fromisoformat(value)
+        except (ValueError, TypeError):
+            raise InvalidCursor("Invalid cursor")
+        decoded.append(value)
+    return decoded
+
+
+def estimate_count(query):
+    statement = query.order_by(None).statement
+    connection = db.session.connection()
+
+    # The planner's row estimate costs nothing compared to COUNT(*) on a big table
+    if connection.dialect.name != "postgresql":
+        return query.order_by(None).count()
+
+    compiled = statement.compile(dialect=connection.dialect)
+    plan = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def paginate(query, id_column, page, per_page, sort_column=None, descending=False):
+    # Keyset mode when the caller sends a cursor (empty for the first page),
+    # classic page/per_page otherwise
+    cursor = request.args.get("cursor")
+    total_mode = request.args.get("total")
+
+    columns = [sort_column, id_column] if sort_column is not None else [id_column]
+    ordering = [c.desc() if descending else c.asc() for c in columns]
+
+    if cursor is None:
+        pagination = query.order_by(*ordering).paginate(page=page, per_page=per_page, error_out=False)
+        return Page(
+            pagination.items,
+            per_page,
+            page=pagination.page,
+            total=pagination.total,
+            has_next=pagination.has_next,
+            has_prev=pagination.has_prev
+        )
+
+    total = None
+    if total_mode == "exact":
+        total = query.order_by(None).count()
+    elif total_mode == "estimate":
+        total = estimate_count(query)
+
+    if cursor:
+        after = decode_cursor(cursor, columns)
+        key = tuple_(*columns) if len(columns) > 1 else columns[0]
+        bound = tuple_(*after) if len(columns) > 1 else after[0]
+        query = query.filter(key < bound if descending else key > bound)
+
+    # One extra row tells us whether there is a next page without counting
+    rows = query.order_by(*ordering).limit(per_page + 1).all()
+    has_next = len(rows) > per_page
+    items = rows[:per_page]
+
+    next_cursor = None
+    if has_next:
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+
+    return Page(items, per_page, total=total, has_next=has_next, has_prev=bool(cursor), next_cursor=next_cursor, cursor_mode=True)
@@ -0,0 +1,44 @@
+from sqlalchemy import and_
+from sqlalchemy.orm import joinedload, selectinload, load_only
+from app.models import Meeting, Route, RouteMeeting, RoutePlan, Client, User
+from .serializers import MEETING_LIST_COLUMNS
+from . import geohash
+
+
+def with_meeting_relations(query):
+    # Client and rep are many-to-one, so joining them keeps LIMIT/OFFSET exact.
+    # Only the columns the meeting list views print are selected
+    return query.options(
+        load_only(*MEETING_LIST_COLUMNS),
+        joinedload(Meeting.client).load_only(Client.id, Client.company_name, Client.contact_person),
+        joinedload(Meeting.user).load_only(User.id, User.first_name, User.last_name)
+    )
+
+
+def with_route_relations(query):
+    return query.options(
+        joinedload(Route.user),
+        joinedload(Route.google_route),
+        joinedload(Route.lead_route).joinedload(Route.user),
+        selectinload(Route.stops).joinedload(RouteMeeting.meeting).joinedload(Meeting.client),
+        selectinload(Route.carpoolers).joinedload(Route.user)
+    )
+
+
+def current_routes(query, route_date=None):
+    # Routes from each day's current plan only; superseded runs stay out
+    query = query.join(RoutePlan, RoutePlan.id == Route.plan_id).filter(
+        RoutePlan.status == RoutePlan.STATUS_CURRENT
+    )
+    if route_date is not None:
+        query = query.filter(RoutePlan.route_date == route_date)
+    return query
+
+
+def geohash_prefix_filter(column, prefix):
+    # Every geohash under prefix, as a range the column's index can serve
+    # under any collation
+    lower, upper = geohash.prefix_range(prefix)
+    if upper is None:
+        return column >= lower
+    return and_(column >= lower, column < upper)
@@ -0,0 +1,127 @@
+from datetime import date
+from sqlalchemy.orm import load_only
+from app.models import Client, User, Task, Objective, Meeting
+
+
+def iso(value):
+    return value.isoformat() if value is not None else None
+
+
+def hhmm(value):
+    return value.strftime('%H:%M') if value is not None else None
+
+
+def location_label(location):
+    return location.get("label") if location else location
+
+
+class ModelSerializer:
+
+    # fields: (output key, attribute, converter or None)
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+        self.attributes = [attribute for _, attribute, _ in fields]
+
+    def columns(self):
+        # Primary key always loads so the identity map still works
+        names = set(self.attributes) | {'id'}
+        return [getattr(self.model, name) for name in self.model.__table__.columns.keys() if name in names]
+
+    def project(self, query):
+        return query.options(load_only(*self.columns()))
+
+    def dump(self, obj):
+        data = {}
+        for key, attribute, converter in self.fields:
+            value = getattr(obj, attribute)
+            data[key] = converter(value) if converter is not None else value
+        return data
+
+    def dump_many(self, objs):
+        # Resolve attribute/converter pairs once for the whole page
+        fields = self.fields
+        rows = []
+        for obj in objs:
+            row = {}
+            for key, attribute, converter in fields:
+                value = getattr(obj, attribute)
+                row[key] = converter(value) if converter is not None else value
+            rows.append(row)
+        return rows
+
+
+client_serializer = ModelSerializer(Client, [
+    ("id", "id", None),
+    ("company_name", "company_name", None),
+    ("contact_person", "contact_person", None),
+    ("phone_number", "phone_number", None),
+    ("email", "email", None),
+    ("address", "address", None),
+    ("status", "status", None),
+    ("location", "location", None),
+    ("created_at", "created_at", iso),
+    ("assigned_to", "assigned_to", None),
+])
+
+user_serializer = ModelSerializer(User, [
+    ("id", "id", None),
+    ("first_name", "first_name", None),
+    ("last_name", "last_name", None),
+    ("email", "email", None),
+    ("phone_number", "phone_number", None),
+    ("role", "role", None),
+    ("is_active", "is_active", None),
+    ("created_at", "created_at", iso),
+])
+
+task_serializer = ModelSerializer(Task, [
+    ("id", "id", None),
+    ("title", "title", None),
+    ("description", "description", None),
+    ("status", "status", None),
+    ("assigned_to", "assigned_to", None),
+    ("assigned_by", "assigned_by", None),
+    ("due_date", "due_date", iso),
+    ("created_at", "created_at", iso),
+])
+
+objective_serializer = ModelSerializer(Objective, [
+    ("id", "id", None),
+    ("title", "title", None),
+    ("description", "description", None),
+    ("target_value", "target_value", None),
+    ("current_value", "current_value", None),
+    ("start_date", "start_date", iso),
+    ("end_date", "end_date", iso),
+    ("user_id", "user_id", None),
+    ("created_by", "created_by", None),
+    ("created_at", "created_at", iso),
+])
+
+# Columns the meeting list views read; the client and rep come from
+# with_meeting_relations
+MEETING_LIST_COLUMNS = [
+    Meeting.id, Meeting.user_id, Meeting.client_id, Meeting.title, Meeting.duration,
+    Meeting.location, Meeting.meeting_type, Meeting.scheduled_time, Meeting.scheduled_date
+]
+
+
+def dump_meeting_summary(m, today=None):
+    today = today or date.today()
+    client = m.client
+    user = m.user
+
+    return {
+        "id": m.id,
+        "client": client.company_name if client else "Unknown",
+        "contactPerson": client.contact_person if client else "N/A",
+        "meetingType": m.meeting_type,
+        "date": m.scheduled_date.isoformat(),
+        "time": m.scheduled_time.strftime('%H:%M'),
+        "location": location_label(m.location),
+        "status": "Completed" if m.scheduled_date < today else "Upcoming",
+        "salesPerson": f"{user.first_name} {user.last_name}" if user else "Unknown",
+        "duration": m.duration,
+        "notes": m.title
+    }
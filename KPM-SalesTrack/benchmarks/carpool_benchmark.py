@@ -0,0 +1,118 @@
+# Shows how carpool grouping scales with the size of the sales floor and
+# compares it with the old pairwise greedy where that is still tractable.
+#
+#   python benchmarks/carpool_benchmark.py --reps 10 100 1000 5000
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.carpool_service import CarpoolService
+
+
+def make_floor(rng, reps):
+    day_start = datetime(2026, 3, 2, 8, 0)
+    user_meetings = {}
+    meeting_id = 1
+
+    for user_id in range(1, reps + 1):
+        # Each rep works one part of town
+        base_lat = -1.30072 + rng.uniform(-0.15, 0.15)
+        base_lng = 36.8219 + rng.uniform(-0.2, 0.2)
+
+        meetings = []
+        slot = day_start + timedelta(minutes=30 * rng.randint(0, 6))
+        for _ in range(rng.randint(1, 4)):
+            meetings.append(SimpleNamespace(
+                id=meeting_id,
+                user_id=user_id,
+                location={'coordinates': [base_lng + rng.uniform(-0.02, 0.02), base_lat + rng.uniform(-0.02, 0.02)]},
+                scheduled_time=slot,
+                duration=60
+            ))
+            meeting_id += 1
+            slot = slot + timedelta(minutes=rng.choice([90, 120, 150]))
+
+        user_meetings[user_id] = meetings
+
+    return user_meetings
+
+
+def legacy_find_carpool_groups(service, user_meetings):
+    # The pairwise greedy this replaced, kept here for comparison only
+    user_ids = list(user_meetings.keys())
+    groups = []
+    users_already_grouped = []
+
+    for i in range(len(user_ids)):
+        user1_id = user_ids[i]
+        if user1_id in users_already_grouped:
+            continue
+
+        group = {'users': [user1_id]}
+        users_already_grouped.append(user1_id)
+
+        for j in range(i + 1, len(user_ids)):
+            user2_id = user_ids[j]
+            if user2_id in users_already_grouped:
+                continue
+
+            if service.can_carpool_together(user_meetings[user1_id], user_meetings[user2_id]):
+                group['users'].append(user2_id)
+                users_already_grouped.append(user2_id)
+                if len(group['users']) >= service.max_passengers:
+                    break
+
+        groups.append(group)
+
+    return groups
+
+
+def spread_km(service, user_meetings, groups):
+    # Mean distance from each passenger's meeting centre to their lead's
+    total = 0.0
+    count = 0
+    for group in groups:
+        lead = service.meeting_centre(user_meetings[group['users'][0]])
+        for user_id in group['users'][1:]:
+            total += service.centre_distance_km(lead, service.meeting_centre(user_meetings[user_id]))
+            count += 1
+    return total / count if count else 0.0
+
+
+def describe(service, user_meetings, groups, seconds):
+    shared = [g for g in groups if len(g['users']) > 1]
+    return (f"{1000 * seconds:9.1f} ms  groups={len(groups):5d}  shared={len(shared):5d}  "
+            f"passenger spread={spread_km(service, user_meetings, groups):5.1f} km")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--reps', type=int, nargs='+', default=[10, 100, 500, 1000, 2500, 5000])
+    parser.add_argument('--legacy-limit', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=11)
+    args = parser.parse_args()
+
+    service = CarpoolService()
+
+    for reps in args.reps:
+        user_meetings = make_floor(random.Random(args.seed), reps)
+        print(f"reps={reps}")
+
+        started = time.perf_counter()
+        groups = service.find_carpool_groups(user_meetings)
+        print("  clustered " + describe(service, user_meetings, groups, time.perf_counter() - started))
+
+        if reps <= args.legacy_limit:
+            started = time.perf_counter()
+            groups = legacy_find_carpool_groups(service, user_meetings)
+            print("  legacy    " + describe(service, user_meetings, groups, time.perf_counter() - started))
+
+
+if __name__ == '__main__':
+    main()
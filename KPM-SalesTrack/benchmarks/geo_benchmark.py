@@ -0,0 +1,102 @@
+# Times app.utils.geo against geopy's geodesic on random point pairs and
+# reports each formula's relative error against the geodesic, overall and
+# for short hops around Nairobi.
+#
+#   python benchmarks/geo_benchmark.py --pairs 1000000
+#   python benchmarks/geo_benchmark.py --geodesic-sample 50000
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from geopy.distance import geodesic
+from app.utils import geo
+
+NAIROBI = (-1.2864, 36.8172)
+
+
+def random_pairs(rng, n, center=None, spread=None):
+    if center is None:
+        # Uniform over the sphere, not over lat/lng degrees
+        lat = np.degrees(np.arcsin(rng.uniform(-1, 1, (2, n))))
+        lng = rng.uniform(-180, 180, (2, n))
+    else:
+        lat = center[0] + rng.uniform(-spread, spread, (2, n))
+        lng = center[1] + rng.uniform(-spread, spread, (2, n))
+    return lat[0], lng[0], lat[1], lng[1]
+
+
+def rate(seconds, count):
+    return count / seconds / 1e6
+
+
+def throughput(pairs, sample):
+    lat1, lng1, lat2, lng2 = pairs
+    n = len(lat1)
+    rows = []
+
+    for name, fn in (('haversine', geo.haversine_array), ('equirectangular', geo.equirectangular_array)):
+        start = time.perf_counter()
+        fn(lat1, lng1, lat2, lng2)
+        rows.append((f'{name} (numpy)', n, time.perf_counter() - start))
+
+    # Single-point path, one call per pair as a check-in makes it
+    scalars = [(float(a), float(b), float(c), float(d)) for a, b, c, d in zip(lat1[:sample], lng1[:sample], lat2[:sample], lng2[:sample])]
+    start = time.perf_counter()
+    for a, b, c, d in scalars:
+        geo.haversine(a, b, c, d)
+    rows.append(('haversine (scalar)', sample, time.perf_counter() - start))
+
+    start = time.perf_counter()
+    for a, b, c, d in scalars:
+        geodesic((a, b), (c, d)).meters
+    rows.append(('geopy geodesic', sample, time.perf_counter() - start))
+
+    return rows
+
+
+def errors(pairs, sample):
+    lat1, lng1, lat2, lng2 = (values[:sample] for values in pairs)
+    exact = np.array([geodesic((a, b), (c, d)).meters for a, b, c, d in zip(lat1, lng1, lat2, lng2)])
+    keep = exact > 1.0
+
+    results = {}
+    for name, fn in (('haversine', geo.haversine_array), ('equirectangular', geo.equirectangular_array)):
+        relative = np.abs(fn(lat1, lng1, lat2, lng2)[keep] - exact[keep]) / exact[keep]
+        results[name] = (relative.mean() * 100, np.percentile(relative, 99) * 100, relative.max() * 100)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pairs', type=int, default=1000000)
+    parser.add_argument('--geodesic-sample', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    pairs = random_pairs(rng, args.pairs)
+    sample = min(args.geodesic_sample, args.pairs)
+
+    print(f"pairs={args.pairs} geodesic_sample={sample}")
+    print(f"{'method':<24}{'pairs':>10}{'seconds':>10}{'M pairs/s':>12}")
+    for name, count, seconds in throughput(pairs, sample):
+        print(f"{name:<24}{count:>10}{seconds:>10.3f}{rate(seconds, count):>12.3f}")
+
+    print()
+    print(f"{'error vs geodesic (%)':<44}{'mean':>10}{'p99':>10}{'max':>10}")
+    scenarios = (
+        ('global pairs', pairs),
+        ('Nairobi, within ~50 km', random_pairs(rng, sample, NAIROBI, 0.3)),
+        ('Nairobi, within ~100 m', random_pairs(rng, sample, NAIROBI, 0.0005)),
+    )
+    for label, scenario in scenarios:
+        for name, (mean, p99, worst) in errors(scenario, sample).items():
+            print(f"{label + ' ' + name:<44}{mean:>10.4f}{p99:>10.4f}{worst:>10.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+# Seeds a large synthetic dataset and times the hot list/lookup queries with
+# and without the secondary indexes, printing each query plan.
+#
+#   python benchmarks/index_benchmark.py --meetings 1000000
+#   python benchmarks/index_benchmark.py --database-url postgresql://localhost/kpm_bench
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, text
+from app.db import db
+from app.models import User, Client, Meeting, Route, RouteMeeting, GoogleRoute, Task, Objective
+
+TABLES = [User, Client, GoogleRoute, Meeting, Route, RouteMeeting, Task, Objective]
+
+QUERIES = [
+    ('meetings by date and type',
+     "SELECT * FROM meetings WHERE scheduled_date = :day AND meeting_type = 'field'"),
+    ('rep meetings for a day',
+     "SELECT * FROM meetings WHERE user_id = :user_id AND scheduled_date = :day ORDER BY scheduled_time"),
+    ('client meeting history',
+     "SELECT * FROM meetings WHERE client_id = :client_id ORDER BY scheduled_date DESC"),
+    ('routes for a day',
+     "SELECT * FROM routes WHERE route_date = :day LIMIT 20"),
+    ('accepted route for a rep',
+     "SELECT * FROM routes WHERE user_id = :user_id AND route_date = :day AND status = 'accepted'"),
+    ('route stops',
+     "SELECT * FROM route_meetings WHERE route_id = :route_id ORDER BY stop_order"),
+    ('clients of a rep',
+     "SELECT * FROM clients WHERE assigned_to = :user_id"),
+    ('tasks of a rep',
+     "SELECT * FROM tasks WHERE assigned_to = :user_id"),
+    ('objectives of a rep',
+     "SELECT * FROM objectives WHERE user_id = :user_id"),
+    ('google route by waypoints',
+     "SELECT id FROM google_routes WHERE waypoints_hash = :waypoints_hash"),
+]
+
+
+def chunks(rows, size=20000):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def bulk_insert(conn, model, rows):
+    for chunk in chunks(rows):
+        conn.execute(insert(model.__table__), chunk)
+
+
+def seed(engine, meetings, rng):
+    users = max(50, meetings // 2000)
+    clients = max(100, meetings // 20)
+    routes = max(100, meetings // 5)
+    first_day = date(2026, 1, 5)
+    days = 250
+
+    with engine.begin() as conn:
+        bulk_insert(conn, User, [{
+            'id': i, 'first_name': 'Rep', 'last_name': str(i), 'email': f'rep{i}@example.com',
+            'phone_number': '0700000000', 'role': 'sales', 'password': 'x', 'is_active': True,
+            'created_at': datetime(2026, 1, 1)
+        } for i in range(1, users + 1)])
+
+        bulk_insert(conn, Client, [{
+            'id': i, 'company_name': f'Client {i}', 'contact_person': 'Contact', 'phone_number': '0700000000',
+            'email': f'client{i}@example.com', 'address': f'{i} Moi Avenue', 'status': 'active',
+            'location': {'coordinates': [36.8219, -1.30072]}, 'created_at': datetime(2026, 1, 1),
+            'assigned_to': rng.randint(1, users)
+        } for i in range(1, clients + 1)])
+
+        rows = []
+        for i in range(1, meetings + 1):
+            day = first_day + timedelta(days=rng.randrange(days))
+            rows.append({
+                'id': i, 'user_id': rng.randint(1, users), 'client_id': rng.randint(1, clients), 'title': 'Visit',
+                'duration': 60, 'created_at': datetime(2026, 1, 1), 'location': {'coordinates': [36.8219, -1.30072]},
+                'meeting_type': rng.choice(['field', 'field', 'field', 'virtual']),
+                'scheduled_time': datetime.combine(day, datetime.min.time()) + timedelta(hours=rng.randint(8, 17)),
+                'scheduled_date': day
+            })
+        bulk_insert(conn, Meeting, rows)
+
+        bulk_insert(conn, GoogleRoute, [{
+            'id': i, 'raw_response': {}, 'total_distance_meters': 10000, 'total_duration_seconds': 3600,
+            'encoded_polyline': '', 'waypoints_hash': f'{i:032x}', 'created_at': datetime(2026, 1, 1)
+        } for i in range(1, routes + 1)])
+
+        bulk_insert(conn, Route, [{
+            'id': i, 'user_id': rng.randint(1, users), 'route_date': first_day + timedelta(days=rng.randrange(days)),
+            'google_route_id': i, 'route_type': 'individual',
+            'status': rng.choice(['pending', 'accepted', 'rejected']), 'created_at': datetime(2026, 1, 1)
+        } for i in range(1, routes + 1)])
+
+        bulk_insert(conn, RouteMeeting, [{
+            'id': i, 'route_id': (i - 1) // 5 + 1, 'meeting_id': i, 'stop_order': (i - 1) % 5,
+            'stop_type': 'meeting', 'estimated_arrival_time': datetime(2026, 1, 5, 9),
+            'estimated_departure_time': datetime(2026, 1, 5, 10), 'status': 'scheduled',
+            'created_at': datetime(2026, 1, 1)
+        } for i in range(1, routes * 5 + 1)])
+
+        bulk_insert(conn, Task, [{
+            'id': i, 'title': 'Follow up', 'description': '', 'assigned_to': rng.randint(1, users),
+            'assigned_by': 1, 'status': 'pending', 'created_at': datetime(2026, 1, 1)
+        } for i in range(1, meetings // 10 + 1)])
+
+        bulk_insert(conn, Objective, [{
+            'id': i, 'user_id': rng.randint(1, users), 'title': 'Visits', 'target_value': 100, 'current_value': 0,
+            'start_date': datetime(2026, 1, 1), 'end_date': datetime(2026, 12, 31), 'created_at': datetime(2026, 1, 1),
+            'created_by': 1
+        } for i in range(1, users * 10 + 1)])
+
+    return users, clients, routes, first_day, days
+
+
+def explain(conn, sql, params):
+    if conn.dialect.name == 'postgresql':
+        rows = conn.execute(text('EXPLAIN ' + sql), params).fetchall()
+        return ' | '.join(r[0].strip() for r in rows[:3])
+    rows = conn.execute(text('EXPLAIN QUERY PLAN ' + sql), params).fetchall()
+    return ' | '.join(r[-1] for r in rows)
+
+
+def run_queries(engine, seeded, rng, repeat):
+    users, clients, routes, first_day, days = seeded
+    results = {}
+
+    with engine.connect() as conn:
+        for name, sql in QUERIES:
+            timings = []
+            plan = None
+            for _ in range(repeat):
+                params = {
+                    'day': first_day + timedelta(days=rng.randrange(days)),
+                    'user_id': rng.randint(1, users),
+                    'client_id': rng.randint(1, clients),
+                    'route_id': rng.randint(1, routes),
+                    'waypoints_hash': f'{rng.randint(1, routes):032x}'
+                }
+                if plan is None:
+                    plan = explain(conn, sql, params)
+
+                start = time.perf_counter()
+                conn.execute(text(sql), params).fetchall()
+                timings.append(time.perf_counter() - start)
+
+            timings.sort()
+            results[name] = (timings[len(timings) // 2] * 1000, plan)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--database-url', default='sqlite:////tmp/kpm_index_benchmark.db')
+    parser.add_argument('--meetings', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    if args.database_url.startswith('sqlite:////') and os.path.exists(args.database_url[len('sqlite:///'):]):
+        os.remove(args.database_url[len('sqlite:///'):])
+
+    engine = create_engine(args.database_url)
+    tables = [model.__table__ for model in TABLES]
+    indexes = [index for table in tables for index in table.indexes]
+
+    db.metadata.drop_all(engine, tables=list(reversed(tables)))
+    for table in tables:
+        table.create(engine)
+    with engine.begin() as conn:
+        for index in indexes:
+            index.drop(conn)
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    seeded = seed(engine, args.meetings, rng)
+    print(f"Seeded {args.meetings} meetings in {time.perf_counter() - start:.1f}s")
+
+    before = run_queries(engine, seeded, random.Random(args.seed), args.repeat)
+
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        for index in indexes:
+            index.create(conn)
+        conn.execute(text('ANALYZE'))
+    print(f"Built {len(indexes)} indexes in {time.perf_counter() - start:.1f}s")
+
+    after = run_queries(engine, seeded, random.Random(args.seed), args.repeat)
+
+    print()
+    print(f"{'query':<28}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for name, _ in QUERIES:
+        b = before[name][0]
+        a = after[name][0]
+        print(f"{name:<28}{b:>12.3f}{a:>12.3f}{b / a if a else 0:>9.0f}x")
+
+    print()
+    for name, _ in QUERIES:
+        print(f"{name}")
+        print(f"  before: {before[name][1]}")
+        print(f"  after:  {after[name][1]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+# Seeds clients around Nairobi and times "clients near me" lookups: loading
+# every client and measuring each with geopy, against the geohash-prefix
+# search behind /clients/nearby. Both must return the same clients.
+#
+#   python benchmarks/nearby_clients_benchmark.py --clients 100000
+#   python benchmarks/nearby_clients_benchmark.py --radius-km 2 --limit 20
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import insert, select
+from geopy.distance import geodesic
+from app.db import db
+from app.models import User, Client
+from app.models.geo_point import GEOHASH_PRECISION
+from app.utils import geohash
+from app.services import NearbyClientsService
+
+CENTER = (-1.2864, 36.8172)
+
+
+def seed(clients, reps, spread_km, rng):
+    spread = spread_km / 111.32
+
+    db.session.execute(insert(User.__table__), [{
+        'id': i, 'first_name': 'Rep', 'last_name': str(i), 'email': f'rep{i}@example.com',
+        'phone_number': '0700000000', 'role': 'sales', 'password': 'x', 'is_active': True,
+        'created_at': datetime(2026, 1, 1)
+    } for i in range(1, reps + 1)])
+
+    rows = []
+    for i in range(1, clients + 1):
+        lat = CENTER[0] + rng.uniform(-spread, spread)
+        lng = CENTER[1] + rng.uniform(-spread, spread)
+        rows.append({
+            'id': i, 'company_name': f'Client {i}', 'contact_person': 'Contact', 'phone_number': '0700000000',
+            'email': f'client{i}@example.com', 'address': f'{i} Moi Avenue', 'status': 'active',
+            'location': {'coordinates': [lng, lat], 'label': f'{i} Moi Avenue'},
+            'lat': lat, 'lng': lng, 'geohash': geohash.encode(lat, lng, GEOHASH_PRECISION),
+            'created_at': datetime(2026, 1, 1), 'updated_at': datetime(2026, 1, 1),
+            'assigned_to': rng.randint(1, reps)
+        })
+        if len(rows) == 20000:
+            db.session.execute(insert(Client.__table__), rows)
+            rows = []
+    if rows:
+        db.session.execute(insert(Client.__table__), rows)
+    db.session.commit()
+
+
+def full_scan(lat, lng, radius_meters, limit, assigned_to):
+    # What the endpoint would cost without the index: every client, geopy each
+    query = select(Client.__table__.c.id, Client.__table__.c.location)
+    if assigned_to is not None:
+        query = query.where(Client.__table__.c.assigned_to == assigned_to)
+
+    found = []
+    for row in db.session.execute(query):
+        coordinates = row.location['coordinates']
+        distance = geodesic((lat, lng), (coordinates[1], coordinates[0])).meters
+        if distance <= radius_meters:
+            found.append((distance, row.id))
+    found.sort()
+    return [client_id for _, client_id in found[:limit]]
+
+
+def timed(fn, probes):
+    timings = []
+    results = []
+    for probe in probes:
+        start = time.perf_counter()
+        results.append(fn(*probe))
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--database-url', default='sqlite:////tmp/kpm_nearby_benchmark.db')
+    parser.add_argument('--clients', type=int, default=100000)
+    parser.add_argument('--reps', type=int, default=200)
+    parser.add_argument('--spread-km', type=float, default=30)
+    parser.add_argument('--radius-km', type=float, default=5)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--probes', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    if args.database_url.startswith('sqlite:////') and os.path.exists(args.database_url[len('sqlite:///'):]):
+        os.remove(args.database_url[len('sqlite:///'):])
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = args.database_url
+    db.init_app(app)
+
+    with app.app_context():
+        db.metadata.drop_all(db.engine, tables=[Client.__table__, User.__table__])
+        db.metadata.create_all(db.engine, tables=[User.__table__, Client.__table__])
+
+        rng = random.Random(args.seed)
+        start = time.perf_counter()
+        seed(args.clients, args.reps, args.spread_km, rng)
+        print(f"Seeded {args.clients} clients for {args.reps} reps in {time.perf_counter() - start:.1f}s")
+
+        radius = args.radius_km * 1000
+        spread = args.spread_km / 111.32
+        print(f"radius_km={args.radius_km} limit={args.limit} probes={args.probes}")
+        print(f"{'scope':<14}{'full scan ms':>14}{'geohash ms':>12}{'speedup':>10}{'agree':>8}")
+
+        for scope in ('rep', 'all clients'):
+            probes = []
+            for _ in range(args.probes):
+                lat = CENTER[0] + rng.uniform(-spread, spread)
+                lng = CENTER[1] + rng.uniform(-spread, spread)
+                assigned_to = rng.randint(1, args.reps) if scope == 'rep' else None
+                probes.append((lat, lng, radius, args.limit, assigned_to))
+
+            scan_ms, expected = timed(full_scan, probes)
+            search_ms, found = timed(
+                lambda lat, lng, radius, limit, assigned_to: [
+                    client_id for client_id, _ in NearbyClientsService(assigned_to).nearest(lat, lng, radius, limit)
+                ],
+                probes
+            )
+            agree = sum(1 for a, b in zip(expected, found) if a == b)
+            print(f"{scope:<14}{scan_ms:>14.2f}{search_ms:>12.2f}{scan_ms / search_ms if search_ms else 0:>9.0f}x{agree:>5}/{len(probes)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+# Replays weeks of recurring client visits through the old waypoint hash and
+# the ordered, quantized route key, reporting how often each one would have
+# found a stored Google route and how often it returned one for the wrong
+# visiting order.
+#
+#   python benchmarks/route_key_benchmark.py --reps 40 --weeks 8
+#   python benchmarks/route_key_benchmark.py --jitter-meters 3 --reorder-rate 0.2
+import os
+import sys
+import json
+import random
+import hashlib
+import argparse
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.google_routes_service import GoogleRoutesService
+
+OFFICE = {'coordinates': [36.8219, -1.30072], 'label': 'Office'}
+
+
+def old_waypoints_hash(meetings):
+    # The scheme this replaced: sorted by meeting id, exact coordinates
+    waypoints = []
+    for meeting in sorted(meetings, key=lambda m: m.id):
+        waypoints.append({'lat': meeting.location['coordinates'][1], 'lng': meeting.location['coordinates'][0]})
+    return hashlib.md5(json.dumps(waypoints, sort_keys=True).encode()).hexdigest()
+
+
+def make_clients(rng, reps, clients_per_rep):
+    clients = {}
+    for rep in range(reps):
+        clients[rep] = [
+            (36.70 + rng.random() * 0.25, -1.40 + rng.random() * 0.25)
+            for _ in range(clients_per_rep)
+        ]
+    return clients
+
+
+def replay(args):
+    rng = random.Random(args.seed)
+    service = GoogleRoutesService(OFFICE)
+    clients = make_clients(rng, args.reps, args.stops)
+    jitter = args.jitter_meters / 111320
+
+    # key -> visiting order the stored route was computed for
+    stored = {'old': {}, 'new': {}}
+    counts = {name: {'hits': 0, 'misses': 0, 'wrong_order': 0} for name in stored}
+    next_id = 1
+
+    for week in range(args.weeks):
+        for rep in range(args.reps):
+            order = list(range(args.stops))
+            if week > 0 and rng.random() < args.reorder_rate:
+                rng.shuffle(order)
+
+            # Meetings are booked (and so numbered) in whatever order the rep
+            # enters them; the route visits them in the planned order
+            booking = list(range(args.stops))
+            rng.shuffle(booking)
+            ids = {}
+            for position in booking:
+                ids[position] = next_id
+                next_id += 1
+
+            meetings = []
+            for position in order:
+                lng, lat = clients[rep][position]
+                location = {'coordinates': [lng + rng.uniform(-jitter, jitter), lat + rng.uniform(-jitter, jitter)]}
+                meetings.append(SimpleNamespace(id=ids[position], location=location))
+
+            # A route is only right for the same stops in the same order
+            visit = (rep, tuple(order))
+            for name, key in (('old', old_waypoints_hash(meetings)), ('new', service.create_route_key(meetings))):
+                if key in stored[name]:
+                    counts[name]['hits'] += 1
+                    if stored[name][key] != visit:
+                        counts[name]['wrong_order'] += 1
+                else:
+                    counts[name]['misses'] += 1
+                    stored[name][key] = visit
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--reps', type=int, default=40)
+    parser.add_argument('--stops', type=int, default=4)
+    parser.add_argument('--weeks', type=int, default=8)
+    parser.add_argument('--reorder-rate', type=float, default=0.1)
+    parser.add_argument('--jitter-meters', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    counts = replay(args)
+    lookups = args.reps * args.weeks
+
+    print(f"reps={args.reps} stops={args.stops} weeks={args.weeks} reorder_rate={args.reorder_rate} jitter_m={args.jitter_meters}")
+    print(f"{'key':<8}{'api calls':>12}{'hits':>8}{'hit rate':>11}{'wrong order':>14}")
+    for name, label in (('old', 'old'), ('new', 'new')):
+        c = counts[name]
+        print(f"{label:<8}{c['misses']:>12}{c['hits']:>8}{c['hits'] / lookups:>11.1%}{c['wrong_order']:>14}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+# Measures how fast a 10k-row client/meeting listing turns into a JSON body:
+# the old inline dicts through Flask's stdlib encoder against the shared
+# serializers through the orjson-backed provider.
+#
+#   python benchmarks/serializer_benchmark.py --rows 10000
+import os
+import sys
+import time
+import argparse
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from app.json_provider import FastJSONProvider, orjson
+from app.utils.serializers import client_serializer, dump_meeting_summary
+
+
+def make_rows(rows):
+    clients = []
+    meetings = []
+    users = [SimpleNamespace(id=i, first_name='Rep', last_name=str(i)) for i in range(1, 51)]
+
+    for i in range(1, rows + 1):
+        location = {'name': f'{i} Moi Avenue', 'label': f'{i} Moi Avenue, Nairobi', 'coordinates': [36.8219, -1.30072], 'type': 'address'}
+        client = SimpleNamespace(
+            id=i, company_name=f'Client {i}', contact_person='Contact', phone_number='0700000000',
+            email=f'client{i}@example.com', address=f'{i} Moi Avenue', status='active', location=location,
+            created_at=datetime(2026, 1, 1) + timedelta(minutes=i), assigned_to=i % 50 + 1
+        )
+        clients.append(client)
+
+        scheduled = datetime(2026, 3, 2, 9) + timedelta(hours=i % 9, days=i % 60)
+        meetings.append(SimpleNamespace(
+            id=i, client=client, user=users[i % 50], meeting_type='field', title='Visit', duration=60,
+            location=location, scheduled_time=scheduled, scheduled_date=scheduled.date()
+        ))
+
+    return clients, meetings
+
+
+def inline_clients(clients):
+    return [{
+        "id": c.id,
+        "company_name": c.company_name,
+        "contact_person": c.contact_person,
+        "phone_number": c.phone_number,
+        "email": c.email,
+        "address": c.address,
+        "status": c.status,
+        "location": c.location,
+        "created_at": c.created_at.isoformat(),
+        "assigned_to": c.assigned_to
+    } for c in clients]
+
+
+def inline_meetings(meetings):
+    rows = []
+    for m in meetings:
+        client = m.client
+        user = m.user
+        rows.append({
+            "id": m.id,
+            "client": client.company_name if client else "Unknown",
+            "contactPerson": client.contact_person if client else "N/A",
+            "meetingType": m.meeting_type,
+            "date": m.scheduled_date.isoformat(),
+            "time": m.scheduled_time.strftime('%H:%M'),
+            "location": m.location.get("label") if m.location else m.location,
+            "status": "Completed" if m.scheduled_date < datetime.now().date() else "Upcoming",
+            "salesPerson": f"{user.first_name} {user.last_name}" if user else "Unknown",
+            "duration": m.duration,
+            "notes": m.title
+        })
+    return rows
+
+
+def serialized_meetings(meetings):
+    today = date.today()
+    return [dump_meeting_summary(m, today) for m in meetings]
+
+
+def best_of(repeat, fn):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None or elapsed < best else best
+    return best, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    default_provider = DefaultJSONProvider(app)
+    fast_provider = FastJSONProvider(app)
+    clients, meetings = make_rows(args.rows)
+
+    cases = [
+        ('clients inline + stdlib json', lambda: default_provider.dumps({"clients": inline_clients(clients)}, separators=(",", ":"))),
+        ('clients serializer + fast json', lambda: fast_provider.dumps({"clients": client_serializer.dump_many(clients)})),
+        ('meetings inline + stdlib json', lambda: default_provider.dumps({"meetings": inline_meetings(meetings)}, separators=(",", ":"))),
+        ('meetings serializer + fast json', lambda: fast_provider.dumps({"meetings": serialized_meetings(meetings)})),
+    ]
+
+    print(f"rows={args.rows} orjson={'yes' if orjson is not None else 'no (stdlib fallback)'}")
+    print(f"{'case':<34}{'ms':>10}{'rows/s':>14}{'bytes':>12}")
+    for name, fn in cases:
+        seconds, size = best_of(args.repeat, fn)
+        print(f"{name:<34}{seconds * 1000:>10.1f}{args.rows / seconds:>14.0f}{size:>12}")
+
+
+if __name__ == '__main__':
+    main()
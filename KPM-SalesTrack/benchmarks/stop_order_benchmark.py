@@ -0,0 +1,88 @@
+# Compares total driven km of the solved stop order against the old
+# time-sorted order on synthetic Nairobi days.
+#
+#   python benchmarks/stop_order_benchmark.py --days 200 --meetings 8
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import datetime, date, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.travel_matrix import TravelMatrixService, HaversineMatrixProvider
+from app.services.stop_order_solver import StopOrderSolver
+
+OFFICE_LOCATION = {'coordinates': [36.8219, -1.30072], 'label': 'Office'}
+
+
+def make_day(rng, meetings_per_day, day):
+    meetings = []
+    slot = datetime.combine(day, datetime.min.time()) + timedelta(hours=8)
+
+    for i in range(meetings_per_day):
+        lat = -1.30072 + rng.uniform(-0.12, 0.12)
+        lng = 36.8219 + rng.uniform(-0.15, 0.15)
+        duration = rng.choice([30, 45, 60])
+        meetings.append(SimpleNamespace(
+            id=i + 1,
+            user_id=1,
+            location={'coordinates': [lng, lat]},
+            scheduled_time=slot,
+            scheduled_date=day,
+            duration=duration
+        ))
+        # Reps book the next visit after the meeting plus some travel slack
+        slot = slot + timedelta(minutes=duration + rng.choice([15, 30, 45, 60]))
+
+    # Booking order is not visiting order
+    rng.shuffle(meetings)
+    return meetings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--days', type=int, default=200)
+    parser.add_argument('--meetings', type=int, default=8)
+    parser.add_argument('--budget', type=float, default=0.2)
+    parser.add_argument('--window', type=int, default=15)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    matrix_service = TravelMatrixService(OFFICE_LOCATION, HaversineMatrixProvider())
+    solver = StopOrderSolver(time_budget_seconds=args.budget, window_minutes=args.window)
+
+    sorted_total = 0.0
+    solved_total = 0.0
+    sorted_late_minutes = 0.0
+    solved_late_minutes = 0.0
+    solve_seconds = 0.0
+
+    for d in range(args.days):
+        meetings = make_day(rng, args.meetings, date(2026, 1, 1) + timedelta(days=d))
+        matrix = matrix_service.build_for_meetings(meetings)
+
+        time_sorted = sorted(meetings, key=lambda m: m.scheduled_time)
+        baseline = solver.solution_for_order(time_sorted, matrix)
+        sorted_total += baseline.total_distance / 1000
+        sorted_late_minutes += baseline.lateness_seconds / 60
+
+        started = time.perf_counter()
+        solution = solver.solve(meetings, matrix)
+        solve_seconds += time.perf_counter() - started
+
+        solved_total += solution.total_distance / 1000
+        solved_late_minutes += solution.lateness_seconds / 60
+
+    print(f"days: {args.days}, meetings/day: {args.meetings}, window: {args.window} min")
+    print(f"time-sorted total: {sorted_total:.1f} km")
+    print(f"solved total:      {solved_total:.1f} km ({100 * (1 - solved_total / sorted_total):.1f}% less)")
+    print(f"minutes late beyond window: time-sorted {sorted_late_minutes:.0f}, solved {solved_late_minutes:.0f}")
+    print(f"mean solve time: {1000 * solve_seconds / args.days:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""Added lat, lng and geohash columns
+
+Revision ID: 9d6a2f4b8e13
+Revises: e5b8d3a1c7f4
+Create Date: 2026-10-18 19:48:31.207664
+
+"""
+import json
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d6a2f4b8e13'
+down_revision = 'e5b8d3a1c7f4'
+branch_labels = None
+depends_on = None
+
+TABLES = ['clients', 'meetings', 'checkins']
+BATCH_SIZE = 1000
+GEOHASH_PRECISION = 9
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def encode(lat, lng, precision):
+    # Frozen copy of app.utils.geohash.encode as of this revision, so the
+    # migration keeps producing the same cells whatever the app code becomes
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+
+    while len(chars) < precision:
+        point, bounds = (lng, lng_range) if even else (lat, lat_range)
+        mid = (bounds[0] + bounds[1]) / 2
+        if point >= mid:
+            value = (value << 1) | 1
+            bounds[0] = mid
+        else:
+            value = value << 1
+            bounds[1] = mid
+
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+
+    return "".join(chars)
+
+
+def location_point(location):
+    if isinstance(location, str):
+        location = json.loads(location)
+    try:
+        return float(location['coordinates'][1]), float(location['coordinates'][0])
+    except (TypeError, KeyError, IndexError, ValueError):
+        return None
+
+
+def backfill(conn, table):
+    # Copied out of the JSON in id order, a batch per round trip
+    target = sa.table(table,
+        sa.column('id', sa.Integer),
+        sa.column('lat', sa.Float),
+        sa.column('lng', sa.Float),
+        sa.column('geohash', sa.String)
+    )
+    statement = target.update().where(target.c.id == sa.bindparam('row_id')).values(
+        lat=sa.bindparam('lat'), lng=sa.bindparam('lng'), geohash=sa.bindparam('geohash')
+    )
+
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(f"SELECT id, location FROM {table} WHERE id > :last_id ORDER BY id LIMIT :limit"),
+            {'last_id': last_id, 'limit': BATCH_SIZE}
+        ).fetchall()
+        if len(rows) == 0:
+            break
+
+        values = []
+        for row_id, location in rows:
+            point = location_point(location)
+            if point is not None:
+                values.append({
+                    'row_id': row_id,
+                    'lat': point[0],
+                    'lng': point[1],
+                    'geohash': encode(point[0], point[1], GEOHASH_PRECISION)
+                })
+
+        if len(values) > 0:
+            conn.execute(statement, values)
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('lat', sa.Float(), nullable=True))
+            batch_op.add_column(sa.Column('lng', sa.Float(), nullable=True))
+            batch_op.add_column(sa.Column('geohash', sa.String(length=12), nullable=True))
+            batch_op.create_index(batch_op.f(f'ix_{table}_geohash'), ['geohash'], unique=False)
+    # ### end Alembic commands ###
+
+    conn = op.get_bind()
+    for table in TABLES:
+        backfill(conn, table)
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f(f'ix_{table}_geohash'))
+            batch_op.drop_column('geohash')
+            batch_op.drop_column('lng')
+            batch_op.drop_column('lat')
+    # ### end Alembic commands ###
@@ -0,0 +1,65 @@
+"""Added indexes for hot queries
+
+Revision ID: b61f0e9a4c83
+Revises: 5d8a1f3c6e27
+Create Date: 2026-10-18 15:40:12.385527
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b61f0e9a4c83'
+down_revision = '5d8a1f3c6e27'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_meetings_scheduled_date_meeting_type', 'meetings', ['scheduled_date', 'meeting_type'], False),
+    ('ix_meetings_user_id_scheduled_date', 'meetings', ['user_id', 'scheduled_date'], False),
+    ('ix_meetings_client_id_scheduled_date', 'meetings', ['client_id', 'scheduled_date'], False),
+    ('ix_routes_route_date', 'routes', ['route_date'], False),
+    ('ix_routes_user_id_route_date_status', 'routes', ['user_id', 'route_date', 'status'], False),
+    ('ix_route_meetings_route_id_stop_order', 'route_meetings', ['route_id', 'stop_order'], False),
+    ('ix_clients_assigned_to', 'clients', ['assigned_to'], False),
+    ('ix_tasks_assigned_to', 'tasks', ['assigned_to'], False),
+    ('ix_objectives_user_id', 'objectives', ['user_id'], False),
+    ('ix_google_routes_waypoints_hash', 'google_routes', ['waypoints_hash'], True),
+]
+
+
+def upgrade():
+    # Parallel optimization runs could store the same waypoints twice; keep the
+    # oldest copy and point routes at it before the unique index goes on
+    op.execute(sa.text("""
+        UPDATE routes SET google_route_id = (
+            SELECT MIN(keep.id) FROM google_routes keep
+            WHERE keep.waypoints_hash = (
+                SELECT dup.waypoints_hash FROM google_routes dup WHERE dup.id = routes.google_route_id
+            )
+        )
+        WHERE google_route_id IN (
+            SELECT g.id FROM google_routes g
+            WHERE g.waypoints_hash IS NOT NULL
+            AND g.id > (SELECT MIN(g2.id) FROM google_routes g2 WHERE g2.waypoints_hash = g.waypoints_hash)
+        )
+    """))
+    op.execute(sa.text("""
+        DELETE FROM google_routes
+        WHERE waypoints_hash IS NOT NULL
+        AND id > (SELECT MIN(g2.id) FROM google_routes g2 WHERE g2.waypoints_hash = google_routes.waypoints_hash)
+    """))
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, and keeps the
+    # tables writable while the indexes build on Postgres
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in INDEXES:
+            op.create_index(name, table, columns, unique=unique, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
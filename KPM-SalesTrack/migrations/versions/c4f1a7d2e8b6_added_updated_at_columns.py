@@ -0,0 +1,36 @@
+"""Added updated_at columns
+
+Revision ID: c4f1a7d2e8b6
+Revises: 7a2c8e5f9d31
+Create Date: 2026-10-18 18:02:47.551903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4f1a7d2e8b6'
+down_revision = '7a2c8e5f9d31'
+branch_labels = None
+depends_on = None
+
+TABLES = ['clients', 'meetings', 'routes', 'route_meetings']
+
+
+def upgrade():
+    # Existing rows start from their creation time
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+        op.execute(f"UPDATE {table} SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)")
+
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('updated_at')
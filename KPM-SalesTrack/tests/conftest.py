@@ -0,0 +1,146 @@
+import os
+import sys
+import random
+import tempfile
+from datetime import datetime, date, time
+
+import pytest
+from sqlalchemy import event
+
+# Config reads the environment at import time, so this has to come first
+_db_dir = tempfile.mkdtemp(prefix="kpm-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("GOOGLE_ROUTES_API_KEY", "test-key")
+os.environ.setdefault("GEOCODE_EARTH_API", "test-key")
+os.environ["INSTRUMENTATION_ENABLED"] = "true"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.db import db as _db
+from app.models import User, Client, Meeting
+from app.utils import response_cache
+from app.utils import geocode
+from app.services import google_routes_service
+
+OFFICE = {'coordinates': [36.8219, -1.30072], 'label': 'Office'}
+ROUTE_DAY = date(2030, 3, 4)
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = create_app()
+    app.config["TESTING"] = True
+    app.config["JWT_SECRET_KEY"] = "test-jwt-secret-key-long-enough-for-hs256"
+    return app
+
+
+@pytest.fixture
+def db(app):
+    with app.app_context():
+        _db.create_all()
+        yield _db
+        _db.session.remove()
+        _db.drop_all()
+
+    # Process-wide caches would otherwise hand one test another test's rows
+    response_cache.clear()
+    google_routes_service._route_ids.clear()
+    geocode._geocode_lru.clear()
+    geocode._reverse_geocode_lru.clear()
+
+
+@pytest.fixture
+def client(app, db):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth(app):
+    def headers(user_id, role):
+        with app.app_context():
+            token = create_access_token(identity=str(user_id), additional_claims={"role": role})
+        return {"Authorization": f"Bearer {token}"}
+    return headers
+
+
+@pytest.fixture
+def count_queries(db):
+    # with count_queries() as queries: ...; len(queries) is the statements run
+    class Counter:
+        def __init__(self):
+            self.statements = []
+
+        def __enter__(self):
+            event.listen(db.engine, "before_cursor_execute", self.record)
+            return self.statements
+
+        def __exit__(self, *exc):
+            event.remove(db.engine, "before_cursor_execute", self.record)
+
+        def record(self, conn, cursor, statement, parameters, context, executemany):
+            self.statements.append(statement)
+
+    return Counter
+
+
+def make_location(label, rng):
+    return {
+        'name': label,
+        'label': label,
+        'coordinates': [36.80 + rng.random() * 0.1, -1.30 + rng.random() * 0.1],
+        'type': 'address'
+    }
+
+
+def seed_users(db, reps=3, clients_per_rep=3, day=ROUTE_DAY):
+    # An admin plus reps, each with clients and one field meeting per client
+    rng = random.Random(1)
+    admin = User(first_name='Ada', last_name='Admin', email='admin@example.com', phone_number='0700000000', role='admin', password='x')
+    db.session.add(admin)
+
+    rep_ids = []
+    for i in range(reps):
+        rep = User(first_name='Rep', last_name=str(i), email=f'rep{i}@example.com', phone_number='0700000000', role='sales', password='x')
+        db.session.add(rep)
+        db.session.flush()
+        rep_ids.append(rep.id)
+
+        for j in range(clients_per_rep):
+            location = make_location(f'Client {rep.id}-{j}', rng)
+            client = Client(company_name=f'Client {rep.id}-{j}', contact_person='Contact', phone_number='0700000000',
+                            email='c@example.com', address=location['label'], status='active', location=location, assigned_to=rep.id)
+            db.session.add(client)
+            db.session.flush()
+            db.session.add(Meeting(user_id=rep.id, client_id=client.id, title='Visit', duration=60, location=location,
+                                   meeting_type='field', scheduled_time=datetime.combine(day, time(8 + 2 * j + i % 2)),
+                                   scheduled_date=day))
+
+    db.session.commit()
+    return admin.id, rep_ids
+
+
+def fake_route_response(meetings):
+    legs = [{'distanceMeters': 1000 + i, 'duration': f'{600 + i}s', 'polyline': {'encodedPolyline': 'leg'}}
+            for i in range(len(meetings) + 1)]
+    return {'routes': [{
+        'distanceMeters': sum(leg['distanceMeters'] for leg in legs),
+        'duration': f"{sum(600 + i for i in range(len(legs)))}s",
+        'polyline': {'encodedPolyline': 'route'},
+        'legs': legs
+    }]}
+
+
+@pytest.fixture
+def google_routes(monkeypatch):
+    # Stands in for the Routes API; the list records each call's stop count
+    calls = []
+
+    def call_google_api(self, meetings):
+        calls.append(len(meetings))
+        return fake_route_response(meetings)
+
+    monkeypatch.setattr(google_routes_service.GoogleRoutesService, 'call_google_api', call_google_api)
+    return calls
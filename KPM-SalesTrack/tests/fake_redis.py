@@ -0,0 +1,85 @@
+import time
+import fnmatch
+
+
+class FakeRedis:
+    # The slice of redis-py RedisCacheBackend uses, in memory. Like a real
+    # client without decode_responses it stores and returns bytes
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+
+    def encode(self, value):
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode()
+
+    def alive(self, key):
+        key = self.encode(key)
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def get(self, key):
+        return self.data.get(self.encode(key)) if self.alive(key) else None
+
+    def set(self, key, value, ex=None):
+        key = self.encode(key)
+        self.data[key] = self.encode(value)
+        self.expires.pop(key, None)
+        if ex is not None:
+            self.expire(key, ex)
+        return True
+
+    def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            if self.alive(key):
+                removed += 1
+            self.data.pop(self.encode(key), None)
+            self.expires.pop(self.encode(key), None)
+        return removed
+
+    def sadd(self, key, *members):
+        self.alive(key)
+        members_set = self.data.setdefault(self.encode(key), set())
+        before = len(members_set)
+        members_set.update(self.encode(member) for member in members)
+        return len(members_set) - before
+
+    def smembers(self, key):
+        return set(self.data[self.encode(key)]) if self.alive(key) else set()
+
+    def expire(self, key, seconds):
+        if not self.alive(key):
+            return False
+        self.expires[self.encode(key)] = time.monotonic() + seconds
+        return True
+
+    def scan_iter(self, match=None):
+        for key in list(self.data):
+            if self.alive(key) and (match is None or fnmatch.fnmatchcase(key.decode(), match)):
+                yield key
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        commands, self.commands = self.commands, []
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in commands]
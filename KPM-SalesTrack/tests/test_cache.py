@@ -0,0 +1,93 @@
+import pytest
+
+from app.utils.cache import MemoryCacheBackend, RedisCacheBackend, ResponseCache
+from fake_redis import FakeRedis
+
+
+@pytest.fixture
+def redis_cache():
+    client = FakeRedis()
+    cache = ResponseCache()
+    cache.backend = RedisCacheBackend(client)
+    return cache, client
+
+
+def test_set_and_get_round_trip(redis_cache):
+    cache, client = redis_cache
+    cache.set('meetings:1', b'{"a": 1}', tags=['meetings'], ttl=30)
+
+    assert cache.get('meetings:1') == b'{"a": 1}'
+    assert cache.get('meetings:2') is None
+    assert client.smembers('kpm:cache:tag:meetings') == {b'meetings:1'}
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_invalidate_drops_only_tagged_entries(redis_cache):
+    cache, client = redis_cache
+    cache.set('route:1', b'one', tags=['routes', 'route:1'])
+    cache.set('route:2', b'two', tags=['routes', 'route:2'])
+    cache.set('clients', b'three', tags=['clients'])
+
+    # Members come back from redis as bytes and have to map to the same keys
+    assert cache.invalidate('route:1') == 1
+    assert cache.get('route:1') is None
+    assert cache.get('route:2') == b'two'
+
+    assert cache.invalidate('routes') == 2
+    assert cache.get('route:2') is None
+    assert cache.get('clients') == b'three'
+    assert client.smembers('kpm:cache:tag:routes') == set()
+
+
+def test_entries_expire_with_their_ttl(redis_cache, monkeypatch):
+    cache, client = redis_cache
+    cache.set('meetings:1', b'body', tags=['meetings'], ttl=30)
+
+    now = client.expires[b'kpm:cache:meetings:1']
+    monkeypatch.setattr('time.monotonic', lambda: now + 1)
+    assert cache.get('meetings:1') is None
+
+
+def test_clear_removes_only_the_cache_prefix(redis_cache):
+    cache, client = redis_cache
+    cache.set('route:1', b'one', tags=['routes'])
+    client.set('kpm:session:1', 'other data')
+
+    cache.clear()
+
+    assert cache.get('route:1') is None
+    assert list(client.scan_iter(match='kpm:cache:*')) == []
+    assert client.get('kpm:session:1') == b'other data'
+
+
+def test_memory_tag_index_stays_bounded_by_maxsize():
+    backend = MemoryCacheBackend(maxsize=100, ttl=60)
+    for i in range(50000):
+        backend.set(f'routes:{i}', b'body', 60, ['routes', f'route:{i}'])
+
+    assert backend.size() == 100
+    assert len(backend.tags['routes']) == 100
+    assert len(backend.tags) == 101
+    assert len(backend.key_tags) == 100
+
+    # The surviving keys are the ones still cached
+    assert backend.invalidate(['routes']) == 100
+    assert backend.tags == {}
+    assert backend.size() == 0
+
+
+def test_memory_tag_index_drops_keys_that_expired(monkeypatch):
+    backend = MemoryCacheBackend(maxsize=10, ttl=60)
+    now = [1000.0]
+    monkeypatch.setattr('time.monotonic', lambda: now[0])
+
+    for i in range(10):
+        backend.set(f'meetings:{i}', b'body', 1, ['meetings:2030-03-03'])
+    now[0] += 5
+    for i in range(10):
+        assert backend.get(f'meetings:{i}') is None
+
+    backend.set('meetings:today', b'body', 60, ['meetings:2030-03-04'])
+    assert 'meetings:2030-03-03' not in backend.tags
+    assert backend.key_tags == {'meetings:today': {'meetings:2030-03-04'}}
@@ -0,0 +1,52 @@
+from datetime import date, datetime, timedelta
+
+from app.models import Meeting, Route, RouteMeeting
+from app.services import OptimizationJobService
+from conftest import OFFICE, ROUTE_DAY, seed_users
+
+FUTURE = (datetime.utcnow() + timedelta(days=1)).strftime('%a, %d %b %Y %H:%M:%S GMT')
+
+
+def test_todays_meetings_revalidate_on_etag_only(client, db, auth):
+    _, rep_ids = seed_users(db, reps=1, day=date.today())
+    headers = auth(rep_ids[0], 'sales')
+
+    first = client.get('/meetings/sales/today', headers=headers)
+    assert first.status_code == 200
+    assert first.headers.get('Last-Modified') is None
+    etag = first.headers['ETag']
+
+    assert client.get('/meetings/sales/today', headers={**headers, 'If-None-Match': etag}).status_code == 304
+
+    # Deleting a row leaves max(updated_at) where it was; the ETag still moves
+    db.session.delete(Meeting.query.filter_by(user_id=rep_ids[0]).first())
+    db.session.commit()
+
+    response = client.get('/meetings/sales/today', headers={**headers, 'If-None-Match': etag, 'If-Modified-Since': FUTURE})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert client.get('/meetings/sales/today', headers={**headers, 'If-Modified-Since': FUTURE}).status_code == 200
+
+
+def test_user_route_changes_when_a_stop_is_removed(client, db, auth, google_routes):
+    _, rep_ids = seed_users(db)
+    service = OptimizationJobService(OFFICE)
+    service.enqueue(ROUTE_DAY, ROUTE_DAY)
+    assert service.run_next() is True
+    Route.query.update({Route.status: 'accepted'}, synchronize_session=False)
+    db.session.commit()
+
+    headers = auth(rep_ids[0], 'sales')
+    url = f'/routes/user/{rep_ids[0]}/date/{ROUTE_DAY.isoformat()}'
+    first = client.get(url, headers=headers)
+    assert first.status_code == 200
+    assert first.headers.get('Last-Modified') is None
+    etag = first.headers['ETag']
+
+    route = Route.query.filter_by(user_id=rep_ids[0]).one()
+    RouteMeeting.query.filter_by(route_id=route.id, stop_order=1).delete()
+    db.session.commit()
+
+    response = client.get(url, headers={**headers, 'If-None-Match': etag, 'If-Modified-Since': FUTURE})
+    assert response.status_code == 200
+    assert len(response.get_json()['route']['stops']) == len(first.get_json()['route']['stops']) - 1
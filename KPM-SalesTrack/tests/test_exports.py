@@ -0,0 +1,26 @@
+import gzip
+
+import pytest
+
+from conftest import seed_users
+
+
+@pytest.mark.parametrize('accept, compressed', [
+    ('gzip', True),
+    ('gzip, deflate, br', True),
+    ('br;q=1.0, gzip;q=0.5', True),
+    ('gzip;q=0', False),
+    ('identity', False),
+    ('', False),
+])
+def test_export_gzip_follows_accept_encoding_quality(client, db, auth, accept, compressed):
+    admin_id, _ = seed_users(db, reps=2)
+    headers = auth(admin_id, 'admin')
+    headers['Accept-Encoding'] = accept
+
+    response = client.get('/exports/meetings?format=csv', headers=headers)
+    assert response.status_code == 200
+    assert (response.headers.get('Content-Encoding') == 'gzip') == compressed
+
+    body = gzip.decompress(response.get_data()) if compressed else response.get_data()
+    assert len(body.decode().strip().splitlines()) == 1 + 6
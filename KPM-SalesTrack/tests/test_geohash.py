@@ -0,0 +1,55 @@
+import os
+import glob
+import random
+import importlib.util
+
+from app.utils import geohash
+
+
+def locale_key(value):
+    # Punctuation before digits before letters, as en_US.UTF-8 and ICU order
+    # them; byte order puts "~" after every letter instead
+    return [(0 if c == '~' else 1, c) for c in value]
+
+
+def in_range(value, lower, upper, key):
+    return key(lower) <= key(value) and (upper is None or key(value) < key(upper))
+
+
+def test_prefix_range_matches_exactly_the_prefixed_hashes_under_any_ordering():
+    rng = random.Random(3)
+    hashes = [geohash.encode(rng.uniform(-90, 90), rng.uniform(-180, 180), 9) for _ in range(1000)]
+    prefixes = [h[:n] for h in hashes[:60] for n in (1, 3, 5)] + ['kzz', 'zz', 'z', '9']
+
+    for prefix in prefixes:
+        lower, upper = geohash.prefix_range(prefix)
+        for key in (lambda v: v, locale_key):
+            for h in hashes:
+                assert in_range(h, lower, upper, key) == h.startswith(prefix)
+
+
+def test_tilde_bound_fails_under_locale_ordering():
+    # The bound this replaced: empty under a locale collation
+    cell = 'kzf0'
+    assert not in_range('kzf0wupb5', cell, cell + '~', locale_key)
+    assert in_range('kzf0wupb5', *geohash.prefix_range(cell), locale_key)
+
+
+def test_prefix_range_carries_past_the_last_character():
+    assert geohash.prefix_range('kzf9') == ('kzf9', 'kzfb')
+    assert geohash.prefix_range('kzz') == ('kzz', 'm')
+    assert geohash.prefix_range('zz') == ('zz', None)
+
+
+def test_backfill_migration_encodes_like_the_app():
+    # The migration carries its own copy of the encoder
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    path = glob.glob(os.path.join(root, 'migrations', 'versions', '9d6a2f4b8e13_*.py'))[0]
+    spec = importlib.util.spec_from_file_location('migration_9d6a2f4b8e13', path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    rng = random.Random(5)
+    points = [(rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(500)] + [(90, 180), (-90, -180), (0, 0)]
+    for lat, lng in points:
+        assert migration.encode(lat, lng, 9) == geohash.encode(lat, lng, 9)
@@ -0,0 +1,124 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.utils.http_client import HttpClient, CircuitBreaker, CircuitOpenError
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so connection reuse shows up as one client port
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        server.ports.add(self.client_address[1])
+        server.hits[self.path] = server.hits.get(self.path, 0) + 1
+
+        status = 200
+        if self.path == "/flaky" and server.hits[self.path] <= server.flaky_failures:
+            status = 503
+        elif self.path == "/down" and server.down:
+            status = 503
+
+        body = b'{"ok": true}' if status == 200 else b'{"ok": false}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.ports = set()
+    server.hits = {}
+    server.flaky_failures = 2
+    server.down = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def make_client(**kwargs):
+    kwargs.setdefault("timeout", (1, 2))
+    kwargs.setdefault("backoff_base", 0.01)
+    kwargs.setdefault("backoff_max", 0.05)
+    return HttpClient("stub", **kwargs)
+
+
+def test_calls_reuse_one_keep_alive_connection(stub):
+    server, url = stub
+    client = make_client()
+
+    for _ in range(20):
+        assert client.get(f"{url}/ok").status_code == 200
+
+    assert len(server.ports) == 1
+    assert client.stats()["calls"] == 20
+
+
+def test_503_is_retried_until_it_succeeds(stub):
+    server, url = stub
+    client = make_client(max_retries=3)
+
+    response = client.get(f"{url}/flaky")
+    assert response.status_code == 200
+    assert server.hits["/flaky"] == 3
+    assert client.stats()["retries"] == 2
+    assert client.breaker.state == "closed"
+
+
+def test_circuit_opens_then_recovers(stub):
+    server, url = stub
+    client = make_client(max_retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_seconds=0.2))
+
+    assert client.get(f"{url}/down").status_code == 503
+    assert client.get(f"{url}/down").status_code == 503
+    assert client.breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        client.get(f"{url}/down")
+    assert server.hits["/down"] == 2
+
+    server.down = False
+    time.sleep(0.25)
+    assert client.get(f"{url}/down").status_code == 200
+    assert client.breaker.state == "closed"
+
+
+def test_half_open_admits_a_single_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    assert breaker.allow() is False
+
+    time.sleep(0.06)
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+
+    # The probe failing re-opens the circuit for another cool-down
+    breaker.record_failure()
+    assert breaker.allow() is False
+    time.sleep(0.06)
+    assert breaker.allow() is True
+    breaker.record_success()
+    assert breaker.allow() is True
+    assert breaker.allow() is True
+
+
+def test_deadline_caps_total_time_across_retries(stub):
+    server, url = stub
+    server.flaky_failures = 100
+    client = make_client(max_retries=5, backoff_base=1.0, backoff_max=1.0, deadline=0.3)
+
+    started = time.monotonic()
+    response = client.get(f"{url}/flaky")
+    assert response.status_code == 503
+    assert time.monotonic() - started < 0.5
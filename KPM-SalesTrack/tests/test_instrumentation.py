@@ -0,0 +1,47 @@
+import pytest
+
+from app import instrumentation
+
+
+def test_metrics_is_hidden_without_a_configured_token(client, app, monkeypatch):
+    monkeypatch.setitem(app.config, 'METRICS_TOKEN', None)
+    assert client.get('/metrics').status_code == 404
+    assert client.get('/metrics', headers={'Authorization': 'Bearer '}).status_code == 404
+
+
+def test_metrics_requires_the_token(client, app, monkeypatch):
+    monkeypatch.setitem(app.config, 'METRICS_TOKEN', 'scrape-secret')
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+
+    response = client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'})
+    assert response.status_code == 200
+    assert 'kpm_requests_total' in response.get_data(as_text=True)
+
+
+def test_only_one_request_is_profiled_at_a_time(client, app, db, monkeypatch, tmp_path):
+    monkeypatch.setitem(app.config, 'PROFILE_SAMPLE_RATE', 1.0)
+    monkeypatch.setitem(app.config, 'PROFILE_SLOW_MS', 0)
+    monkeypatch.setitem(app.config, 'PROFILE_DIR', str(tmp_path))
+
+    # Another request holds the profiler: this one is served, unprofiled
+    assert instrumentation._profiler_lock.acquire(blocking=False)
+    try:
+        assert client.get('/clients/nearby').status_code == 401
+    finally:
+        instrumentation._profiler_lock.release()
+    assert list(tmp_path.iterdir()) == []
+
+    assert client.get('/clients/nearby').status_code == 401
+    assert len(list(tmp_path.iterdir())) == 1
+    assert not instrumentation._profiler_lock.locked()
+
+
+def test_failed_statement_does_not_leave_its_start_time_behind(db):
+    with db.engine.connect() as conn:
+        with pytest.raises(Exception):
+            conn.exec_driver_sql('SELECT * FROM no_such_table')
+        assert conn.info.get('query_started') == []
+
+        conn.exec_driver_sql('SELECT 1')
+        assert conn.info.get('query_started') == []
@@ -0,0 +1,40 @@
+from geopy.distance import geodesic
+
+from app.models import Client
+from conftest import seed_users
+
+
+def test_nearby_returns_own_clients_closest_first(client, db, auth):
+    _, reps = seed_users(db, reps=3, clients_per_rep=4)
+    origin = Client.query.filter_by(assigned_to=reps[0]).first()
+    lat, lng = origin.lat, origin.lng
+
+    response = client.get(f'/clients/nearby?lat={lat}&lng={lng}&radius_km=8', headers=auth(reps[0], 'sales'))
+    assert response.status_code == 200
+    found = response.get_json()['clients']
+
+    expected = sorted(
+        (geodesic((lat, lng), (c.lat, c.lng)).meters, c.id)
+        for c in Client.query.filter_by(assigned_to=reps[0])
+    )
+    expected = [client_id for distance, client_id in expected if distance <= 8000]
+    assert [c['id'] for c in found] == expected
+    assert found[0]['distance_meters'] == 0
+
+
+def test_nearby_for_admin_honours_limit_across_reps(client, db, auth):
+    admin_id, _ = seed_users(db, reps=3, clients_per_rep=4)
+    origin = Client.query.first()
+
+    response = client.get(f'/clients/nearby?lat={origin.lat}&lng={origin.lng}&radius_km=20&limit=5', headers=auth(admin_id, 'admin'))
+    found = response.get_json()['clients']
+    assert len(found) == 5
+    assert len({c['assigned_to'] for c in found}) > 1
+    assert [c['distance_meters'] for c in found] == sorted(c['distance_meters'] for c in found)
+
+
+def test_nearby_rejects_bad_input(client, db, auth):
+    admin_id, _ = seed_users(db, reps=1)
+    headers = auth(admin_id, 'admin')
+    assert client.get('/clients/nearby?lat=1', headers=headers).status_code == 400
+    assert client.get('/clients/nearby?lat=1&lng=2&radius_km=99', headers=headers).status_code == 400
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import OptimizationJob
+from app.services import OptimizationJobService
+from app.services.optimization_jobs import JobLeaseLost
+from conftest import OFFICE, ROUTE_DAY, seed_users
+
+
+def submit(client, headers):
+    day = ROUTE_DAY.isoformat()
+    response = client.post('/routes/optimize', json={'start_date': day, 'end_date': day}, headers=headers)
+    assert response.status_code == 202
+    return response.get_json()
+
+
+def expire_lease(db, job_id, service):
+    job = db.session.get(OptimizationJob, job_id)
+    job.heartbeat_at = datetime.utcnow() - timedelta(seconds=service.lease_seconds + 1)
+    db.session.commit()
+
+
+def test_crashed_job_is_requeued_and_resubmissions_fold_into_it(client, db, auth, google_routes):
+    admin_id, _ = seed_users(db)
+    headers = auth(admin_id, 'admin')
+    first = submit(client, headers)
+
+    # A worker claims the job and dies before finishing it
+    crashed = OptimizationJobService(OFFICE)
+    assert crashed.claim_next().id == first['job_id']
+
+    # The restarted worker leaves a live lease alone
+    restarted = OptimizationJobService(OFFICE)
+    assert restarted.requeue_stale() == 0
+    assert submit(client, headers)['coalesced'] is True
+
+    expire_lease(db, first['job_id'], restarted)
+    assert restarted.requeue_stale() == 1
+
+    job = db.session.get(OptimizationJob, first['job_id'])
+    assert job.status == OptimizationJob.STATUS_QUEUED
+    assert job.active_key is not None
+
+    resubmitted = submit(client, headers)
+    assert resubmitted['job_id'] == first['job_id']
+    assert resubmitted['coalesced'] is True
+
+    assert restarted.run_next() is True
+    job = db.session.get(OptimizationJob, first['job_id'])
+    assert job.status == OptimizationJob.STATUS_COMPLETED
+    assert job.active_key is None
+
+    # With the job done a new submission starts a new job
+    assert submit(client, headers)['coalesced'] is False
+
+
+def test_long_running_job_with_fresh_heartbeat_is_not_requeued(db):
+    seed_users(db)
+    service = OptimizationJobService(OFFICE)
+    job, _ = service.enqueue(ROUTE_DAY, ROUTE_DAY)
+    job = service.claim_next()
+
+    job.started_at = datetime.utcnow() - timedelta(hours=3)
+    db.session.commit()
+    service.heartbeat(job.id, job.started_at)
+    db.session.commit()
+
+    assert service.requeue_stale() == 0
+    assert db.session.get(OptimizationJob, job.id).status == OptimizationJob.STATUS_RUNNING
+
+
+def test_worker_that_lost_its_lease_stops_writing(db, google_routes):
+    seed_users(db)
+    service = OptimizationJobService(OFFICE)
+    service.enqueue(ROUTE_DAY, ROUTE_DAY)
+
+    slow = service.claim_next()
+    job_id, slow_lease = slow.id, slow.started_at
+    expire_lease(db, job_id, service)
+    service.requeue_stale()
+
+    taken_over = service.claim_next()
+    assert taken_over.id == job_id
+
+    with pytest.raises(JobLeaseLost):
+        service.heartbeat(job_id, slow_lease)
+    db.session.rollback()
+
+    service.heartbeat(job_id, taken_over.started_at)
+    db.session.commit()
+
+
+
+def test_unknown_job_follows_blueprint_not_found_status(client, db, auth):
+    admin_id, _ = seed_users(db)
+    response = client.get('/routes/jobs/999', headers=auth(admin_id, 'admin'))
+    assert response.status_code == 400
@@ -0,0 +1,95 @@
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from app.models import Task, Objective, Route, Client, Meeting
+from app.services import RouteOptimizationService
+from app.utils import response_cache
+from app.services import google_routes_service
+from conftest import OFFICE, seed_users
+
+
+def build(db, reps, clients_per_rep, extra_meetings):
+    # Today's field day for every rep, planned and approved, plus history,
+    # tasks and objectives, so every list has reps * clients rows to render
+    today = date.today()
+    admin_id, rep_ids = seed_users(db, reps=reps, clients_per_rep=clients_per_rep, day=today)
+
+    for client in Client.query.all():
+        for k in range(extra_meetings):
+            day = today - timedelta(days=k + 1)
+            db.session.add(Meeting(user_id=client.assigned_to, client_id=client.id, title='Earlier visit', duration=30,
+                                   location=client.location, meeting_type='field',
+                                   scheduled_time=datetime.combine(day, time(9)), scheduled_date=day))
+
+    for rep_id in rep_ids:
+        for k in range(clients_per_rep):
+            db.session.add(Task(title=f'Task {k}', description='Follow up', assigned_to=rep_id, assigned_by=admin_id))
+            db.session.add(Objective(user_id=rep_id, title=f'Objective {k}', target_value=10,
+                                     end_date=datetime.combine(today + timedelta(days=30), time()), created_by=admin_id))
+    db.session.commit()
+
+    RouteOptimizationService(OFFICE).optimize_routes([today], status='accepted', max_workers=1)
+    return admin_id, rep_ids
+
+
+def endpoints(admin_id, rep_ids):
+    today = date.today().isoformat()
+    rep = rep_ids[0]
+    route = Route.query.filter_by(user_id=rep).first()
+    client = Client.query.filter_by(assigned_to=rep).first()
+
+    return {
+        'admin meetings': ('/meetings/admin/all?per_page=100', admin_id, 'admin'),
+        'my meetings': ('/meetings/sales/my_meetings?per_page=100', rep, 'sales'),
+        "today's meetings": ('/meetings/sales/today', rep, 'sales'),
+        'client meetings': (f'/meetings/client/{client.id}/', admin_id, 'admin'),
+        'all clients': ('/clients/GetAll?per_page=100', admin_id, 'admin'),
+        'my clients': ('/clients/my_clients?per_page=100', rep, 'sales'),
+        'nearby clients': (f'/clients/nearby?lat={client.lat}&lng={client.lng}&radius_km=50&limit=50', admin_id, 'admin'),
+        'all tasks': ('/tasks/GetAll?per_page=100', admin_id, 'admin'),
+        'my tasks': ('/tasks/my_tasks?per_page=100', rep, 'sales'),
+        'all objectives': ('/objectives/GetAll?per_page=100', admin_id, 'admin'),
+        'my objectives': ('/objectives/my_objectives?per_page=100', rep, 'sales'),
+        'all users': ('/users/GetAll?per_page=100', admin_id, 'admin'),
+        'routes by date': (f'/routes/date/{today}?per_page=100', admin_id, 'admin'),
+        'route details': (f'/routes/{route.id}', admin_id, 'admin'),
+        'user route': (f'/routes/user/{rep}/date/{today}', rep, 'sales'),
+    }
+
+
+def measure(client, auth, count_queries, admin_id, rep_ids):
+    counts = {}
+    rows = {}
+    for name, (url, user_id, role) in endpoints(admin_id, rep_ids).items():
+        headers = auth(user_id, role)
+        with count_queries() as statements:
+            response = client.get(url, headers=headers)
+        assert response.status_code == 200, (name, response.get_json())
+        counts[name] = len(statements)
+        rows[name] = len(response.get_data())
+    return counts, rows
+
+
+def reset(db):
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+    google_routes_service._route_ids.clear()
+
+
+def test_list_endpoints_run_a_constant_number_of_queries_per_page(client, db, auth, count_queries, google_routes, monkeypatch):
+    # Counting what the views run, not what the cache saves
+    monkeypatch.setattr(response_cache, 'enabled', False)
+
+    small = build(db, reps=2, clients_per_rep=2, extra_meetings=1)
+    small_counts, small_sizes = measure(client, auth, count_queries, *small)
+
+    reset(db)
+    large = build(db, reps=6, clients_per_rep=5, extra_meetings=3)
+    large_counts, large_sizes = measure(client, auth, count_queries, *large)
+
+    for name in small_counts:
+        # The larger tree must actually render more rows for this to mean anything
+        assert large_sizes[name] > small_sizes[name], name
+        assert large_counts[name] == small_counts[name], (name, small_counts[name], large_counts[name])
@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+from app.models import Route, Meeting
+from app.services import OptimizationJobService, RouteDirtyTracker
+from conftest import OFFICE, ROUTE_DAY, seed_users
+
+
+def plan_and_accept(db):
+    service = OptimizationJobService(OFFICE)
+    service.enqueue(ROUTE_DAY, ROUTE_DAY)
+    assert service.run_next() is True
+
+    Route.query.update({Route.status: 'accepted'}, synchronize_session=False)
+    db.session.commit()
+    return service
+
+
+def statuses(db):
+    db.session.expire_all()
+    return {route.user_id: route.status for route in Route.query.all()}
+
+
+def test_unchanged_routes_stay_accepted(client, db, auth, google_routes, monkeypatch):
+    monkeypatch.setenv('ROUTE_REOPTIMIZE_DELAY_SECONDS', '0')
+    _, rep_ids = seed_users(db)
+    service = plan_and_accept(db)
+
+    # An edit that leaves the plan as it was, e.g. one reverted in time
+    RouteDirtyTracker().mark(rep_ids[0], ROUTE_DAY, 'meeting_updated')
+    db.session.commit()
+    assert service.reoptimize_dirty() == 1
+
+    assert set(statuses(db).values()) == {'accepted'}
+    response = client.get(f'/routes/user/{rep_ids[0]}/date/{ROUTE_DAY.isoformat()}', headers=auth(rep_ids[0], 'sales'))
+    assert response.get_json()['route'] is not None
+
+
+def test_changed_route_goes_back_to_pending(db, google_routes, monkeypatch):
+    monkeypatch.setenv('ROUTE_REOPTIMIZE_DELAY_SECONDS', '0')
+    _, rep_ids = seed_users(db)
+    service = plan_and_accept(db)
+    before = statuses(db)
+
+    meeting = Meeting.query.filter_by(user_id=rep_ids[0]).order_by(Meeting.scheduled_time).first()
+    meeting.scheduled_time += timedelta(minutes=30)
+    RouteDirtyTracker().mark(rep_ids[0], ROUTE_DAY, 'meeting_updated')
+    db.session.commit()
+    assert service.reoptimize_dirty() == 1
+
+    after = statuses(db)
+    assert after[rep_ids[0]] == 'pending'
+    # Reps outside the replanned car keep their approval
+    replanned = {route.user_id for route in Route.query.filter_by(status='pending')}
+    assert set(after) == set(before)
+    assert all(after[user_id] == 'accepted' for user_id in after if user_id not in replanned)
@@ -0,0 +1,20 @@
+from app.utils import geocode
+
+
+def test_nearby_check_in_reuses_the_stored_reverse_geocode(db, monkeypatch):
+    calls = []
+
+    def search_point(lat, lon, country_code="KE"):
+        calls.append((lat, lon))
+        return {'name': 'Kenyatta Avenue', 'label': 'Kenyatta Avenue', 'coordinates': [lon, lat], 'type': 'street'}
+
+    monkeypatch.setattr(geocode, 'search_point', search_point)
+
+    first = geocode.reverse_geocode(-1.2921, 36.8219)
+    geocode._reverse_geocode_lru.clear()
+
+    # About 8 m away: served from the table through the geohash prefix ranges
+    assert geocode.reverse_geocode(-1.29215, 36.82195) == first
+    # About 100 m away: outside the radius
+    geocode.reverse_geocode(-1.2930, 36.8219)
+    assert len(calls) == 2
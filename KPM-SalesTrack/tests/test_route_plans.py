@@ -0,0 +1,42 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from app.models import RoutePlan
+from app.services import RoutePlanService
+from app.services import route_plans
+
+WEEK = [date(2030, 3, 1) + timedelta(days=i) for i in range(7)]
+
+
+def current_runs(db):
+    plans = RoutePlan.query.filter_by(status=RoutePlan.STATUS_CURRENT).all()
+    return {plan.route_date: plan.run_id for plan in plans}
+
+
+def test_overlapping_publishes_leave_one_current_plan_per_date(db):
+    service = RoutePlanService()
+    service.publish(WEEK, 'week')
+    db.session.commit()
+    service.publish(WEEK[2:5], 'midweek')
+    db.session.commit()
+
+    runs = current_runs(db)
+    assert len(runs) == 7
+    assert [runs[d] for d in WEEK] == ['week'] * 2 + ['midweek'] * 3 + ['week'] * 2
+    assert RoutePlan.query.filter_by(status=RoutePlan.STATUS_SUPERSEDED).count() == 3
+
+
+def test_postgres_publishes_lock_each_date_in_order(db, monkeypatch):
+    locked = []
+
+    class Connection:
+        dialect = SimpleNamespace(name='postgresql')
+
+        def execute(self, statement, params):
+            assert 'pg_advisory_xact_lock' in str(statement)
+            locked.append((params['lock_class'], params['lock_key']))
+
+    monkeypatch.setattr(route_plans.db.session, 'connection', lambda: Connection())
+    RoutePlanService().lock_dates([WEEK[4], WEEK[1], WEEK[4], WEEK[2]])
+
+    assert locked == [(route_plans.PUBLISH_LOCK_CLASS, d.toordinal()) for d in (WEEK[1], WEEK[2], WEEK[4])]
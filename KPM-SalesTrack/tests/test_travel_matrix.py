@@ -0,0 +1,19 @@
+from app.services.travel_matrix import GoogleMatrixProvider
+
+
+def test_google_matrix_accepts_fractional_durations(monkeypatch):
+    coordinates = [[-1.30, 36.82], [-1.28, 36.80]]
+
+    def call_google_api(self, origins, destinations):
+        return [
+            {'originIndex': 0, 'destinationIndex': 1, 'condition': 'ROUTE_EXISTS', 'distanceMeters': 3100, 'duration': '412.5s'},
+            {'originIndex': 1, 'destinationIndex': 0, 'condition': 'ROUTE_EXISTS', 'distanceMeters': 3200, 'duration': '398s'},
+            {'originIndex': 0, 'destinationIndex': 0, 'condition': 'ROUTE_NOT_FOUND'},
+        ]
+
+    monkeypatch.setattr(GoogleMatrixProvider, 'call_google_api', call_google_api)
+    distances, durations = GoogleMatrixProvider(api_key='test').compute(coordinates)
+
+    assert durations[0, 1] == 412
+    assert durations[1, 0] == 398
+    assert distances[0, 1] == 3100
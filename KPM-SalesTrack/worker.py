@@ -0,0 +1,65 @@
+from app import create_app
+import os
+import time
+from dotenv import load_dotenv
+from app.services import OptimizationJobService, RoutePlanService
+from app.routes.route_optimize import OFFICE_LOCATION
+
+
+load_dotenv()
+
+
+app=create_app()
+
+
+def run_worker():
+    poll_seconds = float(os.environ.get("WORKER_POLL_SECONDS", 2))
+    gc_seconds = float(os.environ.get("ROUTE_PLAN_GC_SECONDS", 3600))
+    requeue_seconds = float(os.environ.get("JOB_REQUEUE_SECONDS", 60))
+
+    if app.config.get("CACHE_ENABLED") and app.config.get("CACHE_BACKEND") != "redis":
+        print("CACHE_BACKEND is not redis: route changes made by this worker will not "
+              "invalidate the API processes' response caches until their entries expire")
+
+    with app.app_context():
+        job_service = OptimizationJobService(OFFICE_LOCATION)
+        plan_service = RoutePlanService()
+        last_gc = 0
+        last_requeue = None
+
+        while True:
+            # Any worker can pick up a job whose own worker died, not only
+            # the one that restarts in its place
+            if last_requeue is None or time.monotonic() - last_requeue >= requeue_seconds:
+                last_requeue = time.monotonic()
+                try:
+                    requeued = job_service.requeue_stale()
+                    if requeued > 0:
+                        print(f"Requeued {requeued} optimization jobs with expired leases")
+                except Exception as e:
+                    print(f"Job requeue error: {e}")
+
+            try:
+                ran = job_service.run_next()
+                if not ran:
+                    # Routes touched by meeting edits are replanned between jobs
+                    ran = job_service.reoptimize_dirty() > 0
+            except Exception as e:
+                print(f"Optimization worker error: {e}")
+                ran = False
+
+            if time.monotonic() - last_gc >= gc_seconds:
+                last_gc = time.monotonic()
+                try:
+                    plans, routes = plan_service.collect_garbage()
+                    if plans > 0:
+                        print(f"Deleted {plans} superseded route plans and {routes} routes")
+                except Exception as e:
+                    print(f"Route plan cleanup error: {e}")
+
+            if not ran:
+                time.sleep(poll_seconds)
+
+
+if __name__ == "__main__":
+    run_worker()